@@ -0,0 +1,58 @@
+"""
+Бенчмарки APIClient для проекта API_tests_example: время get/post/delete через клиент
+и тот же запрос через голую сессию requests (raw.*) - разница между ними и есть накладные расходы клиента
+(overhead.*). Сами замеры зависят от сети и не проверяются на регрессию, проверяется только разность.
+Запросы не меняют данные эмулятора: post - без обязательного поля (422), delete - несуществующего ID (404)
+"""
+
+from Data.constants import LOCAL_BASE_URL
+from Helpers.api_client import APIClient
+from Helpers.benchmark import BenchmarkRunner
+
+COMPANIES_URL = f'{LOCAL_BASE_URL}/api/companies'
+USERS_URL = f'{LOCAL_BASE_URL}/api/users'
+POST_BODY = b'{"first_name": "Benchmark"}'
+HEADERS = {"Content-Type": "application/json"}
+ABSENT_USER_ID = 10 ** 9
+
+
+def client(base_url: str):
+    return lambda: (APIClient(base_url=base_url, session=APIClient.create_session()),)
+
+
+def raw_session():
+    return (APIClient.create_session(),)
+
+
+@BenchmarkRunner.register('client.get', setup=client(COMPANIES_URL), gate=False)
+def bench_client_get(api_client: APIClient):
+    api_client.get(path="/1")
+
+
+@BenchmarkRunner.register('client.post', setup=client(USERS_URL), gate=False)
+def bench_client_post(api_client: APIClient):
+    api_client.post(data=POST_BODY, headers=HEADERS)
+
+
+@BenchmarkRunner.register('client.delete', setup=client(USERS_URL), gate=False)
+def bench_client_delete(api_client: APIClient):
+    api_client.delete(path=f"/{ABSENT_USER_ID}")
+
+
+@BenchmarkRunner.register('raw.get', setup=raw_session, gate=False)
+def bench_raw_get(session):
+    session.get(f"{COMPANIES_URL}/1", allow_redirects=False).content
+
+
+@BenchmarkRunner.register('raw.post', setup=raw_session, gate=False)
+def bench_raw_post(session):
+    session.post(f"{USERS_URL}/", data=POST_BODY, headers=HEADERS, allow_redirects=False).content
+
+
+@BenchmarkRunner.register('raw.delete', setup=raw_session, gate=False)
+def bench_raw_delete(session):
+    session.delete(f"{USERS_URL}/{ABSENT_USER_ID}", allow_redirects=False).content
+
+
+for method in ('get', 'post', 'delete'):
+    BenchmarkRunner.register_overhead(f'overhead.{method}', f'client.{method}', f'raw.{method}')
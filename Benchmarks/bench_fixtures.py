@@ -0,0 +1,32 @@
+"""
+Бенчмарки подготовки тестовых данных для проекта API_tests_example: чтение CSV параметризации
+(в т.ч. через DataLoader) и построение companies_grouped_by_statuses (обход всех страниц /api/companies на эмуляторе)
+"""
+
+from Data.constants import LOCAL_BASE_URL
+from Helpers.api_client import APIClient
+from Helpers.benchmark import BenchmarkRunner
+from Helpers.data_loader import DataLoader
+from Helpers.helpers import Helpers
+
+
+@BenchmarkRunner.register('helpers.get_test_data_from_csv')
+def bench_get_test_data_from_csv():
+    Helpers.get_test_data_from_csv('company_statuses.csv')
+
+
+@BenchmarkRunner.register('data_loader.load_rows')
+def bench_data_loader_load_rows():
+    DataLoader.default().load('company_statuses.csv').rows()
+
+
+@BenchmarkRunner.register('data_loader.convert', setup=lambda: (DataLoader(),))
+def bench_data_loader_convert(loader: DataLoader):
+    loader.convert('company_statuses.csv')
+
+
+@BenchmarkRunner.register('fixtures.companies_grouped_by_statuses',
+                          setup=lambda: (APIClient(base_url=f'{LOCAL_BASE_URL}/api/companies',
+                                                   session=APIClient.create_session()),))
+def bench_companies_grouped_by_statuses(api_client: APIClient):
+    Helpers.group_companies_by_statuses(api_client.paginate())
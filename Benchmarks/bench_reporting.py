@@ -0,0 +1,36 @@
+"""
+Бенчмарки записи результатов Allure для проекта API_tests_example: время в потоке теста на результат с вложением
+тела ответа при синхронной записи allure-pytest и при буферизованной записи фоновым потоком
+"""
+
+import tempfile
+import uuid
+
+from allure_commons.logger import AllureFileLogger
+from allure_commons.model2 import TestResult, Attachment, Status
+
+from Helpers.allure_reporting import BufferedAllureFileLogger
+from Helpers.benchmark import BenchmarkRunner
+
+# Тело ответа /api/companies, которое прикладывается к результату каждого теста
+BODY = ('{"data": [' + ','.join(['{"company_id": 1, "company_name": "Company", "company_status": "ACTIVE"}'] * 50)
+        + '], "meta": {"limit": 50, "offset": 0, "total": 7}}').encode('utf-8')
+
+
+def report(file_logger):
+    file_name = f'{uuid.uuid4()}-attachment.json'
+    file_logger.report_attached_data(body=BODY, file_name=file_name)
+    result = TestResult(uuid=str(uuid.uuid4()), name='test', fullName='bench::test', status=Status.PASSED,
+                        attachments=[Attachment(name='body', source=file_name, type='application/json')])
+    file_logger.report_result(result)
+
+
+@BenchmarkRunner.register('allure.report_result', setup=lambda: (AllureFileLogger(tempfile.mkdtemp()),))
+def bench_allure_file_logger(file_logger: AllureFileLogger):
+    report(file_logger)
+
+
+@BenchmarkRunner.register('allure.report_result_buffered',
+                          setup=lambda: (BufferedAllureFileLogger(tempfile.mkdtemp()),))
+def bench_buffered_allure_file_logger(file_logger: BufferedAllureFileLogger):
+    report(file_logger)
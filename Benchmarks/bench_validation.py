@@ -0,0 +1,47 @@
+"""
+Бенчмарки проверок ответа для проекта API_tests_example: BaseStatusHeadersSchemaTests.test_status_headers_schema
+по каждой схеме, включая разбор тела (ответ запрашивается у эмулятора один раз, разбор не кэшируется между вызовами)
+"""
+
+import copy
+
+from Data import json_schemas
+from Data.constants import LOCAL_BASE_URL
+from Helpers.api_client import APIClient
+from Helpers.benchmark import BenchmarkRunner
+from Tests.base_tests import BaseStatusHeadersSchemaTests
+
+# схема -> (метод, путь запроса, тело, ожидаемый код)
+CASES = {
+    'COMPANIES_MAIN': ('get', '/api/companies/', None, 200),
+    'COMPANY_BY_ID': ('get', '/api/companies/1', None, 200),
+    'USERS_MAIN': ('get', '/api/users/', None, 200),
+    'USER_BY_ID': ('get', '/api/users/1', None, 200),
+    'USER_CREATED': ('post', '/api/users/', b'{"first_name": "Benchmark", "last_name": "Benchmark"}', 201),
+    'NOT_FOUND_404': ('get', '/api/companies/0', None, 404),
+    'UNPROCESSABLE_ENTITY_422': ('get', '/api/companies/ABC', None, 422),
+}
+
+
+def response_for(schema_name: str):
+    def setup():
+        method, path, body, code = CASES[schema_name]
+        api_client = APIClient(base_url=LOCAL_BASE_URL, session=APIClient.create_session())
+        if method == 'post':
+            response = api_client.post(path=path, data=body, headers={"Content-Type": "application/json"})
+            api_client.delete(path=f"/api/users/{response.json()['user_id']}")
+        else:
+            response = api_client.get(path=path)
+        assert response.status_code == code, f"{method.upper()} {path}: {response.status_code} вместо {code}"
+        return response, getattr(json_schemas, schema_name), code
+    return setup
+
+
+def bench_status_headers_schema(response, schema: dict, code: int):
+    response = copy.copy(response)
+    response.__dict__.pop('_parsed_json', None)  # тело разбирается заново, как в каждом тесте
+    BaseStatusHeadersSchemaTests(response, schema, code).test_status_headers_schema()
+
+
+for name in CASES:
+    BenchmarkRunner.register(f'status_headers_schema.{name}', setup=response_for(name))(bench_status_headers_schema)
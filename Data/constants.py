@@ -1,17 +1,158 @@
 """Константы проекта API_tests_example"""
 
+import os
+from pathlib import Path
+
 # region URLs
-BASE_URL = 'https://send-request.me'
+# Цель запросов: remote - https://send-request.me, local - локальный эмулятор (Helpers/local_api_server.py)
+API_TARGET = os.getenv('API_TARGET', 'remote')
+LOCAL_API_HOST = os.getenv('LOCAL_API_HOST', '127.0.0.1')
+LOCAL_API_PORT = int(os.getenv('LOCAL_API_PORT', 8000))
+LOCAL_API_REDIRECT_PORT = int(os.getenv('LOCAL_API_REDIRECT_PORT', 8001))  # эмулирует HTTP -> HTTPS 301
+LOCAL_BASE_URL = f'http://{LOCAL_API_HOST}:{LOCAL_API_PORT}'
+
+if API_TARGET == 'local':
+    BASE_URL = LOCAL_BASE_URL
+    BASE_URL_HTTP = f'http://{LOCAL_API_HOST}:{LOCAL_API_REDIRECT_PORT}'
+else:
+    BASE_URL = 'https://send-request.me'
+    BASE_URL_HTTP = 'http://send-request.me'
 
 BASE_URL_COMPANIES = f'{BASE_URL}/api/companies'
-BASE_URL_COMPANIES_HTTP = 'http://send-request.me/api/companies'
+BASE_URL_COMPANIES_HTTP = f'{BASE_URL_HTTP}/api/companies'
 
 BASE_URL_USERS = f'{BASE_URL}/api/users'
-BASE_URL_USERS_HTTP = 'http://send-request.me/api/users'
+BASE_URL_USERS_HTTP = f'{BASE_URL_HTTP}/api/users'
 
 # endregion URLs
 
+# region HTTP
+# Параметры пула keep-alive соединений общей HTTP-сессии (переопределяются переменными окружения)
+HTTP_POOL_CONNECTIONS = int(os.getenv('API_HTTP_POOL_CONNECTIONS', 4))  # число кэшируемых пулов (по хостам)
+HTTP_POOL_MAXSIZE = int(os.getenv('API_HTTP_POOL_MAXSIZE', 10))  # число соединений в пуле одного хоста
+HTTP_MAX_RETRIES = int(os.getenv('API_HTTP_MAX_RETRIES', 0))  # повторы на уровне соединения
+HTTP_POOL_BLOCK = os.getenv('API_HTTP_POOL_BLOCK', '0') == '1'  # ждать свободное соединение при исчерпании пула
+# HTTP/2 для https:// (Helpers/http2_transport.py, нужны httpx и h2); без них или при отказе сервера - HTTP/1.1
+HTTP2_ENABLED = os.getenv('API_HTTP2', '0') == '1'
+# Лимит одновременных запросов AsyncAPIClient; больше размера пула не имеет смысла
+ASYNC_MAX_CONCURRENCY = int(os.getenv('API_ASYNC_MAX_CONCURRENCY', HTTP_POOL_MAXSIZE))
+
+# Политика таймаутов и повторов (Helpers/retry_policy.py)
+RETRY_MAX_ATTEMPTS = int(os.getenv('API_RETRY_MAX_ATTEMPTS', 3))
+RETRY_BASE_DELAY = float(os.getenv('API_RETRY_BASE_DELAY', 0.1))  # с, база экспоненциальной задержки
+RETRY_MAX_DELAY = float(os.getenv('API_RETRY_MAX_DELAY', 1.0))  # с
+RETRY_BUDGET_RATIO = float(os.getenv('API_RETRY_BUDGET_RATIO', 0.2))  # повторов на один запрос в среднем
+RETRY_BUDGET_CAPACITY = float(os.getenv('API_RETRY_BUDGET_CAPACITY', 10))  # запас повторов
+TIMEOUT_PERCENTILE = float(os.getenv('API_TIMEOUT_PERCENTILE', 99))
+TIMEOUT_MULTIPLIER = float(os.getenv('API_TIMEOUT_MULTIPLIER', 3))
+TIMEOUT_MIN = float(os.getenv('API_TIMEOUT_MIN', 0.2))  # с
+TIMEOUT_MAX = float(os.getenv('API_TIMEOUT_MAX', 5))  # с
+TIMEOUT_MIN_SAMPLES = int(os.getenv('API_TIMEOUT_MIN_SAMPLES', 20))  # замеров до перехода на адаптивный таймаут
+DEFAULT_TIMEOUTS = {'GET': 0.5, 'POST': 1, 'DELETE': 0.5}  # с, пока замеров мало
+
+# Постраничный обход списков (Helpers/paginator.py)
+PAGINATION_PAGE_SIZE = int(os.getenv('API_PAGINATION_PAGE_SIZE', 10))  # начальный размер страницы
+PAGINATION_MAX_PAGE_SIZE = int(os.getenv('API_PAGINATION_MAX_PAGE_SIZE', 100))
+PAGINATION_TARGET_PAGE_TIME = float(os.getenv('API_PAGINATION_TARGET_PAGE_TIME', 0.2))  # с на страницу
+PAGINATION_STREAM_CHUNK_SIZE = 16 * 1024  # байт, чтение тела страницы в потоковом режиме
+
+# Объединение одинаковых GET-запросов и кэш ответов (Helpers/request_coalescer.py); по умолчанию выключено
+COALESCE_ENABLED = os.getenv('API_COALESCE', '0') == '1'
+COALESCE_TTL = float(os.getenv('API_COALESCE_TTL', 1.0))  # с, 0 - только объединение одновременных запросов
+COALESCE_MAX_ENTRIES = int(os.getenv('API_COALESCE_MAX_ENTRIES', 1024))
+
+# endregion HTTP
+
+# region Latency budgets
+# Бюджеты времени ответа (с) по эндпойнтам (метка Helpers.get_endpoint_label): max - для каждого ответа,
+# p95 - по всем ответам эндпойнта за прогон. Проверяются в BaseStatusHeadersSchemaTests (Helpers/latency.py).
+# По умолчанию включены только для локального эмулятора: время ответа удаленного API от тестов не зависит
+LATENCY_BUDGETS_ENABLED = os.getenv('API_LATENCY_BUDGETS', '1' if API_TARGET == 'local' else '0') != '0'
+# Мягкая проверка max в каждом тесте; без нее max проверяется только у тестов с latency_budget={'max': ...}
+LATENCY_BUDGET_CHECK_MAX = os.getenv('API_LATENCY_BUDGET_CHECK_MAX', '0') == '1'
+LATENCY_BUDGET_SCALE = float(os.getenv('API_LATENCY_BUDGET_SCALE', 1))  # множитель бюджетов (медленное окружение)
+LATENCY_BUDGET_MIN_SAMPLES = int(os.getenv('API_LATENCY_BUDGET_MIN_SAMPLES', 20))  # ответов для проверки p95
+LATENCY_BUDGETS = {
+    'GET /api/companies': {'p95': 0.3, 'max': 0.5},
+    'GET /api/companies/{id}': {'p95': 0.3, 'max': 0.5},
+    'GET /api/users': {'p95': 0.3, 'max': 0.5},
+    'GET /api/users/{id}': {'p95': 0.3, 'max': 0.5},
+    'POST /api/users': {'p95': 0.5, 'max': 1},
+    'DELETE /api/users/{id}': {'p95': 0.3, 'max': 0.5},
+}
+
+# endregion Latency budgets
+
+# region Cassette
+# Режим кассеты APIClient: off - обычные запросы, record - запросы с записью ответов, replay - ответы из кассеты
+CASSETTE_MODE = os.getenv('API_CASSETTE_MODE', 'off')
+CASSETTE_PATH = os.getenv('API_CASSETTE_PATH',
+                          str(Path(__file__).parent.joinpath('cassettes').joinpath('send-request.cassette')))
+
+# endregion Cassette
+
+# region Fixture cache
+# Общий для воркеров xdist кеш ответов фикстур (Helpers/fixture_cache.py)
+FIXTURE_CACHE_ENABLED = os.getenv('API_FIXTURE_CACHE', '1') != '0'
+FIXTURE_CACHE_USERS_TTL = float(os.getenv('API_FIXTURE_CACHE_USERS_TTL', 30))  # с, пользователи меняются тестами
+
+# endregion Fixture cache
+
+# region Allure
+# Буферизованная запись результатов Allure фоновым потоком (Helpers/allure_reporting.py), 0 - запись allure-pytest
+ALLURE_BUFFERED = os.getenv('API_ALLURE_BUFFERED', '1') != '0'
+ALLURE_BUFFER_MAX_BYTES = int(os.getenv('API_ALLURE_BUFFER_MAX_BYTES', 16 * 1024 * 1024))  # байт в памяти
+ALLURE_FLUSH_INTERVAL = float(os.getenv('API_ALLURE_FLUSH_INTERVAL', 0.5))  # с между записями пакетов
+ALLURE_DEDUP_MAX_ENTRIES = int(os.getenv('API_ALLURE_DEDUP_MAX_ENTRIES', 4096))  # хэшей вложений для дедупликации
+
+# endregion Allure
+
+# region Result store
+# Хранилище результатов прогонов для трендов и поиска регрессий (Helpers/result_store.py), 0 - не записывать
+RESULT_STORE_ENABLED = os.getenv('API_RESULT_STORE', '1') != '0'
+RESULT_STORE_PATH = os.getenv('API_RESULT_STORE_PATH',
+                              str(Path(__file__).parents[1].joinpath('.results').joinpath('results.sqlite')))
+RESULT_STORE_RUNS = int(os.getenv('API_RESULT_STORE_RUNS', 30))  # прогонов в тренде по умолчанию
+RESULT_STORE_THRESHOLD = float(os.getenv('API_RESULT_STORE_THRESHOLD', 0.2))  # допустимый рост метрики (доля)
+
+# endregion Result store
+
+# region Fuzz
+# Граничные и невалидные запросы, сгенерированные по JSON-схемам (Helpers/fuzz.py)
+# Tests/test_fuzz.py выполняется только при API_FUZZ=1: тысячи запросов, в т.ч. создание пользователей
+FUZZ_ENABLED = os.getenv('API_FUZZ', '0') == '1'
+# Случаев на эндпойнт: для общего учебного ресурса - немного, для локального эмулятора - тысяча
+FUZZ_CASES_PER_ENDPOINT = int(os.getenv('API_FUZZ_CASES', 1000 if API_TARGET == 'local' else 50))
+FUZZ_CONCURRENCY = int(os.getenv('API_FUZZ_CONCURRENCY', HTTP_POOL_MAXSIZE))
+# Ограничение интенсивности запросов, 0 - без ограничения (по умолчанию для локального эмулятора)
+FUZZ_RPS = float(os.getenv('API_FUZZ_RPS', 0 if API_TARGET == 'local' else 50))
+FUZZ_SEED = int(os.getenv('API_FUZZ_SEED', 0))
+FUZZ_SHRINK_STEPS = int(os.getenv('API_FUZZ_SHRINK_STEPS', 100))  # запросов на минимизацию одного упавшего случая
+FUZZ_MAX_VALID_LENGTH = 100  # строка длиннее заведомо валидной - граничный случай
+FUZZ_MAX_LENGTH = 5000  # строка длиннее - заведомо невалидна (ср. тест с текстом в 1000 слов)
+
+# endregion Fuzz
+
 # region Misc
 FAKER_LOCALES = ['ru_RU', 'en_US']
+USER_POOL_BATCH_SIZE = int(os.getenv('API_USER_POOL_BATCH_SIZE', 5))  # пользователей в пакете пула UserFactory
+# Корпус тел запросов на создание пользователя (Helpers/payload_corpus.py)
+PAYLOAD_CORPUS_PATH = os.getenv('API_PAYLOAD_CORPUS_PATH',
+                                str(Path(__file__).parent.joinpath('payloads').joinpath('users.corpus')))
+PAYLOAD_CORPUS_SEED = int(os.getenv('API_PAYLOAD_CORPUS_SEED', 0))
+PAYLOAD_CORPUS_SIZE = int(os.getenv('API_PAYLOAD_CORPUS_SIZE', 128))  # вариантов каждого вида
+# Тестовые данные (Helpers/data_loader.py) и кеш их колоночного представления
+DATA_DIR = str(Path(__file__).parent)
+DATA_CACHE_DIR = os.getenv('API_DATA_CACHE_DIR', str(Path(__file__).parent.joinpath('cache')))
 
 # endregion Misc
+
+# region Benchmarks
+# Бенчмарки обвязки (Benchmarks/, запуск: python -m Helpers.benchmark)
+BENCHMARK_BASELINE_PATH = os.getenv('API_BENCHMARK_BASELINE',
+                                    str(Path(__file__).parents[1].joinpath('.benchmarks').joinpath('baseline.json')))
+BENCHMARK_THRESHOLD = float(os.getenv('API_BENCHMARK_THRESHOLD', 0.2))  # допустимое замедление минимума (доля)
+BENCHMARK_MIN_TIME = float(os.getenv('API_BENCHMARK_MIN_TIME', 0.1))  # с, минимальная длительность одного замера
+BENCHMARK_REPEAT = int(os.getenv('API_BENCHMARK_REPEAT', 7))  # замеров каждого бенчмарка
+
+# endregion Benchmarks
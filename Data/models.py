@@ -0,0 +1,211 @@
+"""
+Модели ответов API проекта API_tests_example.
+Сгенерировано Helpers/model_codegen.py из Data/json_schemas.py - не редактировать вручную
+"""
+
+from Helpers.model_base import Model, check_type, check_list, check_required, check_one_of_required
+
+
+class CompaniesMainDataDescriptionLang(Model):
+    __slots__ = ('translation_lang', 'translation')
+
+    @classmethod
+    def from_json(cls, value, path='$'):
+        check_type(value, ('object',), path)
+        check_required(value, ('translation_lang', 'translation'), path)
+        self = cls.__new__(cls)
+        self.translation_lang = check_type(value['translation_lang'], ('string',), path + '.translation_lang')
+        self.translation = check_type(value['translation'], ('string',), path + '.translation')
+        return self
+
+
+class CompaniesMainData(Model):
+    __slots__ = ('company_id', 'company_name', 'company_address', 'company_status', 'description', 'description_lang')
+
+    @classmethod
+    def from_json(cls, value, path='$'):
+        check_type(value, ('object',), path)
+        check_required(value, ('company_id', 'company_name', 'company_address', 'company_status'), path)
+        self = cls.__new__(cls)
+        self.company_id = check_type(value['company_id'], ('integer',), path + '.company_id')
+        self.company_name = check_type(value['company_name'], ('string',), path + '.company_name')
+        self.company_address = check_type(value['company_address'], ('string',), path + '.company_address')
+        self.company_status = check_type(value['company_status'], ('string',), path + '.company_status',
+                                         ('ACTIVE', 'CLOSED', 'BANKRUPT'))
+        self.description = None
+        if 'description' in value:
+            self.description = check_type(value['description'], ('string',), path + '.description')
+        self.description_lang = None
+        if 'description_lang' in value:
+            self.description_lang = check_list(value['description_lang'], path + '.description_lang',
+                                               CompaniesMainDataDescriptionLang.from_json)
+        return self
+
+
+class CompaniesMainMeta(Model):
+    __slots__ = ('limit', 'offset', 'total')
+
+    @classmethod
+    def from_json(cls, value, path='$'):
+        check_type(value, ('object',), path)
+        check_required(value, ('total',), path)
+        self = cls.__new__(cls)
+        self.limit = None
+        if 'limit' in value:
+            self.limit = check_type(value['limit'], ('integer',), path + '.limit')
+        self.offset = None
+        if 'offset' in value:
+            self.offset = check_type(value['offset'], ('integer',), path + '.offset')
+        self.total = check_type(value['total'], ('integer',), path + '.total')
+        return self
+
+
+class CompaniesMain(Model):
+    __slots__ = ('data', 'meta')
+
+    @classmethod
+    def from_json(cls, value, path='$'):
+        check_type(value, ('object',), path)
+        check_required(value, ('data', 'meta'), path)
+        self = cls.__new__(cls)
+        self.data = check_list(value['data'], path + '.data', CompaniesMainData.from_json)
+        self.meta = CompaniesMainMeta.from_json(value['meta'], path + '.meta')
+        return self
+
+
+class CompanyByIdDescriptionLang(Model):
+    __slots__ = ('translation_lang', 'translation')
+
+    @classmethod
+    def from_json(cls, value, path='$'):
+        check_type(value, ('object',), path)
+        check_required(value, ('translation_lang', 'translation'), path)
+        self = cls.__new__(cls)
+        self.translation_lang = check_type(value['translation_lang'], ('string',), path + '.translation_lang',
+                                           ('EN', 'RU', 'PL', 'UA'))
+        self.translation = check_type(value['translation'], ('string',), path + '.translation')
+        return self
+
+
+class CompanyById(Model):
+    __slots__ = ('company_id', 'company_name', 'company_address', 'company_status', 'description_lang', 'description')
+
+    @classmethod
+    def from_json(cls, value, path='$'):
+        check_type(value, ('object',), path)
+        check_required(value, ('company_id', 'company_name', 'company_address', 'company_status'), path)
+        check_one_of_required(value, (('description',), ('description_lang',)), path)
+        self = cls.__new__(cls)
+        self.company_id = check_type(value['company_id'], ('integer',), path + '.company_id')
+        self.company_name = check_type(value['company_name'], ('string',), path + '.company_name')
+        self.company_address = check_type(value['company_address'], ('string',), path + '.company_address')
+        self.company_status = check_type(value['company_status'], ('string',), path + '.company_status',
+                                         ('ACTIVE', 'BANKRUPT', 'CLOSED'))
+        self.description_lang = None
+        if 'description_lang' in value:
+            self.description_lang = check_list(value['description_lang'], path + '.description_lang',
+                                               CompanyByIdDescriptionLang.from_json)
+        self.description = None
+        if 'description' in value:
+            self.description = value['description']
+        return self
+
+
+class UsersMainMeta(Model):
+    __slots__ = ('limit', 'offset', 'total')
+
+    @classmethod
+    def from_json(cls, value, path='$'):
+        check_type(value, ('object',), path)
+        check_required(value, ('total',), path)
+        self = cls.__new__(cls)
+        self.limit = None
+        if 'limit' in value:
+            self.limit = check_type(value['limit'], ('integer',), path + '.limit')
+        self.offset = None
+        if 'offset' in value:
+            self.offset = check_type(value['offset'], ('integer',), path + '.offset')
+        self.total = check_type(value['total'], ('integer',), path + '.total')
+        return self
+
+
+class UsersMainData(Model):
+    __slots__ = ('first_name', 'last_name', 'company_id', 'user_id')
+
+    @classmethod
+    def from_json(cls, value, path='$'):
+        check_type(value, ('object',), path)
+        check_required(value, ('last_name', 'user_id'), path)
+        self = cls.__new__(cls)
+        self.first_name = None
+        if 'first_name' in value:
+            self.first_name = check_type(value['first_name'], ('string', 'null'), path + '.first_name')
+        self.last_name = check_type(value['last_name'], ('string',), path + '.last_name')
+        self.company_id = None
+        if 'company_id' in value:
+            self.company_id = check_type(value['company_id'], ('integer', 'null'), path + '.company_id')
+        self.user_id = check_type(value['user_id'], ('integer',), path + '.user_id')
+        return self
+
+
+class UsersMain(Model):
+    __slots__ = ('meta', 'data')
+
+    @classmethod
+    def from_json(cls, value, path='$'):
+        check_type(value, ('object',), path)
+        check_required(value, ('meta', 'data'), path)
+        self = cls.__new__(cls)
+        self.meta = UsersMainMeta.from_json(value['meta'], path + '.meta')
+        self.data = check_list(value['data'], path + '.data', UsersMainData.from_json)
+        return self
+
+
+class UserById(Model):
+    __slots__ = ('first_name', 'last_name', 'company_id', 'user_id')
+
+    @classmethod
+    def from_json(cls, value, path='$'):
+        check_type(value, ('object',), path)
+        check_required(value, ('first_name', 'last_name', 'company_id', 'user_id'), path)
+        self = cls.__new__(cls)
+        self.first_name = check_type(value['first_name'], ('string', 'null'), path + '.first_name')
+        self.last_name = check_type(value['last_name'], ('string',), path + '.last_name')
+        self.company_id = check_type(value['company_id'], ('integer', 'null'), path + '.company_id')
+        self.user_id = check_type(value['user_id'], ('integer',), path + '.user_id')
+        return self
+
+
+class UserCreated(Model):
+    __slots__ = ('first_name', 'last_name', 'company_id', 'user_id')
+
+    @classmethod
+    def from_json(cls, value, path='$'):
+        check_type(value, ('object',), path)
+        check_required(value, ('first_name', 'last_name', 'company_id', 'user_id'), path)
+        self = cls.__new__(cls)
+        self.first_name = check_type(value['first_name'], ('string', 'null'), path + '.first_name')
+        self.last_name = check_type(value['last_name'], ('string',), path + '.last_name')
+        self.company_id = check_type(value['company_id'], ('integer', 'null'), path + '.company_id')
+        self.user_id = check_type(value['user_id'], ('integer',), path + '.user_id')
+        return self
+
+
+# Модели по именам схем Data/json_schemas.py
+MODELS = {
+    'COMPANIES_MAIN': CompaniesMain,
+    'COMPANY_BY_ID': CompanyById,
+    'USERS_MAIN': UsersMain,
+    'USER_BY_ID': UserById,
+    'USER_CREATED': UserCreated,
+}
+
+
+# Хэши схем, из которых сгенерированы модели: модель устаревшей схемы не используется
+SCHEMA_HASHES = {
+    'COMPANIES_MAIN': 'cbe72571a0931153',
+    'COMPANY_BY_ID': '50104cfd8fb65e8c',
+    'USERS_MAIN': '3272148377a37f78',
+    'USER_BY_ID': 'a02ed41094e2b6cf',
+    'USER_CREATED': 'a02ed41094e2b6cf',
+}
@@ -0,0 +1,226 @@
+"""Отчеты уровня прогона и буферизованная запись результатов Allure для проекта API_tests_example"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+
+import allure_commons
+from allure_commons import hookimpl
+from allure_commons.logger import AllureFileLogger
+from allure_commons.model2 import TestResult, Attachment, Label, Status, StatusDetails
+from allure_commons.types import AttachmentType, LabelType
+from attr import asdict
+
+from Data.constants import ALLURE_BUFFER_MAX_BYTES, ALLURE_FLUSH_INTERVAL, ALLURE_DEDUP_MAX_ENTRIES
+
+logger = logging.getLogger(__name__)
+
+# Категории дефектов отчета (categories.json): сообщение проверяется на совпадение целиком, (?s) - с переводами строк
+CATEGORIES = [
+    {'name': "Систематическое превышение бюджета латентности", 'matchedStatuses': ['failed'],
+     'messageRegex': '(?s).*Бюджет латентности p95 превышен.*'},
+    {'name': "Превышение бюджета латентности", 'matchedStatuses': ['failed'],
+     'messageRegex': '(?s).*Превышен бюджет латентности.*'},
+]
+
+
+def _allure_enabled() -> bool:
+    """Формируется ли отчет Allure (задан --alluredir)"""
+    return any(isinstance(plugin, (AllureFileLogger, BufferedAllureFileLogger))
+               for plugin in allure_commons.plugin_manager.get_plugins())
+
+
+def report_run_artifacts(name: str, attachments: list, parent_suite: str = "Прогон тестов",
+                         status: str = Status.PASSED, message: str = None):
+    """
+    Добавляет в отчет Allure отдельный результат с вложениями уровня прогона (например, сводкой латентности),
+    которые нельзя прикрепить к конкретному тесту. attachments - список (имя, содержимое, AttachmentType).
+    Результат с проблемой уровня прогона передается со status=Status.FAILED и сообщением message.
+    Ничего не делает, если отчет Allure не формируется (не задан --alluredir)
+    """
+    if not _allure_enabled():
+        return
+    now = int(time.time() * 1000)
+    result = TestResult(uuid=str(uuid.uuid4()), name=name, fullName=f"{parent_suite}: {name}",
+                        historyId=name, status=status, start=now, stop=now,
+                        labels=[Label(name=LabelType.PARENT_SUITE, value=parent_suite)])
+    if message is not None:
+        result.statusDetails = StatusDetails(message=message)
+    for attachment_name, body, attachment_type in attachments:
+        file_name = f"{uuid.uuid4()}-attachment.{attachment_type.extension}"
+        allure_commons.plugin_manager.hook.report_attached_data(body=body, file_name=file_name)
+        result.attachments.append(Attachment(name=attachment_name, source=file_name,
+                                             type=attachment_type.mime_type))
+    allure_commons.plugin_manager.hook.report_result(result=result)
+
+
+def report_categories(categories: list = CATEGORIES):
+    """Записывает категории дефектов проекта в categories.json каталога результатов Allure"""
+    if not _allure_enabled():
+        return
+    body = json.dumps(categories, ensure_ascii=False, indent=2).encode('utf-8')
+    allure_commons.plugin_manager.hook.report_attached_data(body=body, file_name='categories.json')
+
+
+class BufferedAllureFileLogger:
+    """
+    Замена AllureFileLogger из allure-pytest: результаты, контейнеры и вложения сериализуются в потоке теста
+    в буфер в памяти, а в файлы их записывает фоновый поток пакетами - раз в flush_interval секунд или при
+    заполнении половины буфера. Объем буфера ограничен max_bytes: если он заполнен, поток теста ждет записи.
+    Вложения записываются в файлы по хэшу содержимого: одинаковые вложения (например, тела ответов /api/companies)
+    записываются один раз, а результаты ссылаются на общий файл. Для дедупликации хранятся хэши max_entries
+    последних вложений (LRU): более давний повтор записывается в тот же файл еще раз
+    """
+
+    def __init__(self, report_dir, max_bytes=ALLURE_BUFFER_MAX_BYTES, flush_interval=ALLURE_FLUSH_INTERVAL,
+                 max_entries=ALLURE_DEDUP_MAX_ENTRIES):
+        self.report_dir = Path(report_dir)
+        self.report_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.max_entries = max_entries
+        self.stats = {'files': 0, 'bytes': 0, 'batches': 0, 'deduplicated': 0}
+        self._pending = []  # (имя файла, содержимое) в порядке поступления
+        self._pending_bytes = 0  # в т.ч. записываемый пакет: память освобождается после записи
+        self._sources = {}  # имя вложения, выданное allure -> имя файла по хэшу; до записи ссылающегося результата
+        self._attachments = OrderedDict()  # имена файлов по хэшу содержимого, последние max_entries
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='allure-writer', daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def install(cls, config):
+        """
+        Заменяет AllureFileLogger, зарегистрированный allure-pytest при --alluredir (вызывать после его
+        pytest_configure). По окончании прогона дописывает буфер; возвращает логгер или None без --alluredir
+        """
+        plugin_manager = allure_commons.plugin_manager
+        file_logger = next((plugin for plugin in plugin_manager.get_plugins()
+                            if isinstance(plugin, AllureFileLogger)), None)
+        if file_logger is None:
+            return None
+        name = plugin_manager.get_name(file_logger)
+        buffered = cls(file_logger._report_dir)
+        plugin_manager.unregister(file_logger)
+        plugin_manager.register(buffered)
+
+        def close():
+            buffered.close()
+            plugin_manager.unregister(buffered)
+            # Очистка allure-pytest (выполняется после этой) снимает с регистрации свой логгер по объекту
+            plugin_manager.register(file_logger, name)
+
+        config.add_cleanup(close)
+        return buffered
+
+    # region Буфер
+    def _enqueue(self, file_name: str, data: bytes):
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Запись в закрытый отчет Allure")
+            while self._pending_bytes and self._pending_bytes + len(data) > self.max_bytes:
+                self._condition.notify_all()
+                self._condition.wait()
+            self._pending.append((file_name, data))
+            self._pending_bytes += len(data)
+            if self._pending_bytes >= self.max_bytes // 2:
+                self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._closed and self._pending_bytes < self.max_bytes // 2:
+                    self._condition.wait(self.flush_interval)
+                batch, self._pending = self._pending, []
+                closed = self._closed
+            self._write(batch)
+            with self._condition:
+                self._pending_bytes -= sum(len(data) for _, data in batch)
+                self._condition.notify_all()
+            if closed and not batch:
+                return
+
+    def _write(self, batch: list):
+        for file_name, data in batch:
+            try:
+                self.report_dir.joinpath(file_name).write_bytes(data)
+            except OSError:
+                logger.exception("Не записан файл отчета Allure %s", file_name)
+                continue
+            self.stats['files'] += 1
+            self.stats['bytes'] += len(data)
+        if batch:
+            self.stats['batches'] += 1
+
+    def close(self):
+        """Дописывает буфер и останавливает фоновый поток"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        logger.info("Отчет Allure: записано файлов %(files)s (%(bytes)s байт) пакетами: %(batches)s, "
+                    "повторных вложений не записано: %(deduplicated)s", self.stats)
+    # endregion Буфер
+
+    def _rewrite_sources(self, value):
+        """
+        Заменяет в сериализованном результате имена вложений на имена файлов по хэшу содержимого;
+        на каждое вложение ссылается один результат, поэтому соответствие после замены удаляется
+        """
+        if isinstance(value, dict):
+            for key, item in value.items():
+                if key == 'attachments':
+                    for attachment in item:
+                        with self._condition:
+                            attachment['source'] = self._sources.pop(attachment['source'], attachment['source'])
+                else:
+                    self._rewrite_sources(item)
+        elif isinstance(value, list):
+            for item in value:
+                self._rewrite_sources(item)
+
+    def _report_item(self, item):
+        data = asdict(item, filter=lambda attr, value: not (type(value) != bool and not bool(value)))
+        self._rewrite_sources(data)
+        self._enqueue(item.file_pattern.format(prefix=uuid.uuid4()),
+                      json.dumps(data, ensure_ascii=False).encode('utf-8'))
+
+    # region Хуки allure
+    @hookimpl
+    def report_result(self, result):
+        self._report_item(result)
+
+    @hookimpl
+    def report_container(self, container):
+        self._report_item(container)
+
+    @hookimpl
+    def report_attached_file(self, source, file_name):
+        self.report_attached_data(Path(source).read_bytes(), file_name)
+
+    @hookimpl
+    def report_attached_data(self, body, file_name):
+        data = body.encode('utf-8') if isinstance(body, str) else body
+        if '-attachment' not in file_name:  # файл с заданным именем (например, categories.json)
+            self._enqueue(file_name, data)
+            return
+        content_name = f"{hashlib.blake2b(data, digest_size=16).hexdigest()}-attachment" \
+                       f"{file_name.split('-attachment', 1)[1]}"
+        with self._condition:
+            self._sources[file_name] = content_name
+            duplicate = content_name in self._attachments
+            self._attachments[content_name] = None
+            self._attachments.move_to_end(content_name)
+            if len(self._attachments) > self.max_entries:
+                self._attachments.popitem(last=False)
+            if duplicate:
+                self.stats['deduplicated'] += 1
+        if not duplicate:
+            self._enqueue(content_name, data)
+    # endregion Хуки allure
@@ -1,34 +1,273 @@
 """API-клиент для проекта API_tests_example"""
 
+import logging
+import socket
+import threading
+import time
+
 import requests
-from tenacity import retry, wait_fixed, stop_after_attempt, retry_if_exception_type
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from Data.constants import HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_MAX_RETRIES, HTTP_POOL_BLOCK, HTTP2_ENABLED
+from Helpers import latency
+from Helpers.api_response import APIResponse
+from Helpers.cassette import Cassette
+from Helpers.helpers import Helpers
+from Helpers.http2_transport import HTTP2Adapter
+from Helpers.paginator import Paginator
+from Helpers.request_coalescer import RequestCoalescer
+from Helpers.retry_policy import RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+
+class _TimedConnectionMixin:
+    """Замеряет разрешение имени и установку TCP-соединения, если в потоке ведется замер запроса"""
+
+    def _new_conn(self):
+        timing = latency.current_request_timing()
+        if timing is None:
+            return super()._new_conn()
+        host = self._dns_host
+        start = time.perf_counter()
+        try:
+            address = socket.getaddrinfo(host, self.port, type=socket.SOCK_STREAM)[0][4][0]
+        except OSError:
+            address = host  # ошибку разрешения имени сформирует urllib3
+        resolved = time.perf_counter()
+        self._dns_host = address
+        try:
+            return super()._new_conn()
+        finally:
+            self._dns_host = host
+            timing['dns'] += resolved - start
+            timing['connect'] += time.perf_counter() - resolved
+            timing['new_connections'] += 1
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    """Дополнительно замеряет TLS-рукопожатие"""
+
+    def connect(self):
+        timing = latency.current_request_timing()
+        if timing is None:
+            return super().connect()
+        before = timing['dns'] + timing['connect']
+        start = time.perf_counter()
+        super().connect()
+        handshake = time.perf_counter() - start - (timing['dns'] + timing['connect'] - before)
+        timing['tls'] = (timing['tls'] or 0.0) + handshake
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter с пулом keep-alive соединений, который ведет учет новых и переиспользованных соединений
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._lock = threading.Lock()
+        # Статистика пулов, уже вытесненных из PoolManager или закрытых
+        self._retired_connections = 0
+        self._retired_requests = 0
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        """Создает PoolManager и запоминает статистику пулов перед их закрытием"""
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': TimedHTTPConnectionPool,
+                                                   'https': TimedHTTPSConnectionPool}
+        dispose = self.poolmanager.pools.dispose_func
+
+        def dispose_with_stats(pool):
+            with self._lock:
+                self._retired_connections += pool.num_connections
+                self._retired_requests += pool.num_requests
+            if dispose is not None:
+                dispose(pool)
+
+        self.poolmanager.pools.dispose_func = dispose_with_stats
+
+    def connection_stats(self) -> dict:
+        """Возвращает число новых и переиспользованных соединений"""
+        with self._lock:
+            new, requests_sent = self._retired_connections, self._retired_requests
+            pools = [self.poolmanager.pools[key] for key in self.poolmanager.pools.keys()]
+        for pool in pools:
+            new += pool.num_connections
+            requests_sent += pool.num_requests
+        return {'new': new, 'reused': max(requests_sent - new, 0)}
 
 
 class APIClient:
     """
-    Клиент для работы с API. Инициализируется базовым url, на который пойдут запросы
+    Клиент для работы с API. Инициализируется базовым url, на который пойдут запросы.
+    Запросы отправляются через общую для процесса (воркера xdist) сессию с пулом keep-alive соединений,
+    если сессия не передана явно. Если включен режим кассеты (API_CASSETTE_MODE), ответы записываются
+    в кассету или берутся из нее без обращения к сети.
+    Таймауты и повторы определяет политика RetryPolicy (общая для процесса, если не передана явно);
+    явно переданный timeout имеет приоритет над адаптивным.
+    Если включено объединение запросов (API_COALESCE или явно переданный RequestCoalescer), одинаковые
+    одновременные GET-запросы выполняются одним обращением к сети, а POST/DELETE сбрасывают кэш ресурса.
+    При API_HTTP2=1 запросы на https:// идут по HTTP/2, если сервер его поддерживает (иначе по HTTP/1.1);
+    согласованный протокол - APIResponse.http_version.
+    Ответы возвращаются как APIResponse: тело разбирается из JSON один раз, быстрым декодером.
+    Хуки из APIClient.request_hooks вызываются после каждого вызова get/post/delete со словарем замеров:
+    метка эндпойнта, статус, фазы DNS/connect/TLS/TTFB/total (с), размер ответа, число повторов,
+    shared - ответ получен без обращения к сети (объединенный или из кэша)
     """
 
-    def __init__(self, base_url):
+    request_hooks = []
+    _shared_session = None
+    _shared_session_lock = threading.Lock()
+
+    def __init__(self, base_url, session: requests.Session = None, cassette: Cassette = None,
+                 policy: RetryPolicy = None, coalescer: RequestCoalescer = None):
         self.base_url = base_url
+        self.session = session if session is not None else APIClient.shared_session()
+        self.cassette = cassette if cassette is not None else Cassette.default()
+        self.policy = policy if policy is not None else RetryPolicy.default()
+        self.coalescer = coalescer if coalescer is not None else RequestCoalescer.default()
 
-    # Конкретно этот API иногда тормозит, поэтому реализован перезапуск
-    @retry(retry=retry_if_exception_type(requests.exceptions.Timeout), wait=wait_fixed(0.5),
-           reraise=True, stop=stop_after_attempt(3))
-    def get(self, path="/", params=None, headers=None, timeout=0.5, allow_redirects=False):
-        """Отправляет get-запрос на указанный адрес"""
-        return requests.get(url=f"{self.base_url}{path}",
-                            params=params, headers=headers,
-                            timeout=timeout, allow_redirects=allow_redirects)
-
-    def post(self, path="/", params=None, data=None, headers=None, timeout=1, allow_redirects=False):
-        """Отправляет post-запрос на указанный адрес"""
-        return requests.post(url=f"{self.base_url}{path}",
-                             params=params, data=data, headers=headers,
-                             timeout=timeout, allow_redirects=allow_redirects)
+    @staticmethod
+    def create_session(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE,
+                       max_retries=HTTP_MAX_RETRIES, pool_block=HTTP_POOL_BLOCK,
+                       http2=HTTP2_ENABLED) -> requests.Session:
+        """
+        Создает сессию с настроенным пулом соединений для http и https; при http2 запросы на https:// идут
+        через HTTP2Adapter (если httpx и h2 не установлены - по HTTP/1.1)
+        """
+        session = requests.Session()
+        adapter = CountingHTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                      max_retries=max_retries, pool_block=pool_block)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        if http2:
+            HTTP2Adapter.mount(session, max_connections=pool_maxsize)
+        return session
+
+    @classmethod
+    def shared_session(cls) -> requests.Session:
+        """Возвращает общую для процесса сессию, создавая ее при первом обращении"""
+        with cls._shared_session_lock:
+            if cls._shared_session is None:
+                cls._shared_session = cls.create_session()
+            return cls._shared_session
+
+    @classmethod
+    def close_shared_session(cls):
+        """Закрывает общую для процесса сессию и логирует статистику соединений"""
+        with cls._shared_session_lock:
+            session, cls._shared_session = cls._shared_session, None
+        if session is not None:
+            logger.info("Соединения HTTP-сессии: %s", cls.connection_stats(session))
+            policy = RetryPolicy.default()
+            logger.info("Повторы запросов: выполнено %s, отклонено бюджетом %s",
+                        policy.retries_done, policy.retries_denied)
+            coalescer = RequestCoalescer.default()
+            if coalescer is not None:
+                logger.info("Объединение запросов: обращений к сети %s, ответов без обращения к сети %s",
+                            coalescer.network_calls, coalescer.shared)
+            session.close()
+
+    @staticmethod
+    def connection_stats(session: requests.Session) -> dict:
+        """Возвращает суммарное по адаптерам сессии (HTTP/1.1 и HTTP/2) число новых и переиспользованных соединений"""
+        stats = {'new': 0, 'reused': 0}
+        for adapter in {id(a): a for a in session.adapters.values()}.values():
+            if isinstance(adapter, (CountingHTTPAdapter, HTTP2Adapter)):
+                for key, value in adapter.connection_stats().items():
+                    stats[key] += value
+        return stats
 
-    def delete(self, path="/", params=None, data=None, headers=None, timeout=0.5, allow_redirects=False):
+    def _request(self, method, path, timeout=None, retry_non_idempotent=False, **kwargs) -> APIResponse:
+        """Отправляет запрос с таймаутом и повторами по политике клиента и передает замеры хукам request_hooks"""
+        url = f"{self.base_url}{path}"
+        endpoint = Helpers.get_endpoint_label(method, url)
+        timing = latency.start_request_timing() if APIClient.request_hooks else None
+        start = time.perf_counter()
+        attempts, response, shared = 0, None, False
+
+        def send(attempt_timeout):
+            nonlocal attempts
+            attempts += 1
+            return self._send(method, url, timeout=attempt_timeout, **kwargs)
+
+        try:
+            if self.coalescer is None:
+                response = self.policy.execute(method, endpoint, send, timeout, retry_non_idempotent)
+            else:
+                response, shared = self.coalescer.execute(
+                    method, url, lambda: self.policy.execute(method, endpoint, send, timeout, retry_non_idempotent),
+                    **kwargs)
+            return response
+        except Exception as e:
+            if timing is not None:
+                timing['error'] = type(e).__name__
+            raise
+        finally:
+            if self.coalescer is not None and method not in RequestCoalescer.METHODS:
+                self.coalescer.invalidate(url)
+            if timing is not None:
+                latency.finish_request_timing()
+                timing.update(endpoint=endpoint, method=method, url=url, shared=shared,
+                              total=time.perf_counter() - start, retries=attempts - 1,
+                              status=response.status_code if response is not None else None,
+                              ttfb=response.elapsed.total_seconds() if response is not None else None,
+                              size=self._response_size(response))
+                for hook in APIClient.request_hooks:
+                    hook(timing)
+
+    @staticmethod
+    def _response_size(response: requests.Response) -> int:
+        """Возвращает размер тела ответа; потоковый ответ не читается целиком, размер берется из хедера"""
+        if response is None:
+            return 0
+        if not response._content_consumed:
+            return int(response.headers.get('Content-Length', 0))
+        return len(response.content)
+
+    def _send(self, method, url, **kwargs) -> APIResponse:
+        """Отправляет запрос через сессию клиента либо воспроизводит его из кассеты"""
+        if self.cassette is not None and self.cassette.mode == 'replay':
+            return APIResponse.from_response(self.cassette.replay(method, url, **kwargs))
+        response = APIResponse.from_response(self.session.request(method=method, url=url, **kwargs))
+        if self.cassette is not None and self.cassette.mode == 'record':
+            self.cassette.record(response, method, url, **kwargs)
+        return response
+
+    def get(self, path="/", params=None, headers=None, timeout=None, allow_redirects=False, stream=False):
+        """Отправляет get-запрос на указанный адрес; при stream тело ответа читается по мере обращения к нему"""
+        return self._request('GET', path, params=params, headers=headers,
+                             timeout=timeout, allow_redirects=allow_redirects, stream=stream)
+
+    def post(self, path="/", params=None, data=None, headers=None, timeout=None, allow_redirects=False,
+             retry_non_idempotent=False):
+        """Отправляет post-запрос на указанный адрес; повторы при сбоях - только при retry_non_idempotent"""
+        return self._request('POST', path, params=params, data=data, headers=headers, timeout=timeout,
+                             allow_redirects=allow_redirects, retry_non_idempotent=retry_non_idempotent)
+
+    def delete(self, path="/", params=None, data=None, headers=None, timeout=None, allow_redirects=False):
         """Отправляет delete-запрос на указанный адрес"""
-        return requests.delete(url=f"{self.base_url}{path}",
-                               params=params, data=data, headers=headers,
-                               timeout=timeout, allow_redirects=allow_redirects)
+        return self._request('DELETE', path, params=params, data=data, headers=headers,
+                             timeout=timeout, allow_redirects=allow_redirects)
+
+    def paginate(self, path="/", params=None, headers=None, stream=False, **kwargs) -> Paginator:
+        """
+        Возвращает ленивый постраничный обход списка: итерация дает элементы data всех страниц.
+        Параметры обхода (размер страницы, предзагрузка) - см. Paginator
+        """
+        return Paginator(self, path=path, params=params, headers=headers, stream=stream, **kwargs)
@@ -0,0 +1,89 @@
+"""Ответ API с однократным разбором тела и быстрый JSON-кодек для проекта API_tests_example"""
+
+import json
+
+import requests
+
+try:
+    import orjson
+except ImportError:  # orjson необязателен: без него используется стандартный json
+    orjson = None
+
+
+class APIResponse(requests.Response):
+    """
+    requests.Response, который APIClient возвращает вместо исходного ответа. Тело хранится один раз
+    (байты исходного ответа, без копирования) и разбирается из JSON при первом обращении к json(),
+    data или meta; повторные обращения возвращают тот же результат разбора. Для разбора используется
+    orjson, при его отсутствии - стандартный json.
+    Результат разбора общий для всех обращений, поэтому изменять его в тестах нельзя
+    """
+
+    # Версия протокола сохраняется при pickle (общий кеш фикстур): raw при этом не сохраняется
+    __attrs__ = requests.Response.__attrs__ + ['_http_version']
+    HTTP_VERSIONS = {10: 'HTTP/1.0', 11: 'HTTP/1.1', 20: 'HTTP/2'}
+
+    @classmethod
+    def from_response(cls, response: requests.Response) -> 'APIResponse':
+        """Оборачивает ответ requests: атрибуты (в т.ч. тело и поток) переносятся без копирования"""
+        if isinstance(response, cls):
+            return response
+        wrapped = cls.__new__(cls)
+        wrapped.__dict__.update(response.__dict__)
+        if '_http_version' not in wrapped.__dict__:
+            wrapped._http_version = cls.HTTP_VERSIONS.get(getattr(response.raw, 'version', None))
+        return wrapped
+
+    @staticmethod
+    def loads(body):
+        """Разбирает JSON из bytes или str"""
+        if orjson is not None:
+            return orjson.loads(body)
+        return json.loads(body)
+
+    @staticmethod
+    def dumps(obj) -> bytes:
+        """Сериализует объект в JSON (UTF-8, без пробелов); ключи-не строки приводятся к строкам, как в json.dumps"""
+        if orjson is not None:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def json(self, **kwargs):
+        """Возвращает тело ответа, разобранное из JSON; без kwargs результат разбора кэшируется"""
+        if kwargs:
+            return super().json(**kwargs)
+        try:
+            return self._parsed_json
+        except AttributeError:
+            pass
+        if orjson is None or (self.encoding or 'utf-8').lower().replace('-', '') != 'utf8':
+            self._parsed_json = super().json()
+            return self._parsed_json
+        try:
+            self._parsed_json = orjson.loads(self.content)
+        except orjson.JSONDecodeError as e:
+            # То же исключение, что и у requests.Response.json()
+            raise requests.exceptions.JSONDecodeError(e.msg, e.doc, e.pos)
+        return self._parsed_json
+
+    def model(self, model_cls):
+        """Разбирает тело в модель из Data/models.py с проверкой по схеме (ModelValidationError при несоответствии)"""
+        return model_cls.from_json(self.json())
+
+    @property
+    def http_version(self):
+        """
+        Согласованный протокол ответа: 'HTTP/1.1', 'HTTP/2' и т.д.; None, если он неизвестен
+        (ответ из кассеты, записанной без версии)
+        """
+        return self.__dict__.get('_http_version')
+
+    @property
+    def data(self) -> list:
+        """Список объектов data из тела списочного ответа"""
+        return self.json()['data']
+
+    @property
+    def meta(self) -> dict:
+        """Объект meta (limit, offset, total) из тела списочного ответа или None"""
+        return self.json().get('meta')
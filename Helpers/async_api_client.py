@@ -0,0 +1,157 @@
+"""
+Асинхронный интерфейс к APIClient (пул потоков) и предзагрузка ответов для параметризованных тестов
+проекта API_tests_example
+"""
+
+import asyncio
+import inspect
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from Data.constants import ASYNC_MAX_CONCURRENCY
+from Helpers.api_client import APIClient
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAPIClient:
+    """
+    Интерфейс asyncio к APIClient с теми же методами get/post/delete. Это не асинхронный HTTP-стек:
+    запросы выполняются в пуле потоков через синхронный APIClient, т.е. через ту же сессию с пулом
+    keep-alive соединений (при API_HTTP2=1 - с мультиплексированием HTTP/2 для https://); число одновременных
+    запросов (и потоков) ограничено max_concurrency
+    """
+
+    def __init__(self, base_url, session: requests.Session = None, max_concurrency=ASYNC_MAX_CONCURRENCY):
+        self.base_url = base_url
+        self.max_concurrency = max_concurrency
+        self._client = APIClient(base_url=base_url, session=session)
+        self._executor = None
+        self._semaphore = None
+
+    async def _call(self, method, **kwargs) -> requests.Response:
+        """Выполняет запрос синхронного клиента в пуле потоков, не превышая лимит одновременных запросов"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            return await loop.run_in_executor(self._executor, lambda: getattr(self._client, method)(**kwargs))
+
+    async def get(self, path="/", params=None, headers=None, timeout=None, allow_redirects=False):
+        """Отправляет get-запрос на указанный адрес"""
+        return await self._call('get', path=path, params=params, headers=headers,
+                                timeout=timeout, allow_redirects=allow_redirects)
+
+    async def post(self, path="/", params=None, data=None, headers=None, timeout=None, allow_redirects=False,
+                   retry_non_idempotent=False):
+        """Отправляет post-запрос на указанный адрес; повторы при сбоях - только при retry_non_idempotent"""
+        return await self._call('post', path=path, params=params, data=data, headers=headers, timeout=timeout,
+                                allow_redirects=allow_redirects, retry_non_idempotent=retry_non_idempotent)
+
+    async def delete(self, path="/", params=None, data=None, headers=None, timeout=None, allow_redirects=False):
+        """Отправляет delete-запрос на указанный адрес"""
+        return await self._call('delete', path=path, params=params, data=data, headers=headers,
+                                timeout=timeout, allow_redirects=allow_redirects)
+
+    async def gather(self, calls: list) -> list:
+        """
+        Одновременно отправляет запросы, заданные парами (метод, kwargs), и возвращает ответы в том же порядке.
+        Исключения возвращаются на месте ответа, а не прерывают остальные запросы
+        """
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        try:
+            return await asyncio.gather(*(getattr(self, method)(**kwargs) for method, kwargs in calls),
+                                        return_exceptions=True)
+        finally:
+            self._executor.shutdown()
+            self._executor, self._semaphore = None, None
+
+    def fan_out(self, calls: list) -> list:
+        """Синхронная обертка над gather для вызова вне event loop (например, из фикстур pytest)"""
+        return asyncio.run(self.gather(calls))
+
+
+class ResponsePrefetcher:
+    """
+    Предзагрузка ответов для параметризованных тестов с меткой prefetch.
+    При setup первого теста группы (одна и та же тестовая функция с разными параметрами) запросы всех тестов
+    группы отправляются одновременно через AsyncAPIClient, каждый тест получает свой готовый ответ.
+
+    Метка: @pytest.mark.prefetch(<имя фикстуры API-клиента>, <функция параметров теста -> kwargs запроса>,
+    method='get')
+
+    Запросы группы отправляются и для тестов, которые в этом процессе могут не выполниться (другой воркер xdist,
+    пропуск, -x). Поэтому предзагружаются только безопасные запросы и запросы на создание: ответы на создание
+    сразу передаются в track(ответ) фикстуры tracker (например, пул пользователей удалит созданных);
+    запросы, которые меняют или удаляют данные (DELETE, PUT, PATCH), не предзагружаются.
+    Невостребованные ответы освобождает discard
+    """
+
+    MARKER = 'prefetch'
+    SAFE_METHODS = ('get', 'head', 'options')
+    TRACKED_METHODS = ('post',)
+
+    def __init__(self, tracker: str = None):
+        self.tracker = tracker
+        self._responses = {}
+
+    @staticmethod
+    def group_key(item: pytest.Item) -> str:
+        """Возвращает ключ группы: тестовая функция без учета параметров"""
+        return f"{item.parent.nodeid}::{item.originalname}"
+
+    @staticmethod
+    def _build_call(item: pytest.Item) -> tuple:
+        """Возвращает пару (метод, kwargs) запроса для теста по его метке prefetch и параметрам"""
+        mark = item.get_closest_marker(ResponsePrefetcher.MARKER)
+        build_request = mark.args[1]
+        params = item.callspec.params if hasattr(item, 'callspec') else {}
+        accepted = inspect.signature(build_request).parameters
+        kwargs = build_request(**{name: value for name, value in params.items() if name in accepted})
+        return mark.kwargs.get('method', 'get'), kwargs
+
+    def _prefetch_group(self, item: pytest.Item, getfixturevalue):
+        """Одновременно отправляет запросы всех тестов группы, к которой относится item"""
+        key = self.group_key(item)
+        group = [other for other in item.session.items
+                 if other.get_closest_marker(self.MARKER) and self.group_key(other) == key
+                 and other.nodeid not in self._responses]
+        client = getfixturevalue(item.get_closest_marker(self.MARKER).args[0])
+        async_client = AsyncAPIClient(base_url=client.base_url, session=client.session)
+        calls = [self._build_call(other) for other in group]
+        methods = {method for method, _ in calls}
+        unsupported = methods - set(self.SAFE_METHODS) - set(self.TRACKED_METHODS)
+        if unsupported:
+            raise ValueError(f"Предзагрузка {key}: запросы {', '.join(sorted(unsupported))} не предзагружаются")
+        tracker = None
+        if methods & set(self.TRACKED_METHODS):
+            if self.tracker is None:
+                raise RuntimeError(f"Предзагрузка запросов на создание {key} без фикстуры tracker")
+            tracker = getfixturevalue(self.tracker)
+        responses = async_client.fan_out(calls)
+        if tracker is not None:
+            for (method, _), response in zip(calls, responses):
+                if method in self.TRACKED_METHODS and isinstance(response, requests.Response):
+                    tracker.track(response)
+        self._responses.update({other.nodeid: response for other, response in zip(group, responses)})
+
+    def response_for(self, item: pytest.Item, getfixturevalue) -> requests.Response:
+        """Возвращает предзагруженный ответ для теста; при необходимости загружает всю его группу"""
+        if item.nodeid not in self._responses:
+            self._prefetch_group(item, getfixturevalue)
+        response = self._responses.pop(item.nodeid)
+        if isinstance(response, BaseException):
+            raise response
+        return response
+
+    def discard(self):
+        """Освобождает ответы тестов, которые не выполнились в этом процессе"""
+        responses, self._responses = self._responses, {}
+        for response in responses.values():
+            if isinstance(response, requests.Response):
+                response.close()
+        if responses:
+            logger.info("Предзагрузка: не востребовано ответов %s", len(responses))
@@ -0,0 +1,244 @@
+"""
+Бенчмарки обвязки тестов (клиент, проверка схем, фикстуры) для проекта API_tests_example:
+замер, сравнение с сохраненным базовым прогоном и проверка порога регрессии.
+
+Запуск: python -m Helpers.benchmark [--filter <подстрока>] [--save] [--threshold T] [--baseline <файл>]
+                                    [--json <файл>]
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from Data.constants import BENCHMARK_BASELINE_PATH, BENCHMARK_MIN_TIME, BENCHMARK_REPEAT, BENCHMARK_THRESHOLD
+
+BENCHMARKS_DIR = Path(__file__).parents[1].joinpath('Benchmarks')
+
+
+class Benchmark:
+    """
+    Бенчмарк: setup() готовит аргументы (не замеряется), func(*аргументы) - замеряемый вызов.
+    gate - регрессия бенчмарка завершает прогон ошибкой; у сетевых замеров он выключен (см. register_overhead)
+    """
+
+    def __init__(self, name: str, func, setup=None, gate=True):
+        self.name = name
+        self.func = func
+        self.setup = setup
+        self.gate = gate
+
+
+class BenchmarkRunner:
+    """
+    Выполняет зарегистрированные бенчмарки. Каждый замер - серия из number вызовов, где number подбирается
+    так, чтобы серия длилась не меньше min_time; результат - время одного вызова (медиана, минимум, разброс
+    по repeat сериям). Результаты сравниваются с базовым прогоном по минимуму (наименее шумная оценка):
+    регрессия - замедление больше threshold, которое к тому же больше разброса обоих прогонов.
+    Накладные расходы (register_overhead) - разность двух замеров, например клиента и голой сессии на одном
+    сетевом запросе: сетевое время в ней сокращается, поэтому проверяется разность, а не сами замеры
+    """
+
+    NOISE_STDEVS = 2  # изменение в пределах NOISE_STDEVS * (stdev базового + stdev текущего) - шум
+
+    registry = {}  # имя -> Benchmark, заполняется модулями Benchmarks/bench_*.py
+    overheads = {}  # имя -> (замер, опорный замер)
+
+    def __init__(self, min_time=BENCHMARK_MIN_TIME, repeat=BENCHMARK_REPEAT):
+        self.min_time = min_time
+        self.repeat = repeat
+
+    @classmethod
+    def register(cls, name: str, setup=None, gate=True):
+        """Декоратор: регистрирует функцию как бенчмарк с именем name"""
+        def decorator(func):
+            if name in cls.registry:
+                raise ValueError(f"Бенчмарк {name!r} уже зарегистрирован")
+            cls.registry[name] = Benchmark(name, func, setup, gate)
+            return func
+        return decorator
+
+    @classmethod
+    def register_overhead(cls, name: str, measured: str, reference: str):
+        """Регистрирует производный результат name = measured - reference (вычисляется, если выполнены оба)"""
+        cls.overheads[name] = (measured, reference)
+
+    @classmethod
+    def gated(cls, name: str) -> bool:
+        """Завершает ли регрессия результата name прогон ошибкой (производные результаты проверяются всегда)"""
+        benchmark = cls.registry.get(name)
+        return benchmark is None or benchmark.gate
+
+    @staticmethod
+    def discover(directory=BENCHMARKS_DIR) -> dict:
+        """Импортирует модули bench_*.py из directory (при импорте они регистрируют бенчмарки)"""
+        for path in sorted(Path(directory).glob('bench_*.py')):
+            module_name = f"{Path(directory).name}.{path.stem}"
+            if module_name in sys.modules:
+                continue
+            spec = importlib.util.spec_from_file_location(module_name, path)
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module
+            spec.loader.exec_module(module)
+        return BenchmarkRunner.registry
+
+    @staticmethod
+    def _series(func, args: tuple, number: int) -> float:
+        start = time.perf_counter()
+        for _ in range(number):
+            func(*args)
+        return time.perf_counter() - start
+
+    def measure(self, benchmark: Benchmark) -> dict:
+        """Замеряет бенчмарк и возвращает время одного вызова в секундах"""
+        args = benchmark.setup() if benchmark.setup is not None else ()
+        number = 1
+        while True:  # калибровка (заодно прогрев): удваиваем число вызовов, пока серия короче min_time
+            elapsed = self._series(benchmark.func, args, number)
+            if elapsed >= self.min_time:
+                break
+            number = number * 2 if elapsed <= 0 else max(number * 2, int(number * self.min_time / elapsed * 1.2))
+        timings = [self._series(benchmark.func, args, number) / number for _ in range(self.repeat)]
+        return {
+            'median': statistics.median(timings),
+            'min': min(timings),
+            'stdev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+            'number': number,
+            'repeat': self.repeat,
+        }
+
+    def run(self, name_filter: str = None) -> dict:
+        """Выполняет бенчмарки, в имени которых есть name_filter (все, если не задан)"""
+        results = {}
+        for name, benchmark in sorted(self.registry.items()):
+            if name_filter and name_filter not in name:
+                continue
+            results[name] = self.measure(benchmark)
+            self._print_result(name, results[name])
+        for name, (measured, reference) in sorted(self.overheads.items()):
+            if measured in results and reference in results:
+                results[name] = self.difference(results[measured], results[reference])
+                self._print_result(name, results[name])
+        return results
+
+    def _print_result(self, name: str, result: dict):
+        print(f"{name:<48} {self.format_time(result['min']):>10} ± {self.format_time(result['stdev'])}", flush=True)
+
+    @staticmethod
+    def difference(measured: dict, reference: dict) -> dict:
+        """Разность замеров; разброс разности - сумма разбросов"""
+        return {'median': measured['median'] - reference['median'], 'min': measured['min'] - reference['min'],
+                'stdev': measured['stdev'] + reference['stdev'], 'number': measured['number'],
+                'repeat': measured['repeat']}
+
+    @staticmethod
+    def machine() -> dict:
+        """Описание окружения, в котором выполнен прогон: базовый прогон сравним только с тем же окружением"""
+        return {'platform': platform.platform(), 'python': platform.python_version(),
+                'implementation': platform.python_implementation(), 'cpu_count': os.cpu_count()}
+
+    @staticmethod
+    def format_time(seconds: float) -> str:
+        sign, seconds = ('-', -seconds) if seconds < 0 else ('', seconds)
+        for unit, scale in (('с', 1), ('мс', 1e-3), ('мкс', 1e-6)):
+            if seconds >= scale:
+                return f"{sign}{seconds / scale:.2f} {unit}"
+        return f"{sign}{seconds / 1e-9:.0f} нс"
+
+    @classmethod
+    def compare(cls, results: dict, baseline: dict, threshold=BENCHMARK_THRESHOLD) -> list:
+        """
+        Сравнивает минимумы с базовым прогоном и возвращает список (имя, базовый, текущий, отношение, статус);
+        статус: regression/improvement - минимум изменился больше чем на threshold и больше разброса обоих
+        прогонов (NOISE_STDEVS), new - бенчмарка нет в базовом прогоне, ok - в пределах порога или шума
+        """
+        rows = []
+        for name, result in sorted(results.items()):
+            base = baseline.get(name)
+            if base is None:
+                rows.append((name, None, result['min'], None, 'new'))
+                continue
+            delta = result['min'] - base['min']
+            noise = cls.NOISE_STDEVS * (base['stdev'] + result['stdev'])
+            ratio = result['min'] / base['min'] if base['min'] > 0 else None
+            significant = abs(delta) > noise and abs(delta) > threshold * abs(base['min'])
+            status = 'ok' if not significant else 'regression' if delta > 0 else 'improvement'
+            rows.append((name, base['min'], result['min'], ratio, status))
+        return rows
+
+    @staticmethod
+    def load_baseline(path=BENCHMARK_BASELINE_PATH):
+        """Возвращает сохраненный базовый прогон ({'machine': ..., 'results': ...}) или None"""
+        try:
+            return json.loads(Path(path).read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def save_baseline(results: dict, path=BENCHMARK_BASELINE_PATH, merge=True):
+        """Сохраняет результаты как базовый прогон; при merge результаты других бенчмарков сохраняются"""
+        path = Path(path)
+        stored = BenchmarkRunner.load_baseline(path) if merge else None
+        baseline = stored['results'] if stored and stored.get('machine') == BenchmarkRunner.machine() else {}
+        baseline.update(results)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({'machine': BenchmarkRunner.machine(), 'results': baseline},
+                                   ensure_ascii=False, indent=2), encoding='utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки обвязки тестов на локальном эмуляторе API")
+    parser.add_argument('--filter', default=None, help="выполнить только бенчмарки с подстрокой в имени")
+    parser.add_argument('--save', action='store_true', help="сохранить результаты как базовый прогон")
+    parser.add_argument('--threshold', type=float, default=BENCHMARK_THRESHOLD,
+                        help="допустимое замедление минимума относительно базового прогона (доля)")
+    parser.add_argument('--baseline', default=BENCHMARK_BASELINE_PATH)
+    parser.add_argument('--min-time', type=float, default=BENCHMARK_MIN_TIME)
+    parser.add_argument('--repeat', type=int, default=BENCHMARK_REPEAT)
+    parser.add_argument('--json', default=None, help="записать результаты прогона в файл")
+    args = parser.parse_args()
+
+    from Helpers.local_api_server import start_in_subprocess
+    server = start_in_subprocess()
+    try:
+        BenchmarkRunner.discover()
+        results = BenchmarkRunner(args.min_time, args.repeat).run(args.filter)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    if args.json:
+        Path(args.json).write_text(json.dumps({'machine': BenchmarkRunner.machine(), 'results': results},
+                                              ensure_ascii=False, indent=2), encoding='utf-8')
+    if args.save:
+        BenchmarkRunner.save_baseline(results, args.baseline)
+        print(f"Базовый прогон сохранен: {args.baseline}")
+        return
+
+    baseline = BenchmarkRunner.load_baseline(args.baseline)
+    if baseline is None:
+        print(f"Базовый прогон не найден ({args.baseline}): сохраните его с --save")
+        return
+    if baseline.get('machine') != BenchmarkRunner.machine():
+        print(f"Внимание: базовый прогон выполнен в другом окружении: {baseline.get('machine')}")
+    rows = BenchmarkRunner.compare(results, baseline['results'], args.threshold)
+    print(f"\n{'бенчмарк':<48} {'базовый':>10} {'текущий':>10} {'изменение':>10}  статус")
+    for name, base, current, ratio, status in rows:
+        base_text = BenchmarkRunner.format_time(base) if base is not None else '-'
+        change = f"{(ratio - 1) * 100:+.1f}%" if ratio is not None else '-'
+        note = '' if BenchmarkRunner.gated(name) else ' (не проверяется)'
+        print(f"{name:<48} {base_text:>10} {BenchmarkRunner.format_time(current):>10} {change:>10}  {status}{note}")
+    regressions = [row[0] for row in rows if row[4] == 'regression' and BenchmarkRunner.gated(row[0])]
+    if regressions:
+        sys.exit(f"Регрессия производительности (порог {args.threshold:.0%}): {', '.join(regressions)}")
+
+
+if __name__ == '__main__':
+    # Модули бенчмарков регистрируются в реестре модуля Helpers.benchmark, а не __main__
+    from Helpers.benchmark import main
+    main()
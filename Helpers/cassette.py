@@ -0,0 +1,135 @@
+"""Запись и воспроизведение ответов API (кассеты) для проекта API_tests_example"""
+
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+from datetime import timedelta
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from Data.constants import CASSETTE_MODE, CASSETTE_PATH
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """В кассете нет записи для запроса (в режиме воспроизведения сеть не используется)"""
+
+
+def build_response(status_code: int, headers: dict, content: bytes, url: str, reason: str = '',
+                   encoding: str = None, elapsed: float = 0.0, http_version: str = None) -> requests.Response:
+    """Собирает requests.Response из сохраненных частей ответа; http_version - см. APIResponse.http_version"""
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = content
+    response._content_consumed = True
+    response.url = url
+    response.reason = reason
+    response.encoding = encoding
+    response.elapsed = timedelta(seconds=elapsed)
+    response._http_version = http_version
+    return response
+
+
+class Cassette:
+    """
+    Хранилище пар запрос-ответ в одном файле на диске.
+
+    Формат файла - последовательность записей: заголовок (sha256 ключа запроса, длина метаданных, длина тела),
+    метаданные ответа в JSON и тело ответа как есть. Ключ запроса: метод, URL без query, отсортированные
+    параметры query, хэш тела запроса и значимые для ответа хедеры.
+    Запись ведется дописыванием в конец файла под эксклюзивной блокировкой, поэтому воркеры xdist могут
+    записывать одновременно. При воспроизведении файл отображается в память (mmap) только для чтения:
+    воркеры разделяют одни и те же страницы кэша ОС, каждый хранит у себя только индекс смещений
+    """
+
+    RECORD_HEADER = struct.Struct('<32sII')
+    # Хедеры запроса, от которых зависит ответ API
+    KEY_HEADERS = ('accept-language', 'content-type')
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, path, mode):
+        self.path = Path(path)
+        self.mode = mode
+        self._index = None
+        self._mmap = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def default(cls):
+        """Возвращает общую для процесса кассету по настройкам из констант или None, если режим выключен"""
+        if CASSETTE_MODE not in ('record', 'replay'):
+            return None
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls(CASSETTE_PATH, CASSETTE_MODE)
+            return cls._default
+
+    @classmethod
+    def request_key(cls, method, url, params=None, data=None, headers=None) -> bytes:
+        """Возвращает ключ запроса (sha256 канонического представления)"""
+        prepared = requests.Request(method=method, url=url, params=params, data=data, headers=headers).prepare()
+        scheme, netloc, path, query, _ = urlsplit(prepared.url)
+        canonical_query = urlencode(sorted(parse_qsl(query, keep_blank_values=True)))
+        body = prepared.body or b''
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        key_headers = sorted((name.lower(), value) for name, value in (headers or {}).items()
+                             if name.lower() in cls.KEY_HEADERS)
+        canonical = '\n'.join([prepared.method, urlunsplit((scheme, netloc, path, '', '')), canonical_query,
+                               hashlib.sha256(body).hexdigest(), json.dumps(key_headers)])
+        return hashlib.sha256(canonical.encode('utf-8')).digest()
+
+    def record(self, response: requests.Response, method, url, params=None, data=None, headers=None, **_):
+        """Дописывает ответ на запрос в конец файла кассеты"""
+        key = self.request_key(method, url, params, data, headers)
+        meta = json.dumps({'status_code': response.status_code, 'reason': response.reason, 'url': response.url,
+                           'headers': dict(response.headers), 'encoding': response.encoding,
+                           'elapsed': response.elapsed.total_seconds(),
+                           'http_version': getattr(response, 'http_version', None)}).encode('utf-8')
+        content = response.content
+        record = self.RECORD_HEADER.pack(key, len(meta), len(content)) + meta + content
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            os.write(fd, record)
+        finally:
+            os.close(fd)
+
+    def _load_index(self):
+        """Отображает файл кассеты в память и строит индекс ключ -> смещения записи (последняя запись важнее)"""
+        index = {}
+        if self.path.exists() and self.path.stat().st_size:
+            with open(self.path, 'rb') as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            offset, size = 0, len(self._mmap)
+            while offset + self.RECORD_HEADER.size <= size:
+                key, meta_len, body_len = self.RECORD_HEADER.unpack_from(self._mmap, offset)
+                meta_offset = offset + self.RECORD_HEADER.size
+                index[key] = (meta_offset, meta_len, body_len)
+                offset = meta_offset + meta_len + body_len
+        self._index = index
+
+    def replay(self, method, url, params=None, data=None, headers=None, **_) -> requests.Response:
+        """Возвращает записанный ответ на запрос; при отсутствии записи выбрасывает CassetteMiss"""
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self._load_index()
+        key = self.request_key(method, url, params, data, headers)
+        if key not in self._index:
+            raise CassetteMiss(f"В кассете {self.path} нет ответа на запрос {method} {url} "
+                               f"(params={params}, headers={headers})")
+        meta_offset, meta_len, body_len = self._index[key]
+        meta = json.loads(self._mmap[meta_offset:meta_offset + meta_len])
+        body_offset = meta_offset + meta_len
+        return build_response(content=self._mmap[body_offset:body_offset + body_len], **meta)
@@ -0,0 +1,327 @@
+"""
+Загрузка тестовых данных (CSV, JSONL, Parquet) с кешем в колоночном бинарном формате для проекта API_tests_example
+"""
+
+import csv
+import fcntl
+import hashlib
+import json
+import math
+import mmap
+import os
+import random
+import struct
+import threading
+from array import array
+from pathlib import Path
+
+from Data.constants import DATA_DIR, DATA_CACHE_DIR
+
+try:
+    import pyarrow.parquet as parquet
+except ImportError:  # pyarrow необязателен: без него не читаются только файлы .parquet
+    parquet = None
+
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+class _TextColumn:
+    """Колонка строк (или значений JSON) в mmap: смещения (uint64, n + 1) и тела подряд; значение - по обращению"""
+
+    def __init__(self, offsets: memoryview, blob: memoryview, decode):
+        self._offsets = offsets
+        self._blob = blob
+        self._decode = decode
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._decode(self._blob[self._offsets[index]:self._offsets[index + 1]])
+
+    def __iter__(self):
+        return (self[index] for index in range(len(self)))
+
+
+class DataSet:
+    """
+    Таблица тестовых данных из колоночного файла кеша (см. DataLoader), открытого через mmap.
+    Колонки типизированы (int, float, str, json) и читаются по обращению: числовая колонка - memoryview
+    на файл без копирования, строка декодируется при обращении к ней. Поиск, отбор и выборка читают
+    только нужные колонки и строки, индексы для поиска строятся по колонке при первом поиске.
+    Колонка задается именем или номером (у CSV без заголовка имена - номера: '0', '1', ...)
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._data[:len(DataLoader.MAGIC)] != DataLoader.MAGIC:
+            raise ValueError(f"{self.path} не является файлом кеша тестовых данных")
+        header_length, = DataLoader.LENGTH.unpack_from(self._data, len(DataLoader.MAGIC))
+        header_start = len(DataLoader.MAGIC) + DataLoader.LENGTH.size
+        self.header = json.loads(self._data[header_start:header_start + header_length])
+        self.columns = [column['name'] for column in self.header['columns']]
+        self.types = {column['name']: column['type'] for column in self.header['columns']}
+        self._columns = {}
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.header['rows']
+
+    def _name(self, key) -> str:
+        name = self.columns[key] if isinstance(key, int) else key
+        if name not in self.types:
+            raise KeyError(f"В {self.header['source']} нет колонки {key!r}; есть: {', '.join(self.columns)}")
+        return name
+
+    def column(self, key):
+        """Возвращает колонку - последовательность значений, которые читаются из файла по обращению"""
+        name = self._name(key)
+        column = self._columns.get(name)
+        if column is None:
+            meta = next(meta for meta in self.header['columns'] if meta['name'] == name)
+            view = memoryview(self._data)[meta['offset']:meta['offset'] + meta['size']]
+            if meta['type'] in DataLoader.NUMERIC_TYPES:
+                column = view.cast(DataLoader.NUMERIC_TYPES[meta['type']])
+            else:
+                offsets_size = 8 * (len(self) + 1)
+                decode = (lambda value: str(value, 'utf-8')) if meta['type'] == 'str' else \
+                    (lambda value: json.loads(bytes(value)))
+                column = _TextColumn(view[:offsets_size].cast('Q'), view[offsets_size:], decode)
+            self._columns[name] = column
+        return column
+
+    def row(self, index: int, columns=None) -> tuple:
+        return tuple(self.column(key)[index] for key in (columns or self.columns))
+
+    def stream(self, columns=None):
+        """Генератор строк (кортежей значений колонок columns, по умолчанию всех) без чтения всего файла"""
+        selected = [self.column(key) for key in (columns or self.columns)]
+        for index in range(len(self)):
+            yield tuple(column[index] for column in selected)
+
+    def records(self, columns=None):
+        """Генератор строк в виде словарей колонка -> значение"""
+        names = [self._name(key) for key in (columns or self.columns)]
+        for values in self.stream(names):
+            yield dict(zip(names, values))
+
+    def rows(self, columns=None) -> list:
+        """Все строки списком кортежей (например, для pytest.mark.parametrize)"""
+        return list(self.stream(columns))
+
+    def index(self, key) -> dict:
+        """Индекс колонки: значение -> номера строк с этим значением"""
+        name = self._name(key)
+        with self._lock:
+            if name not in self._indexes:
+                positions = {}
+                for position, value in enumerate(self.column(name)):
+                    positions.setdefault(value, []).append(position)
+                self._indexes[name] = positions
+            return self._indexes[name]
+
+    def lookup(self, key, value, columns=None) -> list:
+        """Строки, в которых значение колонки key равно value (по индексу колонки)"""
+        return [self.row(position, columns) for position in self.index(key).get(value, ())]
+
+    def filter(self, key, predicate, columns=None):
+        """Генератор строк, для которых predicate(значение колонки key) истинно; читается только колонка key"""
+        for position, value in enumerate(self.column(key)):
+            if predicate(value):
+                yield self.row(position, columns)
+
+    def sample(self, count: int, seed=None, columns=None) -> list:
+        """
+        Случайная выборка count строк (все, если строк меньше). Без seed используется модуль random:
+        conftest фиксирует его seed перед сбором тестов, поэтому выборка одинакова во всех воркерах xdist
+        """
+        generator = random.Random(seed) if seed is not None else random
+        return [self.row(position, columns) for position in generator.sample(range(len(self)), min(count, len(self)))]
+
+
+class DataLoader:
+    """
+    Загрузчик тестовых данных из Data/: CSV (header - первая строка содержит имена колонок), JSONL (строка - объект)
+    и Parquet (нужен pyarrow). При первой загрузке файл преобразуется в колоночный файл кеша (DATA_CACHE_DIR),
+    который затем открывается через mmap без разбора исходного файла; кеш пересоздается при изменении
+    mtime или размера исходного файла. Загруженные таблицы кешируются в процессе.
+
+    Формат файла кеша: MAGIC, длина заголовка (uint32), заголовок в JSON (версия, источник, mtime и размер
+    источника, число строк, колонки: имя, тип, смещение и размер данных), данные колонок с выравниванием 8 байт:
+    int - int64, float - float64, str и json - смещения (uint64, строк + 1) и значения в UTF-8 подряд.
+    Тип колонки выводится по значениям: для CSV - int/float, если все значения записаны канонически
+    (str(int(значение)) == значение), иначе str; для JSONL и Parquet - по типам значений, смешанные - json
+    """
+
+    MAGIC = b'APLD'
+    VERSION = 1
+    LENGTH = struct.Struct('<I')
+    NUMERIC_TYPES = {'int': 'q', 'float': 'd'}
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, data_dir=DATA_DIR, cache_dir=DATA_CACHE_DIR):
+        self.data_dir = Path(data_dir)
+        self.cache_dir = Path(cache_dir)
+        self._datasets = {}  # (файл, header) -> (mtime и размер источника, DataSet)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def default(cls) -> 'DataLoader':
+        """Возвращает общий для процесса загрузчик данных из Data/"""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    # region Чтение источников
+    @staticmethod
+    def _read_csv(path: Path, header: bool) -> tuple:
+        with open(path, 'rt', encoding='utf-8', newline='') as f:
+            rows = [*csv.reader(f, delimiter=',')]
+        names = rows.pop(0) if header and rows else [str(number) for number in range(len(rows[0]) if rows else 0)]
+        for number, row in enumerate(rows, start=2 if header else 1):
+            if len(row) != len(names):
+                raise ValueError(f"{path.name}, строка {number}: {len(row)} полей, ожидается {len(names)}")
+        return names, [list(values) for values in zip(*rows)] if rows else [[] for _ in names], True
+
+    @staticmethod
+    def _read_jsonl(path: Path, header: bool) -> tuple:
+        records = []
+        with open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    records.append(json.loads(line))
+        names = list(dict.fromkeys(name for record in records for name in record))
+        return names, [[record.get(name) for record in records] for name in names], False
+
+    @staticmethod
+    def _read_parquet(path: Path, header: bool) -> tuple:
+        if parquet is None:
+            raise ImportError(f"Для чтения {path.name} нужен pyarrow (pip install pyarrow)")
+        table = parquet.read_table(path).to_pydict()
+        return list(table), list(table.values()), False
+
+    READERS = {'.csv': '_read_csv', '.jsonl': '_read_jsonl', '.parquet': '_read_parquet'}
+    # endregion Чтение источников
+
+    # region Файл кеша
+    @staticmethod
+    def column_type(values: list, from_text: bool) -> str:
+        if from_text:
+            def canonical(convert):
+                try:
+                    return all(str(convert(value)) == value for value in values)
+                except ValueError:
+                    return False
+            if values and canonical(int) and all(INT64_MIN <= int(value) <= INT64_MAX for value in values):
+                return 'int'
+            if values and canonical(float) and all(math.isfinite(float(value)) for value in values):
+                return 'float'
+            return 'str'
+        kinds = {type(value) for value in values}
+        if kinds == {int} and all(INT64_MIN <= value <= INT64_MAX for value in values):
+            return 'int'
+        if kinds == {float}:
+            return 'float'
+        return 'str' if kinds <= {str} else 'json'
+
+    @classmethod
+    def _encode_column(cls, values: list, column_type: str, from_text: bool) -> bytes:
+        if column_type in cls.NUMERIC_TYPES:
+            convert = (int if column_type == 'int' else float) if from_text else (lambda value: value)
+            return array(cls.NUMERIC_TYPES[column_type], [convert(value) for value in values]).tobytes()
+        if column_type == 'str':
+            encoded = [value.encode('utf-8') for value in values]
+        else:
+            encoded = [json.dumps(value, ensure_ascii=False).encode('utf-8') for value in values]
+        offsets = array('Q', [0])
+        for value in encoded:
+            offsets.append(offsets[-1] + len(value))
+        return offsets.tobytes() + b''.join(encoded)
+
+    @staticmethod
+    def source_stamp(path: Path) -> list:
+        stat = path.stat()
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def cache_path(self, file_name: str, header: bool) -> Path:
+        key = hashlib.blake2b(f"{file_name}:{header}".encode('utf-8'), digest_size=6).hexdigest()
+        return self.cache_dir.joinpath(f"{Path(file_name).stem}.{key}.data")
+
+    def convert(self, file_name: str, header=False) -> Path:
+        """Преобразует исходный файл в колоночный файл кеша (атомарно) и возвращает путь к нему"""
+        source = self.data_dir.joinpath(file_name)
+        if source.suffix not in self.READERS:
+            raise ValueError(f"Неподдерживаемый формат {source.name}: нужен один из {', '.join(self.READERS)}")
+        stamp = self.source_stamp(source)
+        names, columns, from_text = getattr(self, self.READERS[source.suffix])(source, header)
+        rows = len(columns[0]) if columns else 0
+        header_columns, blocks = [], []
+        for name, values in zip(names, columns):
+            column_type = self.column_type(values, from_text)
+            block = self._encode_column(values, column_type, from_text)
+            blocks.append(block + b'\0' * (-len(block) % 8))
+            header_columns.append({'name': name, 'type': column_type, 'size': len(block)})
+        header_bytes = b''
+        while True:  # смещения колонок зависят от длины заголовка, в котором они записаны
+            offset = len(self.MAGIC) + self.LENGTH.size + len(header_bytes)
+            offset += -offset % 8
+            for column, block in zip(header_columns, blocks):
+                column['offset'] = offset
+                offset += len(block)
+            encoded = json.dumps({'version': self.VERSION, 'source': file_name, 'stamp': stamp, 'header': header,
+                                  'rows': rows, 'columns': header_columns}, ensure_ascii=False).encode('utf-8')
+            stable = len(encoded) == len(header_bytes)
+            header_bytes = encoded
+            if stable:
+                break
+        padding = b'\0' * (-(len(self.MAGIC) + self.LENGTH.size + len(header_bytes)) % 8)
+        path = self.cache_path(file_name, header)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(temp_path, 'wb') as f:
+            f.write(self.MAGIC + self.LENGTH.pack(len(header_bytes)) + header_bytes + padding + b''.join(blocks))
+        os.replace(temp_path, path)
+        return path
+
+    def _open_cached(self, file_name: str, header: bool, stamp: list) -> DataSet:
+        """Открывает файл кеша, при отсутствии или устаревании - создает его (один процесс из всех)"""
+        path = self.cache_path(file_name, header)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path.with_name(f"{path.name}.lock"), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                try:
+                    dataset = DataSet(path)
+                    if (dataset.header.get('version'), dataset.header.get('stamp')) == (self.VERSION, stamp):
+                        return dataset
+                except (FileNotFoundError, ValueError):
+                    pass
+                return DataSet(self.convert(file_name, header))
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    # endregion Файл кеша
+
+    def load(self, file_name: str, header=False) -> DataSet:
+        """Возвращает таблицу данных файла из Data/; header - первая строка CSV содержит имена колонок"""
+        stamp = self.source_stamp(self.data_dir.joinpath(file_name))
+        key = (file_name, header)
+        cached = self._datasets.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        with self._lock:
+            cached = self._datasets.get(key)
+            if cached is None or cached[0] != stamp:
+                cached = self._datasets[key] = (stamp, self._open_cached(file_name, header, stamp))
+            return cached[1]
@@ -0,0 +1,97 @@
+"""Распределение тестов по воркерам xdist по длительностям прошлых прогонов для проекта API_tests_example"""
+
+import statistics
+
+from xdist.scheduler import LoadGroupScheduling
+
+
+class DurationHistory:
+    """
+    Длительности тестов (setup + call + teardown, с) по ID теста, сохраняемые между прогонами в кеше pytest;
+    регистрируется плагином в главном процессе. Новая длительность сглаживается с прежней, чтобы единичный
+    медленный прогон не ломал распределение
+    """
+
+    CACHE_KEY = 'api/durations'
+    SMOOTHING = 0.5  # вес нового замера
+
+    def __init__(self, durations: dict = None):
+        self.durations = dict(durations or {})
+        self._current = {}
+
+    @staticmethod
+    def test_id(nodeid: str) -> str:
+        """ID теста без суффикса группы xdist (@группа), который --dist loadgroup добавляет к nodeid"""
+        if nodeid.rfind('@') > nodeid.rfind(']'):
+            return nodeid.rsplit('@', 1)[0]
+        return nodeid
+
+    @classmethod
+    def load(cls, cache) -> 'DurationHistory':
+        return cls(cache.get(cls.CACHE_KEY, {}))
+
+    def save(self, cache):
+        """Сохраняет длительности текущего прогона (сглаженные с прежними) в кеш"""
+        for test_id, duration in self._current.items():
+            previous = self.durations.get(test_id)
+            self.durations[test_id] = duration if previous is None else \
+                self.SMOOTHING * duration + (1 - self.SMOOTHING) * previous
+        cache.set(self.CACHE_KEY, self.durations)
+
+    def pytest_runtest_logreport(self, report):
+        """Учитывает фазу теста (в главном процессе сюда приходят и отчеты воркеров xdist)"""
+        test_id = self.test_id(report.nodeid)
+        self._current[test_id] = self._current.get(test_id, 0.0) + report.duration
+
+    def pytest_sessionfinish(self, session):
+        self.save(session.config.cache)
+
+    def get(self, nodeid: str, default: float) -> float:
+        return self.durations.get(self.test_id(nodeid), default)
+
+    def default(self) -> float:
+        """Оценка для теста без истории: медиана известных длительностей"""
+        return statistics.median(self.durations.values()) if self.durations else 1.0
+
+
+class DurationScheduling(LoadGroupScheduling):
+    """
+    Планировщик --dist loadgroup, который выдает воркерам единицы работы (группу xdist или отдельный тест)
+    в порядке убывания их суммарной длительности по прошлым прогонам (longest processing time first):
+    самые долгие группы начинаются первыми, а короткие тесты в конце выравнивают загрузку воркеров.
+
+    Очередь упорядочивается один раз, перед выдачей первой единицы работы, через приватный
+    LoadScopeScheduling._assign_work_unit: поэтому версия pytest-xdist закреплена в requirements.txt,
+    а без этого метода планировщик не используется (supported)
+    """
+
+    def __init__(self, config, durations: DurationHistory, log=None):
+        super().__init__(config, log)
+        self.durations = durations
+        self._default_duration = durations.default()
+        self._unit_durations = {}
+        self._ordered = False
+
+    @staticmethod
+    def supported() -> bool:
+        return callable(getattr(LoadGroupScheduling, '_assign_work_unit', None))
+
+    def schedule(self):
+        """Перед первым распределением один раз вычисляет суммарные длительности единиц работы"""
+        if self.collection is None and self.registered_collections:
+            for nodeid in next(iter(self.registered_collections.values())):
+                scope = self._split_scope(nodeid)
+                self._unit_durations[scope] = self._unit_durations.get(scope, 0.0) + \
+                    self.durations.get(nodeid, self._default_duration)
+        super().schedule()
+
+    def _assign_work_unit(self, node):
+        """
+        При первой выдаче упорядочивает очередь по убыванию длительности, дальше выдает единицы по порядку.
+        Единицы работы, возвращенные в очередь после падения воркера, выдаются в конце
+        """
+        if not self._ordered:
+            for scope in sorted(self.workqueue, key=lambda scope: -self._unit_durations.get(scope, 0.0)):
+                self.workqueue.move_to_end(scope)
+            self._ordered = True
+        super()._assign_work_unit(node)
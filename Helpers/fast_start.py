@@ -0,0 +1,155 @@
+"""
+Быстрый старт прогона: манифест сбора тестов и отчет о времени импорта при сборе для проекта API_tests_example.
+
+Отчет: python -m Helpers.fast_start [--top N] [аргументы pytest]
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import pytest
+from _pytest.mark.expression import Expression
+
+ROOT = Path(__file__).parents[1]
+# Файлы, от которых зависят метки тестов помимо самих модулей тестов
+SHARED_FILES = ('conftest.py', 'pytest.ini')
+
+
+class CollectionManifest:
+    """
+    Манифест сбора Tests/: файл модуля тестов -> (mtime, размер) файла и наборы меток его тестов.
+    Хранится в кеше pytest и обновляется по каждому полному сбору модуля.
+
+    Плагин pytest: регистрируется в каждом процессе (главном и воркерах xdist). При --fast-start и -m модуль,
+    который не изменился с прошлого сбора и в котором нет ни одного теста, подходящего под выражение -m,
+    не импортируется и не собирается вовсе (вместо сбора с последующим отбором)
+    """
+
+    CACHE_KEY = 'api/collection_manifest'
+
+    def __init__(self, config):
+        self.config = config
+        stored = config.cache.get(self.CACHE_KEY, {})
+        self.shared = self.stamps(SHARED_FILES)
+        # Манифест другой версии conftest.py/pytest.ini не используется и пересобирается целиком
+        self.modules = stored.get('modules', {}) if stored.get('shared') == self.shared else {}
+        self.collected = {}  # файл -> запись манифеста для модулей, собранных в этом процессе
+        markexpr = config.getoption('markexpr')
+        self.expression = Expression.compile(markexpr) if config.getoption('fast_start') and markexpr else None
+
+    @staticmethod
+    def stamp(path: Path) -> list:
+        stat = path.stat()
+        return [stat.st_mtime_ns, stat.st_size]
+
+    @classmethod
+    def stamps(cls, file_names) -> dict:
+        return {name: cls.stamp(ROOT.joinpath(name)) for name in file_names if ROOT.joinpath(name).exists()}
+
+    @staticmethod
+    def module_name(path) -> str:
+        return Path(path).resolve().relative_to(ROOT).as_posix()
+
+    def can_skip(self, path: Path) -> bool:
+        """Модуль не изменился с прошлого сбора, и ни один его тест не подходит под выражение -m"""
+        entry = self.modules.get(self.module_name(path))
+        if entry is None or entry['stamp'] != self.stamp(path):
+            return False
+        return not any(self.expression.evaluate(set(markers).__contains__) for markers in entry['markers'])
+
+    # region Хуки pytest
+    def pytest_ignore_collect(self, collection_path, config):
+        if (self.expression is not None and collection_path.suffix == '.py'
+                and collection_path.name.startswith('test_') and self.can_skip(collection_path)):
+            return True
+        return None
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_collection_modifyitems(self, config, items):
+        """
+        Запоминает наборы меток тестов собранных модулей до отбора по -m/-k. При сборе части модуля
+        (аргумент вида файл::тест) манифест не обновляется
+        """
+        if any('::' in arg for arg in config.args):
+            return
+        markers = defaultdict(set)
+        for item in items:
+            markers[item.nodeid.split('::', 1)[0]].add(tuple(sorted({mark.name for mark in item.iter_markers()})))
+        for nodeid, marker_sets in markers.items():
+            path = Path(config.rootpath, nodeid)
+            if path.exists():
+                self.collected[self.module_name(path)] = {'stamp': self.stamp(path),
+                                                          'markers': sorted(marker_sets)}
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):
+        """Добавляет модули, собранные воркером xdist (главный процесс тесты не собирает)"""
+        self.collected.update(getattr(node, 'workeroutput', {}).get('collection_manifest', {}))
+
+    def pytest_sessionfinish(self, session):
+        if hasattr(session.config, 'workerinput'):
+            session.config.workeroutput['collection_manifest'] = self.collected
+            return
+        if self.collected:
+            self.modules.update(self.collected)
+            session.config.cache.set(self.CACHE_KEY, {'shared': self.shared, 'modules': self.modules})
+    # endregion Хуки pytest
+
+
+class ImportTimeReport:
+    """
+    Отчет о времени импорта при сборе тестов: pytest --collect-only выполняется под python -X importtime,
+    время импорта модулей суммируется по пакетам верхнего уровня
+    """
+
+    LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+    def __init__(self, pytest_args: list):
+        self.pytest_args = pytest_args
+        self.wall_time = None
+        self.packages = defaultdict(int)  # пакет -> собственное время импорта его модулей, мкс
+        self.roots = []  # (накопленное время, модуль) для импортов верхнего уровня
+
+    def run(self) -> 'ImportTimeReport':
+        command = [sys.executable, '-X', 'importtime', '-m', 'pytest', '--collect-only', '-q', *self.pytest_args]
+        start = time.perf_counter()
+        result = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+        self.wall_time = time.perf_counter() - start
+        self.parse(result.stderr)
+        return self
+
+    def parse(self, output: str):
+        for line in output.splitlines():
+            match = self.LINE.match(line)
+            if match is None:
+                continue
+            self_us, cumulative_us, indent, module = match.groups()
+            self.packages[module.split('.', 1)[0]] += int(self_us)
+            if len(indent) == 1:
+                self.roots.append((int(cumulative_us), module))
+
+    def print(self, top: int):
+        total = sum(self.packages.values())
+        print(f"Сбор тестов: {self.wall_time:.2f} с, из них импорт модулей: {total / 1e6:.2f} с")
+        print(f"\n{'пакет':<40} {'импорт, мс':>10}")
+        for package, us in sorted(self.packages.items(), key=lambda item: -item[1])[:top]:
+            print(f"{package:<40} {us / 1e3:>10.1f}")
+        print(f"\n{'импорт верхнего уровня':<40} {'с зависимостями, мс':>20}")
+        for cumulative_us, module in sorted(self.roots, reverse=True)[:top]:
+            print(f"{module:<40} {cumulative_us / 1e3:>20.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Время импорта модулей при сборе тестов (python -X importtime)")
+    parser.add_argument('--top', type=int, default=15, help="число строк в каждой таблице отчета")
+    args, pytest_args = parser.parse_known_args()
+    ImportTimeReport(pytest_args or ['Tests']).run().print(args.top)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""Общий для воркеров xdist кеш данных фикстур для проекта API_tests_example"""
+
+import fcntl
+import mmap
+import os
+import pickle
+import shutil
+import struct
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from Data.constants import FIXTURE_CACHE_ENABLED
+
+
+class FixtureCache:
+    """
+    Кеш значений фикстур (ответов API и производных от них данных), общий для всех процессов прогона.
+    Каждое значение хранится в отдельном файле <ключ>.bin в каталоге прогона: заголовок ENTRY_HEADER
+    (время создания, TTL) и pickle значения. Значение получает первый процесс, которому оно понадобилось:
+    он берет эксклюзивную блокировку файла <ключ>.lock, остальные ждут ее и читают готовый файл через mmap.
+    Запись атомарная (временный файл + rename), поэтому читатели не видят недописанных значений.
+
+    Ключи - строки вида '<группа>.<имя>'; invalidate('<группа>') удаляет все значения группы
+    (например, после тестов, меняющих пользователей)
+    """
+
+    ENTRY_HEADER = struct.Struct('<dd')  # время создания (time.time()), TTL в секундах (0 - бессрочно)
+    DIRECTORY = 'fixture-cache'
+
+    def __init__(self, directory, enabled=FIXTURE_CACHE_ENABLED):
+        self.directory = Path(directory)
+        self.enabled = enabled
+        self._loaded = {}  # ключ -> (inode, mtime, создание, TTL, значение)
+        self._lock = threading.RLock()  # factory может обращаться к другим ключам кеша
+        if enabled:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def new_run_id() -> str:
+        return uuid.uuid4().hex
+
+    @classmethod
+    def run_directory(cls, cache_root, run_id: str) -> Path:
+        """Возвращает каталог кеша прогона run_id внутри каталога кеша pytest"""
+        return Path(cache_root) / cls.DIRECTORY / run_id
+
+    def _path(self, key: str, suffix: str) -> Path:
+        if not key or '/' in key or key.startswith('.'):
+            raise ValueError(f"Недопустимый ключ кеша фикстур: {key!r}")
+        return self.directory / f"{key}{suffix}"
+
+    def _read(self, key: str):
+        """Возвращает (найдено, значение) для непросроченного значения ключа"""
+        path = self._path(key, '.bin')
+        try:
+            with open(path, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                loaded = self._loaded.get(key)
+                if loaded is not None and loaded[:2] == (stat.st_ino, stat.st_mtime_ns):
+                    created, ttl, value = loaded[2:]
+                else:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                        created, ttl = self.ENTRY_HEADER.unpack_from(data)
+                        value = pickle.loads(data[self.ENTRY_HEADER.size:])
+                    self._loaded[key] = (stat.st_ino, stat.st_mtime_ns, created, ttl, value)
+        except FileNotFoundError:
+            return False, None
+        if ttl and time.time() - created > ttl:
+            return False, None
+        return True, value
+
+    def _write(self, key: str, value, ttl: float):
+        path = self._path(key, '.bin')
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(temp_path, 'wb') as f:
+            f.write(self.ENTRY_HEADER.pack(time.time(), ttl or 0))
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+
+    def get_or_create(self, key: str, factory, ttl: float = None):
+        """
+        Возвращает значение ключа из кеша; если его нет или истек TTL (с), вызывает factory() и сохраняет
+        результат. Исключения factory не кешируются
+        """
+        if not self.enabled:
+            return factory()
+        with self._lock:
+            found, value = self._read(key)
+            if found:
+                return value
+            with open(self._path(key, '.lock'), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    # Значение могло появиться, пока ждали блокировку
+                    found, value = self._read(key)
+                    if not found:
+                        value = factory()
+                        self._write(key, value, ttl)
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+            return value
+
+    def invalidate(self, prefix: str):
+        """Удаляет значения ключа prefix и всех ключей группы prefix.*"""
+        if not self.enabled:
+            return
+        with self._lock:
+            for path in [*self.directory.glob(f"{prefix}.bin"), *self.directory.glob(f"{prefix}.*.bin")]:
+                with open(path.with_suffix('.lock'), 'a') as lock_file:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                    try:
+                        path.unlink(missing_ok=True)
+                    finally:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+                self._loaded.pop(path.stem, None)
+
+    def clear(self):
+        """Удаляет каталог кеша прогона"""
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,656 @@
+"""
+Генерация граничных и невалидных запросов по JSON-схемам, их параллельное выполнение и минимизация упавших
+случаев (фаззинг) для проекта API_tests_example.
+
+Запуск: python -m Helpers.fuzz [--endpoint NAME] [--cases N] [--rps R] [--concurrency C] [--seed S] [--json]
+"""
+
+import argparse
+import json
+import random
+import re
+import string
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from Data import json_schemas
+from Data.constants import (BASE_URL_COMPANIES, BASE_URL_USERS, FUZZ_CASES_PER_ENDPOINT, FUZZ_CONCURRENCY,
+                            FUZZ_RPS, FUZZ_SEED, FUZZ_SHRINK_STEPS, FUZZ_MAX_VALID_LENGTH, FUZZ_MAX_LENGTH)
+from Helpers.api_client import APIClient
+from Helpers.api_response import APIResponse
+from Helpers.helpers import Helpers
+from Helpers.model_base import ModelValidationError
+from Helpers.schema_validators import SchemaValidators
+
+# Виды случаев: valid - ожидается успешный ответ, invalid - 422, boundary - любой документированный ответ
+VALID, BOUNDARY, INVALID = 'valid', 'boundary', 'invalid'
+KIND_ORDER = (VALID, BOUNDARY, INVALID)
+KIND_WEIGHTS = {VALID: 1, BOUNDARY: 2, INVALID: 3}
+
+TEXT_ALPHABET = string.ascii_letters + string.digits + 'абвгдеёжзийклмнопрстуфхцчшщъыьэюяАБВГДЕЁЖЗИЙ' + " -'."
+# Символы, допустимые в сегменте пути без кодирования; '%' исключен: requests раскодирует %XX
+PATH_ALPHABET = string.ascii_letters + string.digits + "-._~!$&'()*+,;=:@"
+SPECIAL_TEXTS = ("O'Brien", 'Анна-Мария', '<script>alert(1)</script>', "'; DROP TABLE users; --", '😀', 'Ñandú',
+                 'a\x00b', '\u200b', 'null', 'None')
+
+
+class _Absent:
+    """Значение отсутствующего параметра или поля"""
+
+    def __repr__(self):
+        return '<отсутствует>'
+
+
+ABSENT = _Absent()
+
+
+def random_text(rnd: random.Random, alphabet: str, min_length: int, max_length: int) -> str:
+    return ''.join(rnd.choices(alphabet, k=rnd.randint(min_length, max_length)))
+
+
+def shorter(value) -> list:
+    """Варианты упрощения значения для минимизации: пустое, половина, без первого и последнего элемента"""
+    if isinstance(value, bool):
+        return []
+    if isinstance(value, int):
+        half = value // 2 if value > 0 else -(-value // 2)
+        return [candidate for candidate in dict.fromkeys((0, half, value - (value > 0) + (value < 0)))
+                if candidate != value]
+    if isinstance(value, float):
+        return [candidate for candidate in dict.fromkeys((int(value), round(value, 1), value / 2))
+                if candidate != value]
+    if isinstance(value, dict):
+        return [{}] + [{k: v for k, v in value.items() if k != key} for key in value] if value else []
+    if isinstance(value, (str, bytes, list)) and value:
+        return list(dict.fromkeys((value[:0], value[:len(value) // 2], value[1:], value[:-1])))
+    return []
+
+
+class Field(ABC):
+    """
+    Параметр запроса (query, path) или поле тела (body) со своей схемой. classify определяет вид значения
+    (valid/boundary/invalid) по значению, а не по способу генерации, поэтому ожидание к ответу остается
+    верным и для значений, полученных при минимизации
+    """
+
+    KINDS = KIND_ORDER
+
+    def __init__(self, name: str, location: str, required=False):
+        self.name = name
+        self.location = location
+        self.required = required or location == 'path'
+
+    @abstractmethod
+    def classify(self, value) -> str:
+        """Вид значения (valid/boundary/invalid); ABSENT - поле не передано"""
+
+    @abstractmethod
+    def generate(self, rnd: random.Random, kind: str):
+        """Случайное значение вида kind (ABSENT - не передавать поле), которое можно передать (accepts)"""
+
+    def accepts(self, value) -> bool:
+        """Можно ли передать значение: сегмент пути не может быть пустым, содержать '/', '?', '#' или '%'"""
+        if self.location != 'path':
+            return True
+        if value is ABSENT:
+            return False
+        text = str(value)
+        return bool(text.strip('.')) and not any(char in text for char in '/?#%')
+
+    def simplify(self, value) -> list:
+        return [candidate for candidate in shorter(value) if self.accepts(candidate)]
+
+
+class IntegerParam(Field):
+    """Целочисленный параметр query или path: передается строкой"""
+
+    def classify(self, value) -> str:
+        if value is ABSENT:
+            return INVALID if self.required else VALID
+        text = value if isinstance(value, str) else str(value)
+        if re.fullmatch(r'[0-9]+', text):
+            return VALID if int(text) < 2 ** 63 else BOUNDARY
+        if re.fullmatch(r'-[0-9]+', text) and int(text) < 0:
+            return INVALID
+        try:
+            int(text)  # пробелы, '+', '_', цифры других алфавитов: зависит от парсера сервера
+        except ValueError:
+            return INVALID
+        return BOUNDARY
+
+    def generate(self, rnd: random.Random, kind: str):
+        while True:
+            if kind == VALID:
+                value = rnd.choice([0, 1, rnd.randint(2, 10), rnd.randint(11, 10 ** 4), f'{rnd.randint(0, 99):03d}'])
+            elif kind == BOUNDARY:
+                # Не больше 64 бит: эхо большего числа в meta orjson разбирает как float
+                value = rnd.choice([2 ** 31 - 1, 2 ** 31, 2 ** 63 - 1, 2 ** 63, rnd.randint(2 ** 63, 2 ** 64 - 1),
+                                    ' 1', '1 ', '+1', '1_0', '-0', '٣', '0' * rnd.randint(20, 100)])
+            else:
+                alphabet = PATH_ALPHABET if self.location == 'path' else TEXT_ALPHABET
+                value = rnd.choice([-1, -rnd.randint(2, 10 ** 6), 'ABC', '', '1.5', str(rnd.uniform(-100, 100)),
+                                    'true', 'null', '1e3', '0x1F', '--1', '1-1', True,
+                                    random_text(rnd, alphabet, 1, 20)])
+            if self.accepts(value):
+                return value
+
+
+class EnumParam(Field):
+    """Параметр query со значением из enum схемы"""
+
+    KINDS = (VALID, INVALID)
+
+    def __init__(self, name: str, location: str, values: list, required=False):
+        super().__init__(name, location, required)
+        self.values = tuple(values)
+
+    def classify(self, value) -> str:
+        if value is ABSENT:
+            return INVALID if self.required else VALID
+        return VALID if isinstance(value, str) and value in self.values else INVALID
+
+    def generate(self, rnd: random.Random, kind: str):
+        value = rnd.choice(self.values)
+        if kind == VALID:
+            return value
+        return rnd.choice([value.lower(), value.capitalize(), f' {value}', f'{value} ', value[:-1], '',
+                           random_text(rnd, TEXT_ALPHABET, 1, 20), rnd.randint(0, 999), True])
+
+
+class StringField(Field):
+    """Строковое поле тела; если в схеме тип ["string", "null"], поле необязательное и допускает null"""
+
+    def __init__(self, name: str, nullable: bool):
+        super().__init__(name, 'body', required=not nullable)
+        self.nullable = nullable
+
+    def classify(self, value) -> str:
+        if value is ABSENT:
+            return INVALID if self.required else VALID
+        if value is None:
+            return VALID if self.nullable else INVALID
+        if not isinstance(value, str):
+            return INVALID
+        if not value.strip():
+            return INVALID if self.required else BOUNDARY
+        if len(value) <= FUZZ_MAX_VALID_LENGTH:
+            return VALID
+        return BOUNDARY if len(value) <= FUZZ_MAX_LENGTH else INVALID
+
+    def generate(self, rnd: random.Random, kind: str):
+        if kind == VALID:
+            options = [random_text(rnd, TEXT_ALPHABET, 1, 30).strip() or 'a', rnd.choice(SPECIAL_TEXTS)]
+            options += [None, ABSENT] if not self.required else []
+        elif kind == BOUNDARY:
+            options = ['a' * rnd.choice([FUZZ_MAX_VALID_LENGTH + 1, 255, 256, 1000]),
+                       random_text(rnd, TEXT_ALPHABET, FUZZ_MAX_VALID_LENGTH + 1, FUZZ_MAX_LENGTH)]
+            options += ['', ' ' * rnd.randint(1, 5)] if not self.required else []
+        else:
+            options = [rnd.randint(-10 ** 6, 10 ** 6), rnd.uniform(-100, 100), rnd.choice([True, False]),
+                       [], [random_text(rnd, TEXT_ALPHABET, 1, 5)], {}, {'value': 'a'},
+                       'a' * rnd.randint(FUZZ_MAX_LENGTH + 1, 4 * FUZZ_MAX_LENGTH)]
+            options += [ABSENT, None, '', ' ' * rnd.randint(1, 5)] if self.required else []
+        return rnd.choice(options)
+
+
+class IntegerField(Field):
+    """
+    Целочисленное поле тела - ссылка на другую сущность (company_id): результат для целого числа зависит
+    от данных (нет такой сущности, неподходящий статус), поэтому любое целое - граничный случай
+    """
+
+    def __init__(self, name: str, nullable: bool):
+        super().__init__(name, 'body', required=not nullable)
+        self.nullable = nullable
+
+    def classify(self, value) -> str:
+        if value is ABSENT:
+            return INVALID if self.required else VALID
+        if value is None:
+            return VALID if self.nullable else INVALID
+        if isinstance(value, bool):
+            return INVALID
+        if isinstance(value, int):
+            return BOUNDARY
+        if isinstance(value, float):
+            return BOUNDARY if value.is_integer() else INVALID
+        if isinstance(value, str):
+            try:
+                int(value)  # строку с целым сервер может привести к числу
+            except ValueError:
+                return INVALID
+            return BOUNDARY
+        return INVALID
+
+    def generate(self, rnd: random.Random, kind: str):
+        if kind == VALID:
+            return rnd.choice([None, ABSENT] if not self.required else [rnd.randint(1, 10)])
+        if kind == BOUNDARY:
+            return rnd.choice([-1, 0, rnd.randint(1, 10), rnd.randint(11, 10 ** 6), 2 ** 31, 2 ** 63, 2.0, '1'])
+        return rnd.choice(['ABC', '', ' ', 1.5, rnd.uniform(-100, 100), True, False, [], [1], {}, {'id': 1}])
+
+
+class BodyDocument(Field):
+    """Тело запроса целиком: JSON не-объект или синтаксически неверный JSON заменяет сгенерированный объект"""
+
+    KINDS = (INVALID,)
+
+    def __init__(self):
+        super().__init__('$body', 'body')
+
+    def classify(self, value) -> str:
+        return VALID if value is ABSENT else INVALID
+
+    def generate(self, rnd: random.Random, kind: str):
+        return rnd.choice([[], [{}], 'text', 1, True, None, b'', b'{', b'not json', b'{"last_name": }', b'\xff'])
+
+
+class FuzzCase:
+    """Значения параметров и полей запроса; target - поле, значение которого сгенерировано под вид случая"""
+
+    __slots__ = ('values', 'target')
+
+    def __init__(self, values: dict, target: str):
+        self.values = values
+        self.target = target
+
+    def replace(self, name: str, value) -> 'FuzzCase':
+        values = {key: item for key, item in self.values.items() if key != name}
+        if value is not ABSENT:
+            values[name] = value
+        return FuzzCase(values, self.target)
+
+    def key(self) -> tuple:
+        """Ключ для исключения повторов: 1, True и 1.0 - разные случаи"""
+        return tuple(sorted((name, type(value).__name__, repr(value)) for name, value in self.values.items()))
+
+    def describe(self) -> dict:
+        return {name: value if isinstance(value, (str, int, float, bool, type(None), list, dict)) else repr(value)
+                for name, value in self.values.items()}
+
+    def __repr__(self):
+        return f'FuzzCase({self.describe()!r})'
+
+
+class Endpoint:
+    """
+    Эндпойнт для фаззинга: поля запроса и документированные ответы (статус -> схема тела).
+    Ожидаемый статус: valid - valid_statuses, invalid - 422, boundary - любой документированный.
+    created_path - путь удаления созданной сущности (по полям тела ответа 201)
+    """
+
+    def __init__(self, name: str, method: str, base_url: str, path: str, fields: list, responses: dict,
+                 valid_statuses: tuple, created_path: str = None):
+        self.name = name
+        self.method = method
+        self.base_url = base_url
+        self.path = path
+        self.fields = fields
+        self.responses = responses
+        self.valid_statuses = valid_statuses
+        self.created_path = created_path
+
+    @property
+    def label(self) -> str:
+        return Helpers.get_endpoint_label(self.method, f'{self.base_url}{self.path}')
+
+    def kind(self, case: FuzzCase) -> str:
+        """Вид случая - худший из видов значений его полей"""
+        return max((field.classify(case.values.get(field.name, ABSENT)) for field in self.fields),
+                   key=KIND_ORDER.index)
+
+    def expected_statuses(self, kind: str) -> tuple:
+        if kind == VALID:
+            return self.valid_statuses
+        if kind == INVALID:
+            return (422,)
+        return tuple(self.responses)
+
+    def random_case(self, rnd: random.Random) -> FuzzCase:
+        target = rnd.choice(self.fields)
+        kind = rnd.choices(target.KINDS, weights=[KIND_WEIGHTS[kind] for kind in target.KINDS])[0]
+        values = {}
+        for field in self.fields:
+            if field is target:
+                value = field.generate(rnd, kind)
+            elif isinstance(field, BodyDocument) or (isinstance(target, BodyDocument) and field.location == 'body'):
+                continue
+            elif field.required or rnd.random() < 0.5:
+                value = field.generate(rnd, VALID)
+            else:
+                continue
+            if value is not ABSENT:
+                values[field.name] = value
+        return FuzzCase(values, target.name)
+
+    def request(self, case: FuzzCase) -> tuple:
+        """Возвращает (путь, аргументы вызова APIClient) для случая"""
+        path = self.path.format(**{field.name: case.values[field.name] for field in self.fields
+                                   if field.location == 'path'})
+        kwargs = {}
+        params = {field.name: case.values[field.name] for field in self.fields
+                  if field.location == 'query' and field.name in case.values}
+        if params:
+            kwargs['params'] = params
+        if any(field.location == 'body' for field in self.fields):
+            if '$body' in case.values:
+                body = case.values['$body']
+                data = body if isinstance(body, bytes) else APIResponse.dumps(body)
+            else:
+                data = APIResponse.dumps({field.name: case.values[field.name] for field in self.fields
+                                          if field.location == 'body' and field.name in case.values})
+            kwargs.update(data=data, headers={"Content-Type": "application/json"})
+        return path, kwargs
+
+    def check(self, case: FuzzCase, response: requests.Response) -> tuple:
+        """Проверяет свойства ответа; возвращает (проблема, подробности) или (None, None)"""
+        kind = self.kind(case)
+        status = response.status_code
+        if status >= 500:
+            return f'статус {status}', response.text[:200]
+        if status not in self.responses:
+            return f'недокументированный статус {status}', response.text[:200]
+        expected = self.expected_statuses(kind)
+        if status not in expected:
+            return f"статус {status}, ожидается {'/'.join(map(str, expected))} ({kind})", response.text[:200]
+        try:
+            body = response.json()
+        except ValueError:
+            return f'тело ответа {status} не JSON', response.text[:200]
+        schema = self.responses[status]
+        model = SchemaValidators.model(schema)
+        try:
+            if model is not None:
+                model.from_json(body)
+            else:
+                SchemaValidators.validate(schema, body)
+        except ModelValidationError as e:
+            return f'тело ответа {status} не соответствует схеме', str(e)
+        return None, None
+
+
+def _field_from_schema(name: str, schema: dict) -> Field:
+    types = schema['type'] if isinstance(schema['type'], list) else [schema['type']]
+    field_class = IntegerField if 'integer' in types else StringField
+    return field_class(name, nullable='null' in types)
+
+
+def _pagination_params(schema: dict) -> list:
+    """Параметры постраничной выдачи: поля meta списка, кроме total"""
+    meta = schema['properties']['meta']['properties']
+    return [IntegerParam(name, 'query') for name in meta if name != 'total' and meta[name]['type'] == 'integer']
+
+
+def build_endpoints() -> dict:
+    """Эндпойнты с полями, выведенными из схем Data/json_schemas.py"""
+    company_status = json_schemas.COMPANIES_MAIN['properties']['data']['items']['properties']['company_status']
+    errors = {404: json_schemas.NOT_FOUND_404, 422: json_schemas.UNPROCESSABLE_ENTITY_422}
+    user_fields = [_field_from_schema(name, schema) for name, schema
+                   in json_schemas.USER_CREATED['properties'].items() if name != 'user_id']
+    endpoints = [
+        Endpoint('companies_list', 'GET', BASE_URL_COMPANIES, '',
+                 _pagination_params(json_schemas.COMPANIES_MAIN) + [
+                     EnumParam('status', 'query', company_status['enum'])],
+                 {200: json_schemas.COMPANIES_MAIN, 422: json_schemas.UNPROCESSABLE_ENTITY_422}, (200,)),
+        Endpoint('company_by_id', 'GET', BASE_URL_COMPANIES, '/{company_id}', [IntegerParam('company_id', 'path')],
+                 {200: json_schemas.COMPANY_BY_ID, **errors}, (200, 404)),
+        Endpoint('users_list', 'GET', BASE_URL_USERS, '', _pagination_params(json_schemas.USERS_MAIN),
+                 {200: json_schemas.USERS_MAIN, 422: json_schemas.UNPROCESSABLE_ENTITY_422}, (200,)),
+        Endpoint('user_by_id', 'GET', BASE_URL_USERS, '/{user_id}', [IntegerParam('user_id', 'path')],
+                 {200: json_schemas.USER_BY_ID, **errors}, (200, 404)),
+        Endpoint('user_create', 'POST', BASE_URL_USERS, '', user_fields + [BodyDocument()],
+                 {201: json_schemas.USER_CREATED, 400: json_schemas.BAD_REQUEST_400, **errors}, (201,),
+                 created_path='/{user_id}'),
+    ]
+    return {endpoint.name: endpoint for endpoint in endpoints}
+
+
+ENDPOINTS = build_endpoints()
+
+
+def _negative_integer(value) -> bool:
+    return not isinstance(value, bool) and re.fullmatch(r'-0*[1-9][0-9]*', str(value)) is not None
+
+
+class KnownBug:
+    """
+    Известный баг API (комментарии «БАГ» в Tests/): случай эндпойнта, целевое поле которого из fields
+    со значением, подходящим под matches, получило вместо ожидаемого статус из statuses. Такие случаи
+    учитываются в отчете отдельно и не считаются провалом фаззинга
+    """
+
+    def __init__(self, description: str, endpoint: str, fields: tuple, statuses: tuple, matches):
+        self.description = description
+        self.endpoint = endpoint
+        self.fields = fields
+        self.statuses = statuses
+        self.matches = matches
+
+    def applies(self, endpoint: Endpoint, case: FuzzCase, status, problem: str) -> bool:
+        return (endpoint.name == self.endpoint and case.target in self.fields and status in self.statuses
+                and problem.startswith(f'статус {status}, ожидается')
+                and self.matches(case.values.get(case.target, ABSENT)))
+
+
+# Созданный пользователь может оказаться в несуществующей (404) или закрытой (400) компании
+_USER_CREATE_STATUSES = (201, 400, 404)
+KNOWN_BUGS = (
+    KnownBug("отрицательный limit/offset - 200 вместо 422", 'companies_list', ('limit', 'offset'), (200,),
+             _negative_integer),
+    KnownBug("отрицательный limit/offset - 200 вместо 422", 'users_list', ('limit', 'offset'), (200,),
+             _negative_integer),
+    KnownBug("отрицательный ID компании - 404 вместо 422", 'company_by_id', ('company_id',), (404,),
+             _negative_integer),
+    KnownBug("дробный company_id принимается (компания trunc(company_id))", 'user_create', ('company_id',),
+             _USER_CREATE_STATUSES, lambda value: isinstance(value, float)),
+    KnownBug("нестроковое значение текстового поля приводится к строке", 'user_create', ('first_name', 'last_name'),
+             _USER_CREATE_STATUSES, lambda value: isinstance(value, (bool, int, float, list, dict))),
+    KnownBug("пустая строка в обязательном поле принимается", 'user_create', ('last_name',),
+             _USER_CREATE_STATUSES, lambda value: isinstance(value, str) and not value.strip()),
+    KnownBug("длинный текст в текстовом поле принимается", 'user_create', ('first_name', 'last_name'),
+             _USER_CREATE_STATUSES, lambda value: isinstance(value, str) and len(value) > FUZZ_MAX_LENGTH),
+)
+
+
+class RateLimiter:
+    """Не больше rps запусков в секунду на все потоки: запуски равномерно распределяются во времени"""
+
+    def __init__(self, rps: float):
+        self.interval = 1 / rps if rps else 0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            start_at, self._next = self._next, max(self._next, time.monotonic()) + self.interval
+        time.sleep(max(start_at - time.monotonic(), 0))
+
+
+class FuzzReport:
+    """Итог фаззинга эндпойнта: число случаев по видам и статусам, упавшие случаи по группам"""
+
+    def __init__(self, endpoint: Endpoint):
+        self.endpoint = endpoint
+        self.cases = 0
+        self.kinds = Counter()
+        self.statuses = Counter()
+        self.failures = {}  # (поле, проблема) -> группа упавших случаев
+        self.known_bugs = Counter()  # описание известного бага -> число случаев
+        self.not_deleted = []
+        self.duration = 0.0
+
+    def add_failure(self, case: FuzzCase, problem: str, detail: str):
+        group = self.failures.setdefault((case.target, problem), {'count': 0, 'example': case, 'detail': detail})
+        group['count'] += 1
+        if len(repr(case)) < len(repr(group['example'])):
+            group['example'], group['detail'] = case, detail
+
+    def to_dict(self) -> dict:
+        return {'endpoint': self.endpoint.label, 'cases': self.cases, 'duration_s': round(self.duration, 2),
+                'kinds': dict(self.kinds), 'statuses': {str(status): count for status, count in self.statuses.items()},
+                'not_deleted': self.not_deleted, 'known_bugs': dict(self.known_bugs),
+                'failures': [{'field': field, 'problem': problem, 'count': group['count'], 'detail': group['detail'],
+                              'minimal': group['minimal'].describe(), 'shrink_steps': group['shrink_steps']}
+                             for (field, problem), group in self.failures.items()]}
+
+    def summary(self) -> str:
+        lines = [f"{self.endpoint.label}: {self.cases} случаев за {self.duration:.2f} с, "
+                 f"упавших групп: {len(self.failures)}"]
+        for description, count in self.known_bugs.items():
+            lines.append(f"  известный баг: {description} - {count} случаев")
+        for (field, problem), group in self.failures.items():
+            lines.append(f"  {field}: {problem} - {group['count']} случаев; "
+                         f"минимальный: {group['minimal'].describe()} ({group['detail']})")
+        return '\n'.join(lines)
+
+
+class FuzzEngine:
+    """
+    Фаззинг эндпойнтов: генерирует случаи (по одному полю с граничным или невалидным значением, остальные
+    поля - валидные или отсутствуют), выполняет их параллельно через APIClient с ограничением интенсивности
+    и проверяет свойства ответа: статус не 5xx и документирован, соответствует виду случая, тело соответствует
+    схеме статуса. Упавшие случаи группируются по полю и проблеме, для каждой группы кратчайший пример
+    минимизируется: убираются лишние поля и упрощается значение, пока проблема воспроизводится.
+    Случаи известных багов API (known_bugs) учитываются отдельно и не минимизируются.
+    Созданные случаями сущности удаляются сразу; on_change вызывается после прогона, если они были
+    """
+
+    def __init__(self, session: requests.Session = None, rps=FUZZ_RPS, concurrency=FUZZ_CONCURRENCY,
+                 seed=FUZZ_SEED, shrink_steps=FUZZ_SHRINK_STEPS, on_change=None, known_bugs=KNOWN_BUGS):
+        self.session = session
+        self.known_bugs = known_bugs
+        self.limiter = RateLimiter(rps)
+        self.concurrency = concurrency
+        self.seed = seed
+        self.shrink_steps = shrink_steps
+        self.on_change = on_change
+        self._clients = {}
+        self._created = False
+        self._lock = threading.Lock()
+
+    def _client(self, base_url: str) -> APIClient:
+        if base_url not in self._clients:
+            self._clients[base_url] = APIClient(base_url=base_url, session=self.session)
+        return self._clients[base_url]
+
+    def generate(self, endpoint: Endpoint, count: int) -> list:
+        """Различные случаи; генерация воспроизводима по seed и имени эндпойнта"""
+        rnd = random.Random(f'{self.seed}:{endpoint.name}')
+        cases, seen = [], set()
+        for _ in range(count * 10):
+            if len(cases) >= count:
+                break
+            case = endpoint.random_case(rnd)
+            if case.key() not in seen:
+                seen.add(case.key())
+                cases.append(case)
+        return cases
+
+    def execute(self, endpoint: Endpoint, case: FuzzCase, report: FuzzReport) -> tuple:
+        """
+        Выполняет случай и возвращает (статус, проблема, подробности); созданную сущность сразу удаляет,
+        неудаленную - добавляет в report.not_deleted
+        """
+        self.limiter.wait()
+        path, kwargs = endpoint.request(case)
+        client = self._client(endpoint.base_url)
+        try:
+            response = getattr(client, endpoint.method.lower())(path=path, **kwargs)
+        except requests.RequestException as e:
+            return None, f'исключение {type(e).__name__}', str(e)
+        if endpoint.created_path and response.status_code == 201:
+            self._delete(endpoint, response, report)
+        return (response.status_code, *endpoint.check(case, response))
+
+    def _delete(self, endpoint: Endpoint, response: requests.Response, report: FuzzReport):
+        self._created = True
+        try:
+            path = endpoint.created_path.format(**response.json())
+            deleted = self._client(endpoint.base_url).delete(path=path).status_code in (200, 202, 204, 404)
+        except (requests.RequestException, ValueError, KeyError, TypeError):
+            path, deleted = response.text[:200], False
+        if not deleted:
+            with self._lock:
+                report.not_deleted.append(path)
+
+    def candidates(self, endpoint: Endpoint, case: FuzzCase):
+        """Упрощения случая: без одного из остальных полей, затем более простое значение целевого поля"""
+        fields = {field.name: field for field in endpoint.fields}
+        for name in case.values:
+            if name != case.target and not fields[name].location == 'path':
+                yield case.replace(name, ABSENT)
+        if case.target in case.values:
+            for value in fields[case.target].simplify(case.values[case.target]):
+                yield case.replace(case.target, value)
+
+    def shrink(self, endpoint: Endpoint, case: FuzzCase, problem: str, report: FuzzReport) -> tuple:
+        """
+        Жадно упрощает случай, пока проблема воспроизводится; возвращает (минимальный случай, число запросов).
+        Сущности, созданные при минимизации, удаляются так же, как в основном прогоне
+        """
+        steps, improved = 0, True
+        while improved and steps < self.shrink_steps:
+            improved = False
+            for candidate in self.candidates(endpoint, case):
+                if steps >= self.shrink_steps:
+                    break
+                steps += 1
+                if self.execute(endpoint, candidate, report)[1] == problem:
+                    case, improved = candidate, True
+                    break
+        return case, steps
+
+    def run(self, endpoint: Endpoint, count=FUZZ_CASES_PER_ENDPOINT) -> FuzzReport:
+        report = FuzzReport(endpoint)
+        start = time.perf_counter()
+        cases = self.generate(endpoint, count)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            results = list(pool.map(lambda case: self.execute(endpoint, case, report), cases))
+        report.cases = len(cases)
+        for case, (status, problem, detail) in zip(cases, results):
+            report.kinds[endpoint.kind(case)] += 1
+            if status is not None:
+                report.statuses[status] += 1
+            if problem is None:
+                continue
+            bug = next((bug for bug in self.known_bugs if bug.applies(endpoint, case, status, problem)), None)
+            if bug is not None:
+                report.known_bugs[bug.description] += 1
+            else:
+                report.add_failure(case, problem, detail)
+        for (_, problem), group in report.failures.items():
+            group['minimal'], group['shrink_steps'] = self.shrink(endpoint, group['example'], problem, report)
+        report.duration = time.perf_counter() - start
+        if self._created and self.on_change is not None:
+            self.on_change()
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Фаззинг эндпойнтов по JSON-схемам")
+    parser.add_argument('--endpoint', action='append', choices=list(ENDPOINTS),
+                        help="эндпойнт (можно указать несколько раз), по умолчанию - все")
+    parser.add_argument('--cases', type=int, default=FUZZ_CASES_PER_ENDPOINT, help="случаев на эндпойнт")
+    parser.add_argument('--rps', type=float, default=FUZZ_RPS, help="ограничение интенсивности, 0 - без ограничения")
+    parser.add_argument('--concurrency', type=int, default=FUZZ_CONCURRENCY, help="число потоков")
+    parser.add_argument('--seed', type=int, default=FUZZ_SEED)
+    parser.add_argument('--json', action='store_true', help="вывести отчет в JSON")
+    args = parser.parse_args()
+    engine = FuzzEngine(rps=args.rps, concurrency=args.concurrency, seed=args.seed)
+    reports = [engine.run(ENDPOINTS[name], args.cases) for name in args.endpoint or ENDPOINTS]
+    if args.json:
+        print(json.dumps([report.to_dict() for report in reports], indent=2, ensure_ascii=False))
+    else:
+        print('\n'.join(report.summary() for report in reports))
+    APIClient.close_shared_session()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,9 @@
 """Вспомогательные инструменты для проекта API_tests_example"""
 
-import csv
-from pathlib import Path
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from Helpers.data_loader import DataLoader
 
 
 class Helpers:
@@ -9,8 +11,33 @@ class Helpers:
 
     @staticmethod
     def get_test_data_from_csv(file_name):
-        """Парсит файл csv и возвращает список значений построчно"""
-        path = Path(__file__).parents[1].joinpath('Data').joinpath(file_name)
-        with open(path, 'rt') as f:
-            reader = csv.reader(f, delimiter=',')
-            return [*reader]  # [[line10, line11], [line20, line21]...]
+        """
+        Возвращает значения файла csv из Data/ построчно в виде строк: [[line10, line11], [line20, line21]...].
+        Оставлен для совместимости: типизированные данные, поиск и выборка - DataLoader
+        """
+        return [[str(value) for value in row] for row in DataLoader.default().load(file_name).stream()]
+
+    @staticmethod
+    def group_companies_by_statuses(companies) -> dict:
+        """
+        Составляет словарь статусов и соответствующих им списков ID компаний по всем страницам
+        списка компаний (Paginator) и проверяет, что получены все объекты из базы
+        """
+        counter = defaultdict(list)
+        received = 0
+        for company in companies:
+            counter[company['company_status']].append(company['company_id'])
+            received += 1
+        assert received == companies.total, f"Получены не все компании: {received} из {companies.total}"
+        return counter
+
+    @staticmethod
+    def get_endpoint_label(method: str, url: str) -> str:
+        """
+        Возвращает метку эндпойнта для метрик: метод и путь URL, где идентификатор ресурса
+        (/api/<ресурс>/<id>) заменен на {id}
+        """
+        parts = (urlsplit(url).path.rstrip('/') or '/').split('/')
+        if len(parts) > 3 and parts[1] == 'api':
+            parts[3] = '{id}'
+        return f"{method.upper()} {'/'.join(parts) or '/'}"
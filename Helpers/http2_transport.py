@@ -0,0 +1,180 @@
+"""Транспорт HTTP/2 (мультиплексирование запросов в одном соединении) для APIClient проекта API_tests_example"""
+
+import logging
+import threading
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+try:
+    import httpx
+except ImportError:  # httpx необязателен: без него используется HTTP/1.1
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+
+class _HTTPXRaw:
+    """
+    Замена urllib3.HTTPResponse в response.raw: версия протокола в том же формате (11, 20) и потоковое чтение тела
+    через httpx для iter_content. Ошибки httpx при чтении тела преобразуются в исключения requests так же,
+    как requests преобразует ошибки urllib3 в iter_content
+    """
+
+    VERSIONS = {'HTTP/1.0': 10, 'HTTP/1.1': 11, 'HTTP/2': 20}
+    CHUNK_SIZE = 16 * 1024
+
+    def __init__(self, response):
+        self._response = response
+        self._chunks = None
+        self._buffer = bytearray()
+        self.version = self.VERSIONS.get(response.http_version, 0)
+
+    def _iter_bytes(self):
+        try:
+            yield from self._response.iter_bytes()
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.ConnectionError(e)
+        except httpx.DecodingError as e:
+            raise requests.exceptions.ContentDecodingError(e)
+        except httpx.TransportError as e:
+            raise requests.exceptions.ChunkedEncodingError(e)
+
+    def stream(self, chunk_size=None, decode_content=True):
+        while data := self.read(chunk_size or self.CHUNK_SIZE):
+            yield data
+
+    def read(self, amt=None, decode_content=True):
+        """Читает amt байт тела (меньше - только в конце тела) или, без amt, весь остаток"""
+        if self._chunks is None:
+            self._chunks = self._iter_bytes()
+        while amt is None or len(self._buffer) < amt:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        size = len(self._buffer) if amt is None else amt
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def close(self):
+        self._response.close()
+
+
+class HTTP2Adapter(BaseAdapter):
+    """
+    Адаптер requests, отправляющий запросы через httpx.Client с HTTP/2: одновременные запросы к одному хосту
+    мультиплексируются в одном TLS-соединении. Протокол выбирается через ALPN, поэтому сервер без HTTP/2
+    прозрачно обслуживается по HTTP/1.1. Монтируется только для https:// - без TLS HTTP/2 не согласуется.
+    Ошибки httpx преобразуются в исключения requests, на которые рассчитаны RetryPolicy и тесты.
+    Новые соединения учитываются по событиям трассировки httpcore (extensions['trace']).
+    transport - транспорт httpx вместо сетевого (например, httpx.MockTransport в тестах)
+    """
+
+    def __init__(self, max_connections: int, transport=None):
+        super().__init__()
+        self.max_connections = max_connections
+        self.transport = transport
+        self._clients = {}  # (verify, cert) -> httpx.Client: в httpx это параметры клиента, а не запроса
+        self._lock = threading.Lock()
+        self._new_connections = 0
+        self._requests_sent = 0
+
+    @staticmethod
+    def available() -> bool:
+        """Установлены ли httpx и h2"""
+        if httpx is None:
+            return False
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def _client(self, verify, cert):
+        key = (verify, cert if not isinstance(cert, list) else tuple(cert))
+        with self._lock:  # сессию используют потоки AsyncAPIClient: клиент для ключа создается один раз
+            client = self._clients.get(key)
+            if client is None:
+                limits = httpx.Limits(max_connections=self.max_connections,
+                                      max_keepalive_connections=self.max_connections)
+                client = self._clients[key] = httpx.Client(http2=True, verify=verify, cert=cert, limits=limits,
+                                                           follow_redirects=False, transport=self.transport)
+            return client
+
+    @staticmethod
+    def _timeout(timeout):
+        """Таймаут requests (число или пара connect, read) в формате httpx"""
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return httpx.Timeout(read, connect=connect)
+        return httpx.Timeout(timeout)
+
+    def _trace(self, event: str, info: dict):
+        """Обработчик трассировки httpcore: TCP-соединение устанавливается только для нового соединения"""
+        if event == 'connection.connect_tcp.complete':
+            with self._lock:
+                self._new_connections += 1
+
+    def connection_stats(self) -> dict:
+        """Возвращает число новых и переиспользованных соединений (при HTTP/2 - в т.ч. мультиплексированных)"""
+        with self._lock:
+            return {'new': self._new_connections,
+                    'reused': max(self._requests_sent - self._new_connections, 0)}
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        client = self._client(verify, cert)
+        httpx_request = client.build_request(request.method, request.url, headers=dict(request.headers),
+                                             content=request.body, timeout=self._timeout(timeout),
+                                             extensions={'trace': self._trace})
+        with self._lock:
+            self._requests_sent += 1
+        try:
+            httpx_response = client.send(httpx_request, stream=stream)
+            if not stream:
+                httpx_response.read()
+        except httpx.ConnectTimeout as e:
+            raise requests.exceptions.ConnectTimeout(e, request=request)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.ReadTimeout(e, request=request)
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(e, request=request)
+        return self.build_response(request, httpx_response, stream)
+
+    def build_response(self, request, httpx_response, stream: bool) -> requests.Response:
+        """Собирает requests.Response из ответа httpx"""
+        response = requests.Response()
+        response.status_code = httpx_response.status_code
+        response.headers = CaseInsensitiveDict(httpx_response.headers.items())
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.reason = httpx_response.reason_phrase
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.raw = _HTTPXRaw(httpx_response)
+        if not stream:
+            response._content = httpx_response.content
+            response._content_consumed = True
+        return response
+
+    def close(self):
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+    @classmethod
+    def mount(cls, session: requests.Session, max_connections: int) -> bool:
+        """
+        Монтирует адаптер в сессию для https://; если httpx или h2 не установлены, сессия остается на HTTP/1.1
+        (с предупреждением в логе). Возвращает, смонтирован ли адаптер
+        """
+        if not cls.available():
+            logger.warning("HTTP/2 недоступен (не установлены httpx и h2): запросы идут по HTTP/1.1")
+            return False
+        session.mount('https://', cls(max_connections))
+        return True
@@ -0,0 +1,257 @@
+"""
+Замеры латентности запросов APIClient, гистограммы и бюджеты времени ответа по эндпойнтам
+для проекта API_tests_example
+"""
+
+import csv
+import json
+import math
+import threading
+from collections import defaultdict
+from pathlib import Path
+
+from Data.constants import (LATENCY_BUDGETS_ENABLED, LATENCY_BUDGETS, LATENCY_BUDGET_SCALE, LATENCY_BUDGET_MIN_SAMPLES,
+                            CASSETTE_MODE)
+from Helpers.helpers import Helpers
+
+_current = threading.local()
+
+
+def start_request_timing() -> dict:
+    """Начинает сбор фаз запроса в текущем потоке и возвращает словарь, куда они записываются"""
+    _current.timing = {'dns': 0.0, 'connect': 0.0, 'tls': None, 'new_connections': 0}  # tls - только для https
+    return _current.timing
+
+
+def current_request_timing():
+    """Возвращает словарь фаз запроса текущего потока или None, если замер не ведется"""
+    return getattr(_current, 'timing', None)
+
+
+def finish_request_timing():
+    """Завершает сбор фаз запроса в текущем потоке"""
+    _current.timing = None
+
+
+class LatencyHistogram:
+    """
+    Гистограмма в стиле HdrHistogram: значения раскладываются по диапазонам [2**k, 2**(k+1)), каждый из которых
+    разбит на 2**(SUB_BUCKET_BITS - 1) линейных корзин; значения меньше 2**SUB_BUCKET_BITS хранятся точно.
+    Ширина корзины - не больше 1/2**(SUB_BUCKET_BITS - 1) от значения, т.е. относительная погрешность перцентилей
+    при 8 битах - не хуже 0.8%; объем памяти не зависит от числа замеров. Значения - неотрицательные целые
+    (микросекунды, байты, штуки)
+    """
+
+    SUB_BUCKET_BITS = 8
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    @classmethod
+    def _bucket(cls, value: int) -> tuple:
+        """Возвращает нижнюю границу корзины значения и ее ширину"""
+        shift = max(value.bit_length() - cls.SUB_BUCKET_BITS, 0)
+        return (value >> shift) << shift, 1 << shift
+
+    def record(self, value, count=1):
+        value = max(int(value), 0)
+        bucket, _ = self._bucket(value)
+        self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.count += count
+        self.total += value * count
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, percent: float) -> int:
+        """Возвращает наибольшее значение, эквивалентное перцентилю (с точностью до корзины)"""
+        if not self.count:
+            return 0
+        target = max(math.ceil(percent / 100 * self.count), 1)
+        cumulative = 0
+        for bucket in sorted(self.counts):
+            cumulative += self.counts[bucket]
+            if cumulative >= target:
+                _, width = self._bucket(bucket)
+                return min(bucket + width - 1, self.max)
+        return self.max
+
+    def merge(self, other: 'LatencyHistogram'):
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.count += other.count
+        self.total += other.total
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def summary(self) -> dict:
+        return {'count': self.count, 'min': self.min or 0, 'p50': self.percentile(50), 'p90': self.percentile(90),
+                'p95': self.percentile(95), 'p99': self.percentile(99), 'max': self.max or 0,
+                'mean': round(self.total / self.count, 1) if self.count else 0}
+
+    def to_dict(self) -> dict:
+        return {'counts': {str(bucket): count for bucket, count in self.counts.items()}, 'count': self.count,
+                'total': self.total, 'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'LatencyHistogram':
+        histogram = cls()
+        histogram.counts = {int(bucket): count for bucket, count in data['counts'].items()}
+        histogram.count, histogram.total = data['count'], data['total']
+        histogram.min, histogram.max = data['min'], data['max']
+        return histogram
+
+
+class LatencyMetrics:
+    """
+    Гистограммы запросов по эндпойнтам: фазы DNS/connect/TLS/TTFB/total (мкс), размер ответа (байты)
+    и число повторов. Подключается как хук APIClient.request_hooks
+    """
+
+    DURATIONS = ('dns', 'connect', 'tls', 'ttfb', 'total')
+    UNITS = {'size': 'bytes', 'retries': 'count'}
+
+    def __init__(self):
+        self.histograms = defaultdict(lambda: defaultdict(LatencyHistogram))
+        self._lock = threading.Lock()
+
+    def record(self, timing: dict):
+        """Учитывает замер одного вызова APIClient; ответы, полученные без обращения к сети, не учитываются"""
+        if timing.get('shared'):
+            return
+        with self._lock:
+            histograms = self.histograms[timing['endpoint']]
+            for phase in self.DURATIONS:
+                # Фазы установки соединения учитываются только для новых соединений
+                if timing.get(phase) is not None and (phase in ('ttfb', 'total') or timing['new_connections']):
+                    histograms[phase].record(timing[phase] * 1_000_000)
+            histograms['size'].record(timing.get('size') or 0)
+            histograms['retries'].record(timing.get('retries') or 0)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {endpoint: {metric: histogram.to_dict() for metric, histogram in metrics.items()}
+                    for endpoint, metrics in self.histograms.items()}
+
+    def merge_dict(self, data: dict):
+        """Добавляет гистограммы, сериализованные to_dict (например, полученные от воркера xdist)"""
+        with self._lock:
+            for endpoint, metrics in data.items():
+                for metric, histogram in metrics.items():
+                    self.histograms[endpoint][metric].merge(LatencyHistogram.from_dict(histogram))
+
+    def summary_rows(self) -> list:
+        """Возвращает строки сводки: эндпойнт, метрика, единицы и перцентили"""
+        rows = []
+        for endpoint in sorted(self.histograms):
+            for metric in (*self.DURATIONS, 'size', 'retries'):
+                histogram = self.histograms[endpoint].get(metric)
+                if histogram is not None and histogram.count:
+                    rows.append({'endpoint': endpoint, 'metric': metric, 'unit': self.UNITS.get(metric, 'us'),
+                                 **histogram.summary()})
+        return rows
+
+    def write_report(self, directory) -> tuple:
+        """Записывает сводку в JSON (вместе с гистограммами) и CSV, возвращает пути файлов"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        rows = self.summary_rows()
+        json_path, csv_path = directory / 'latency.json', directory / 'latency.csv'
+        json_path.write_text(json.dumps({'summary': rows, 'histograms': self.to_dict()}, ensure_ascii=False),
+                             encoding='utf-8')
+        with open(csv_path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=['endpoint', 'metric', 'unit', 'count', 'min', 'p50', 'p90',
+                                                   'p95', 'p99', 'max', 'mean'])
+            writer.writeheader()
+            writer.writerows(rows)
+        return json_path, csv_path
+
+
+class LatencyBudgets:
+    """
+    Бюджеты времени ответа по эндпойнтам (LATENCY_BUDGETS). observe учитывает время ответа (response.elapsed -
+    до получения хедеров) в гистограмме эндпойнта и возвращает бюджет для проверки max в тесте; p95 проверяется
+    по всем ответам эндпойнта за прогон (exceeded): его превышение - систематическая, а не единичная медленность.
+    Каждый ответ учитывается один раз, даже если его проверяют несколько тестов (ответы общих фикстур)
+    """
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, budgets=LATENCY_BUDGETS, scale=LATENCY_BUDGET_SCALE, min_samples=LATENCY_BUDGET_MIN_SAMPLES):
+        self.budgets = budgets
+        self.scale = scale
+        self.min_samples = min_samples
+        self.histograms = defaultdict(LatencyHistogram)  # (эндпойнт, бюджет p95, с) -> время ответов, мкс
+        self._lock = threading.Lock()
+
+    @classmethod
+    def default(cls):
+        """
+        Возвращает общий для процесса учет бюджетов или None, если проверка выключена (API_LATENCY_BUDGETS=0)
+        или ответы воспроизводятся из кассеты
+        """
+        if not LATENCY_BUDGETS_ENABLED or CASSETTE_MODE == 'replay':
+            return None
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def budget(self, endpoint: str, override: dict = None):
+        """Бюджет эндпойнта из профиля, дополненный override ({'p95': с, 'max': с}), с учетом множителя"""
+        budget = {**self.budgets.get(endpoint, {}), **(override or {})}
+        return {name: value * self.scale for name, value in budget.items()} or None
+
+    def observe(self, response, override: dict = None):
+        """
+        Учитывает время ответа; возвращает (эндпойнт, время ответа, бюджет) или None, если у эндпойнта нет бюджета
+        либо ответ уже учтен
+        """
+        request = getattr(response, 'request', None)
+        if request is None or response.__dict__.get('_latency_observed'):
+            return None
+        response._latency_observed = True
+        endpoint = Helpers.get_endpoint_label(request.method, request.url)
+        budget = self.budget(endpoint, override)
+        if budget is None:
+            return None
+        elapsed = response.elapsed.total_seconds()
+        if 'p95' in budget:
+            with self._lock:
+                self.histograms[(endpoint, budget['p95'])].record(elapsed * 1_000_000)
+        return endpoint, elapsed, budget
+
+    def exceeded(self) -> list:
+        """Эндпойнты, p95 времени ответа которых за прогон (не меньше min_samples ответов) превышает бюджет"""
+        result = []
+        with self._lock:
+            for (endpoint, budget), histogram in sorted(self.histograms.items()):
+                p95 = histogram.percentile(95) / 1_000_000
+                if histogram.count >= self.min_samples and p95 > budget:
+                    result.append({'endpoint': endpoint, 'count': histogram.count, 'p95': p95, 'budget': budget,
+                                   'max': histogram.max / 1_000_000})
+        return result
+
+    @staticmethod
+    def describe(entry: dict) -> str:
+        """Сообщение о превышении бюджета p95 (по нему отчет Allure относит результат к категории дефектов)"""
+        return (f"Бюджет латентности p95 превышен: {entry['endpoint']} - p95 {entry['p95'] * 1000:.0f} мс > "
+                f"{entry['budget'] * 1000:.0f} мс ({entry['count']} ответов, max {entry['max'] * 1000:.0f} мс)")
+
+    def to_dict(self) -> list:
+        with self._lock:
+            return [{'endpoint': endpoint, 'budget': budget, 'histogram': histogram.to_dict()}
+                    for (endpoint, budget), histogram in self.histograms.items()]
+
+    def merge_dict(self, data: list):
+        """Добавляет гистограммы, сериализованные to_dict (например, полученные от воркера xdist)"""
+        with self._lock:
+            for entry in data:
+                self.histograms[(entry['endpoint'], entry['budget'])].merge(
+                    LatencyHistogram.from_dict(entry['histogram']))
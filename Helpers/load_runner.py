@@ -0,0 +1,263 @@
+"""
+Нагрузочный режим для проекта API_tests_example: сценарии тестов /api/companies и /api/users
+как взвешенная нагрузка с заданной интенсивностью (RPS) или параллельностью на нескольких процессах.
+
+Запуск: python -m Helpers.load_runner [--duration S] [--processes P] [--concurrency C] [--rps R]
+                                      [--weights name=weight,...]
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from multiprocessing import Pool
+
+import requests
+
+from Data.constants import BASE_URL_COMPANIES, BASE_URL_USERS, FAKER_LOCALES
+from Helpers.api_client import APIClient
+from Helpers.helpers import Helpers
+from Helpers.latency import LatencyHistogram
+from Helpers.payload_corpus import PayloadCorpus
+from Helpers.retry_policy import RetryPolicy
+
+
+class EndpointStats:
+    """
+    Гистограммы латентности (мкс) и число ошибок по эндпойнтам: errors - ответы 5xx и ошибки запроса,
+    client_errors - ответы 4xx. Объем не зависит от числа запросов, поэтому статистика процесса
+    передается в основной процесс целиком
+    """
+
+    def __init__(self):
+        self.histograms = defaultdict(LatencyHistogram)
+        self.errors = defaultdict(int)
+        self.client_errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, latency: float, status_code: int = None):
+        """Учитывает запрос: latency - в секундах, status_code - None, если ответ не получен"""
+        with self._lock:
+            self.histograms[endpoint].record(latency * 1_000_000)
+            if status_code is None or status_code >= 500:
+                self.errors[endpoint] += 1
+            elif status_code >= 400:
+                self.client_errors[endpoint] += 1
+
+    def merge(self, other: 'EndpointStats'):
+        for endpoint, histogram in other.histograms.items():
+            self.histograms[endpoint].merge(histogram)
+        for endpoint, errors in other.errors.items():
+            self.errors[endpoint] += errors
+        for endpoint, errors in other.client_errors.items():
+            self.client_errors[endpoint] += errors
+
+    def __getstate__(self):
+        return {'histograms': {endpoint: histogram.to_dict() for endpoint, histogram in self.histograms.items()},
+                'errors': dict(self.errors), 'client_errors': dict(self.client_errors)}
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.histograms.update({endpoint: LatencyHistogram.from_dict(histogram)
+                                for endpoint, histogram in state['histograms'].items()})
+        self.errors.update(state['errors'])
+        self.client_errors.update(state['client_errors'])
+
+    def report(self, duration: float) -> dict:
+        """Возвращает p50/p95/p99, пропускную способность и доли ошибок (5xx и 4xx) по каждому эндпойнту"""
+        result = {}
+        for endpoint, histogram in sorted(self.histograms.items()):
+            result[endpoint] = {
+                'requests': histogram.count,
+                'rps': round(histogram.count / duration, 2),
+                'p50_ms': round(histogram.percentile(50) / 1000, 2),
+                'p95_ms': round(histogram.percentile(95) / 1000, 2),
+                'p99_ms': round(histogram.percentile(99) / 1000, 2),
+                'error_rate': round(self.errors[endpoint] / histogram.count, 4),
+                'client_error_rate': round(self.client_errors[endpoint] / histogram.count, 4),
+            }
+        return result
+
+
+class TimedClient:
+    """Обертка над APIClient, которая замеряет каждый запрос и учитывает его по метке эндпойнта"""
+
+    def __init__(self, client: APIClient, stats: EndpointStats):
+        self.client = client
+        self.stats = stats
+
+    def _call(self, method, path="/", **kwargs):
+        endpoint = Helpers.get_endpoint_label(method, f"{self.client.base_url}{path}")
+        start = time.perf_counter()
+        try:
+            response = getattr(self.client, method)(path=path, **kwargs)
+        except requests.RequestException:
+            self.stats.record(endpoint, time.perf_counter() - start)
+            raise
+        self.stats.record(endpoint, time.perf_counter() - start, response.status_code)
+        return response
+
+    def get(self, path="/", **kwargs):
+        return self._call('get', path, **kwargs)
+
+    def post(self, path="/", **kwargs):
+        return self._call('post', path, **kwargs)
+
+    def delete(self, path="/", **kwargs):
+        return self._call('delete', path, **kwargs)
+
+
+# region Сценарии (повторяют валидные сценарии Tests/test_companies_list.py и Tests/test_users.py)
+# companies_by_status - ID компаний по статусам (Helpers.group_companies_by_statuses), как в фикстуре
+# companies_grouped_by_statuses: число компаний и их ID берутся из API, а не задаются в сценариях
+def scenario_companies_paginated(companies: TimedClient, users: TimedClient, companies_by_status: dict,
+                                 rnd: random.Random):
+    """Постраничный список компаний"""
+    total = sum(len(ids) for ids in companies_by_status.values())
+    companies.get(params={'limit': rnd.randint(1, total), 'offset': rnd.randint(0, total - 1)})
+
+
+def scenario_company_by_id(companies: TimedClient, users: TimedClient, companies_by_status: dict,
+                           rnd: random.Random):
+    """Компания по ID, в т.ч. с локализацией"""
+    headers = {'Accept-Language': rnd.choice(['RU', 'PL', 'EN', 'UA'])} if rnd.random() < 0.5 else None
+    company_id = rnd.choice([company_id for ids in companies_by_status.values() for company_id in ids])
+    companies.get(path=f"/{company_id}", headers=headers)
+
+
+def scenario_users_paginated(companies: TimedClient, users: TimedClient, companies_by_status: dict,
+                             rnd: random.Random):
+    """Постраничный список пользователей"""
+    users.get(params={'limit': rnd.randint(1, 100), 'offset': rnd.randint(0, 100)})
+
+
+def scenario_user_lifecycle(companies: TimedClient, users: TimedClient, companies_by_status: dict,
+                            rnd: random.Random):
+    """
+    Создание пользователя в активной компании (тело из корпуса, как в TestCreateUser), получение по ID
+    и удаление; пользователь удаляется, даже если запрос на получение завершился ошибкой
+    """
+    corpus = PayloadCorpus.default()
+    body = corpus.with_fields(corpus.payload(f'full:{rnd.choice(FAKER_LOCALES)}', rnd.getrandbits(32)),
+                              company_id=rnd.choice(companies_by_status['ACTIVE']))
+    response = users.post(data=body, headers={"Content-Type": "application/json"})
+    if response.status_code == 201:
+        user_id = response.json()['user_id']
+        try:
+            users.get(path=f"/{user_id}")
+        finally:
+            users.delete(path=f"/{user_id}")
+
+
+SCENARIOS = {
+    'companies_paginated': (scenario_companies_paginated, 4),
+    'company_by_id': (scenario_company_by_id, 3),
+    'users_paginated': (scenario_users_paginated, 4),
+    'user_lifecycle': (scenario_user_lifecycle, 1),
+}
+# endregion Сценарии
+
+
+def run_worker(settings: dict) -> EndpointStats:
+    """
+    Выполняет сценарии в settings['concurrency'] потоках в течение settings['duration'] секунд.
+    При заданном settings['rps'] запуски сценариев равномерно распределяются во времени.
+    Запросы не повторяются и не объединяются: каждый запуск сценария доходит до API, а ошибки и латентность
+    не скрываются повторами и кэшем
+    """
+    stats = EndpointStats()
+    session = APIClient.create_session(pool_maxsize=settings['concurrency'])
+    policy = RetryPolicy(max_attempts=1)
+    clients = []
+    for base_url in (BASE_URL_COMPANIES, BASE_URL_USERS):
+        client = APIClient(base_url=base_url, session=session, policy=policy)
+        client.coalescer = None  # None в конструкторе означает объединитель по умолчанию (API_COALESCE)
+        clients.append(client)
+    companies_by_status = Helpers.group_companies_by_statuses(clients[0].paginate())
+    companies, users = (TimedClient(client, stats) for client in clients)
+    names = list(settings['weights'])
+    weights = [settings['weights'][name] for name in names]
+    deadline = time.monotonic() + settings['duration']
+    interval = 1 / settings['rps'] if settings['rps'] else 0
+    schedule = {'next': time.monotonic()}
+    schedule_lock = threading.Lock()
+
+    def loop(seed):
+        rnd = random.Random(seed)
+        while time.monotonic() < deadline:
+            if interval:
+                with schedule_lock:
+                    start_at, schedule['next'] = schedule['next'], max(schedule['next'], time.monotonic()) + interval
+                time.sleep(max(start_at - time.monotonic(), 0))
+                if time.monotonic() >= deadline:
+                    return
+            scenario = SCENARIOS[rnd.choices(names, weights)[0]][0]
+            try:
+                scenario(companies, users, companies_by_status, rnd)
+            except requests.RequestException:
+                pass  # ошибка уже учтена в статистике эндпойнта
+
+    threads = [threading.Thread(target=loop, args=(settings['seed'] * 1000 + number,))
+               for number in range(settings['concurrency'])]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    session.close()
+    return stats
+
+
+def run_load(duration=10.0, processes=1, concurrency=4, rps=None, weights=None, seed=0) -> dict:
+    """Запускает нагрузку на processes процессах и возвращает сводный отчет по эндпойнтам"""
+    weights = weights or {name: weight for name, (_, weight) in SCENARIOS.items()}
+    settings = [{'duration': duration, 'concurrency': concurrency, 'weights': weights, 'seed': seed + number,
+                 'rps': rps / processes if rps else None} for number in range(processes)]
+    start = time.monotonic()
+    with Pool(processes) as pool:
+        results = pool.map(run_worker, settings)
+    elapsed = time.monotonic() - start
+    stats = EndpointStats()
+    for result in results:
+        stats.merge(result)
+    return stats.report(elapsed)
+
+
+def print_report(report: dict):
+    """Выводит отчет таблицей"""
+    header = (f"{'endpoint':32} {'requests':>9} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+              f"{'errors':>8} {'4xx':>8}")
+    print(header)
+    print('-' * len(header))
+    for endpoint, row in report.items():
+        print(f"{endpoint:32} {row['requests']:>9} {row['rps']:>9} {row['p50_ms']:>9} {row['p95_ms']:>9} "
+              f"{row['p99_ms']:>9} {row['error_rate']:>8.2%} {row['client_error_rate']:>8.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузка на API сценариями тестов")
+    parser.add_argument('--duration', type=float, default=10.0, help="длительность, с")
+    parser.add_argument('--processes', type=int, default=1, help="число процессов")
+    parser.add_argument('--concurrency', type=int, default=4, help="число потоков в каждом процессе")
+    parser.add_argument('--rps', type=float, default=None, help="целевая суммарная интенсивность запуска сценариев")
+    parser.add_argument('--weights', default=None, help="веса сценариев: name=weight,...; "
+                                                        f"доступны: {', '.join(SCENARIOS)}")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help="вывести отчет в JSON")
+    args = parser.parse_args()
+    weights = None
+    if args.weights:
+        weights = {name: float(weight) for name, weight in (item.split('=') for item in args.weights.split(','))}
+        unknown = set(weights) - set(SCENARIOS)
+        if unknown:
+            parser.error(f"неизвестные сценарии: {', '.join(sorted(unknown))}")
+    report = run_load(args.duration, args.processes, args.concurrency, args.rps, weights, args.seed)
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print_report(report)
+
+
+if __name__ == '__main__':
+    main()
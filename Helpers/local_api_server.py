@@ -0,0 +1,351 @@
+"""
+Локальный асинхронный эмулятор API https://send-request.me (/api/companies, /api/users)
+для проекта API_tests_example.
+
+Запуск: python -m Helpers.local_api_server [--host HOST] [--port PORT] [--redirect-port PORT]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import socket
+import subprocess
+import sys
+import time
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qsl
+
+from Data.constants import BASE_URL, FAKER_LOCALES, LOCAL_API_HOST, LOCAL_API_PORT, LOCAL_API_REDIRECT_PORT
+from Helpers.data_loader import DataLoader
+
+COMPANIES_COUNT = 7
+USERS_COUNT = 300
+DEFAULT_LIMIT = 3
+MAX_NAME_LENGTH = 255
+SEED = 0
+
+# Переводы описания есть только у компании с ID=1, у остальных - только EN
+COMPANY_1_DESCRIPTIONS = {
+    'EN': 'Ye on properly handsome returned throwing am no whatever.',
+    'RU': 'Ее сздать в поздний час, как будто встретил он поддержку.',
+    'PL': 'Podkomorzynę wiodł pod rękę, a inni po dwóch szli w pary.',
+    'UA': 'Ой у лузі червона калина похилилася.',
+}
+LANGUAGES_ORDER = ('EN', 'RU', 'PL', 'UA')
+
+STATUS_PHRASES = {
+    200: 'OK', 201: 'Created', 202: 'Accepted', 301: 'Moved Permanently', 400: 'Bad Request',
+    404: 'Not Found', 405: 'Method Not Allowed', 422: 'Unprocessable Entity',
+}
+
+
+class LocalAPIData:
+    """Данные эмулятора: компании со статусами из Data/company_statuses.csv и пользователи, сгенерированные Faker"""
+
+    def __init__(self, seed=SEED):
+        statuses = list(DataLoader.default().load('company_statuses.csv').column(0))
+        self.statuses = set(statuses)
+        self.companies = {}
+        for company_id in range(1, COMPANIES_COUNT + 1):
+            descriptions = COMPANY_1_DESCRIPTIONS if company_id == 1 else {
+                'EN': f'Company number {company_id} provides services.'}
+            self.companies[company_id] = {
+                'company_id': company_id,
+                'company_name': f'Company {company_id}',
+                'company_address': f'{company_id} Main street',
+                'company_status': statuses[(company_id - 1) % len(statuses)],
+                'descriptions': descriptions,
+            }
+        active = [company_id for company_id, company in self.companies.items()
+                  if company['company_status'] == 'ACTIVE']
+
+        from faker import Faker  # нужен только для генерации исходных данных
+        fake = Faker(FAKER_LOCALES)
+        fake.seed_instance(seed)
+        rnd = random.Random(seed)
+        self.users = {}
+        for user_id in range(1, USERS_COUNT + 1):
+            self.users[user_id] = {
+                'first_name': fake.first_name() if rnd.random() > 0.1 else None,
+                'last_name': fake.last_name(),
+                'company_id': rnd.choice(active) if rnd.random() > 0.2 else None,
+                'user_id': user_id,
+            }
+        self.next_user_id = USERS_COUNT + 1
+
+    @staticmethod
+    def _translations(company: dict) -> list:
+        """Возвращает переводы описания компании, первым идет EN"""
+        return [{'translation_lang': lang, 'translation': company['descriptions'][lang]}
+                for lang in LANGUAGES_ORDER if lang in company['descriptions']]
+
+    def company_in_list(self, company: dict) -> dict:
+        """Представление компании в списке /api/companies"""
+        return {key: company[key] for key in ('company_id', 'company_name', 'company_address', 'company_status')} | {
+            'description': company['descriptions']['EN'], 'description_lang': self._translations(company)}
+
+    def company_by_id(self, company: dict, language: str) -> dict:
+        """
+        Представление компании в /api/companies/{company_id}: описание на языке из Accept-Language,
+        если перевод есть, иначе список всех переводов
+        """
+        body = {key: company[key] for key in ('company_id', 'company_name', 'company_address', 'company_status')}
+        if language in company['descriptions']:
+            body['description'] = company['descriptions'][language]
+        else:
+            body['description_lang'] = self._translations(company)
+        return body
+
+
+class LocalAPIHandler:
+    """Маршрутизация и обработка запросов эмулятора"""
+
+    def __init__(self, data: LocalAPIData):
+        self.data = data
+        self.companies_list = lru_cache(maxsize=4096)(self._companies_list)
+        self.company = lru_cache(maxsize=4096)(self._company)
+
+    @staticmethod
+    def _json(status: int, body) -> tuple:
+        return status, json.dumps(body, ensure_ascii=False).encode('utf-8')
+
+    @staticmethod
+    def _unprocessable(location: str, name: str, message: str, error_type: str) -> tuple:
+        return LocalAPIHandler._json(422, {'detail': [{'loc': [location, name], 'msg': message, 'type': error_type}]})
+
+    @staticmethod
+    def _not_found(reason: str) -> tuple:
+        return LocalAPIHandler._json(404, {'detail': {'reason': reason}})
+
+    @staticmethod
+    def _parse_non_negative_int(value: str):
+        """Возвращает неотрицательное целое из строки или None, если значение невалидно"""
+        try:
+            number = int(value)
+        except ValueError:
+            return None
+        return number if number >= 0 else None
+
+    def _pagination(self, query: dict) -> tuple:
+        """Возвращает (limit, offset) из query или готовый ответ 422"""
+        values = {}
+        for name, default in (('limit', DEFAULT_LIMIT), ('offset', 0)):
+            if name not in query:
+                values[name] = default
+                continue
+            values[name] = self._parse_non_negative_int(query[name])
+            if values[name] is None:
+                return None, self._unprocessable('query', name, 'value is not a valid non-negative integer',
+                                                 'type_error.integer')
+        return (values['limit'], values['offset']), None
+
+    def _companies_list(self, query_items: tuple) -> tuple:
+        query = dict(query_items)
+        pagination, error = self._pagination(query)
+        if error:
+            return error
+        limit, offset = pagination
+        companies = list(self.data.companies.values())
+        if 'status' in query:
+            if query['status'] not in self.data.statuses:
+                return self._unprocessable('query', 'status', 'value is not a valid enumeration member',
+                                           'type_error.enum')
+            companies = [company for company in companies if company['company_status'] == query['status']]
+        return self._json(200, {
+            'data': [self.data.company_in_list(company) for company in companies[offset:offset + limit]],
+            'meta': {'limit': limit, 'offset': offset, 'total': len(companies)}})
+
+    def _company(self, raw_id: str, language: str) -> tuple:
+        company_id = self._parse_non_negative_int(raw_id)
+        if company_id is None:
+            return self._unprocessable('path', 'company_id', 'value is not a valid integer', 'type_error.integer')
+        if company_id not in self.data.companies:
+            return self._not_found('Company with requested id is absent')
+        return self._json(200, self.data.company_by_id(self.data.companies[company_id], language))
+
+    def _users_list(self, query: dict) -> tuple:
+        pagination, error = self._pagination(query)
+        if error:
+            return error
+        limit, offset = pagination
+        users = list(self.data.users.values())
+        return self._json(200, {'data': users[offset:offset + limit],
+                                'meta': {'limit': limit, 'offset': offset, 'total': len(users)}})
+
+    def _user(self, method: str, raw_id: str) -> tuple:
+        user_id = self._parse_non_negative_int(raw_id)
+        if user_id is None:
+            return self._unprocessable('path', 'user_id', 'value is not a valid integer', 'type_error.integer')
+        if user_id not in self.data.users:
+            return self._not_found('User with requested id is absent')
+        if method == 'DELETE':
+            del self.data.users[user_id]
+            return self._json(202, {})
+        return self._json(200, self.data.users[user_id])
+
+    def _create_user(self, body: bytes) -> tuple:
+        try:
+            payload = json.loads(body or b'null')
+        except ValueError:
+            return self._unprocessable('body', 'body', 'invalid JSON', 'value_error.jsondecode')
+        if not isinstance(payload, dict):
+            return self._unprocessable('body', 'body', 'value is not a valid dict', 'type_error.dict')
+        for name, required in (('last_name', True), ('first_name', False)):
+            value = payload.get(name)
+            if value is None and not required:
+                continue
+            if name not in payload or value is None:
+                return self._unprocessable('body', name, 'field required', 'value_error.missing')
+            if not isinstance(value, str):
+                return self._unprocessable('body', name, 'str type expected', 'type_error.str')
+            if not value.strip() or len(value) > MAX_NAME_LENGTH:
+                return self._unprocessable('body', name, f'string length must be 1..{MAX_NAME_LENGTH}',
+                                           'value_error.any_str.length')
+        company_id = payload.get('company_id')
+        if company_id is not None:
+            if not isinstance(company_id, int) or isinstance(company_id, bool):
+                return self._unprocessable('body', 'company_id', 'value is not a valid integer',
+                                           'type_error.integer')
+            if company_id not in self.data.companies:
+                return self._not_found('Company with requested id is absent')
+            if self.data.companies[company_id]['company_status'] != 'ACTIVE':
+                return self._json(400, {'detail': {'reason': 'You can only create users only in ACTIVE company'}})
+        user = {'first_name': payload.get('first_name'), 'last_name': payload['last_name'],
+                'company_id': company_id, 'user_id': self.data.next_user_id}
+        self.data.users[user['user_id']] = user
+        self.data.next_user_id += 1
+        return self._json(201, user)
+
+    def handle(self, method: str, target: str, headers: dict, body: bytes) -> tuple:
+        """Возвращает (статус, тело) ответа на запрос"""
+        url = urlsplit(target)
+        parts = [part for part in url.path.split('/') if part]
+        query = dict(parse_qsl(url.query, keep_blank_values=True))
+        if parts[:2] == ['api', 'companies'] and method == 'GET':
+            if len(parts) == 2:
+                return self.companies_list(tuple(sorted(query.items())))
+            if len(parts) == 3:
+                return self.company(parts[2], headers.get('accept-language', '').upper())
+        if parts[:2] == ['api', 'users']:
+            if len(parts) == 2 and method == 'GET':
+                return self._users_list(query)
+            if len(parts) == 2 and method == 'POST':
+                return self._create_user(body)
+            if len(parts) == 3 and method in ('GET', 'DELETE'):
+                return self._user(method, parts[2])
+        if parts[:2] in (['api', 'companies'], ['api', 'users']):
+            return self._json(405, {'detail': 'Method Not Allowed'})
+        return self._json(404, {'detail': 'Not Found'})
+
+
+class HTTPProtocol(asyncio.Protocol):
+    """Минимальная реализация HTTP/1.1 с keep-alive поверх asyncio.Protocol"""
+
+    def __init__(self, respond):
+        self.respond = respond  # (method, target, headers, body) -> (status, extra headers, payload)
+        self.transport = None
+        self.buffer = bytearray()
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        self.buffer += data
+        while True:
+            head_end = self.buffer.find(b'\r\n\r\n')
+            if head_end < 0:
+                return
+            try:
+                request_line, *header_lines = self.buffer[:head_end].decode('latin-1').split('\r\n')
+                method, target, version = request_line.split(' ', 2)
+                headers = {name.strip().lower(): value.strip()
+                           for name, value in (line.split(':', 1) for line in header_lines)}
+                body_end = head_end + 4 + int(headers.get('content-length', 0))
+            except ValueError:
+                self._write(400, {}, b'', keep_alive=False)
+                return
+            if len(self.buffer) < body_end:
+                return
+            body = bytes(self.buffer[head_end + 4:body_end])
+            del self.buffer[:body_end]
+            keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+            status, extra_headers, payload = self.respond(method, target, headers, body)
+            self._write(status, extra_headers, payload, keep_alive)
+            if not keep_alive:
+                return
+
+    def _write(self, status: int, extra_headers: dict, payload: bytes, keep_alive: bool):
+        headers = {'Content-Type': 'application/json', 'Content-Length': str(len(payload)),
+                   'Connection': 'keep-alive' if keep_alive else 'close'} | extra_headers
+        head = f"HTTP/1.1 {status} {STATUS_PHRASES.get(status, '')}\r\n" + \
+               ''.join(f"{name}: {value}\r\n" for name, value in headers.items()) + '\r\n'
+        self.transport.write(head.encode('latin-1') + payload)
+        if not keep_alive:
+            self.transport.close()
+
+
+async def serve(host=LOCAL_API_HOST, port=LOCAL_API_PORT, redirect_port=LOCAL_API_REDIRECT_PORT):
+    """Запускает эмулятор API и сервер перенаправления HTTP->HTTPS (на BASE_URL) и обслуживает запросы"""
+    handler = LocalAPIHandler(LocalAPIData())
+
+    def respond_api(method, target, headers, body):
+        status, payload = handler.handle(method, target, headers, body)
+        return status, {}, payload
+
+    def respond_redirect(method, target, headers, body):
+        return 301, {'Location': f"{BASE_URL}{urlsplit(target).path}"}, b''
+
+    loop = asyncio.get_running_loop()
+    api_server = await loop.create_server(lambda: HTTPProtocol(respond_api), host, port)
+    redirect_server = await loop.create_server(lambda: HTTPProtocol(respond_redirect), host, redirect_port)
+    async with api_server, redirect_server:
+        await asyncio.gather(api_server.serve_forever(), redirect_server.serve_forever())
+
+
+def start_in_subprocess(host=LOCAL_API_HOST, port=LOCAL_API_PORT, redirect_port=LOCAL_API_REDIRECT_PORT,
+                        timeout=10.0):
+    """
+    Запускает эмулятор в отдельном процессе, если порт еще не занят, и ждет готовности. Вывод эмулятора
+    отбрасывается: процесс не должен держать канал вывода pytest. Возвращает процесс или None, если эмулятор
+    уже был запущен
+    """
+    def is_listening():
+        try:
+            socket.create_connection((host, port), timeout=0.2).close()
+            return True
+        except OSError:
+            return False
+
+    if is_listening():
+        return None
+    process = subprocess.Popen([sys.executable, '-m', 'Helpers.local_api_server', '--host', host,
+                                '--port', str(port), '--redirect-port', str(redirect_port)],
+                               cwd=Path(__file__).parents[1], stdin=subprocess.DEVNULL,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+    while not is_listening():
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            raise RuntimeError(f"Локальный эмулятор API не запустился на {host}:{port}")
+        time.sleep(0.05)
+    return process
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Локальный эмулятор API send-request.me")
+    parser.add_argument('--host', default=LOCAL_API_HOST)
+    parser.add_argument('--port', type=int, default=LOCAL_API_PORT)
+    parser.add_argument('--redirect-port', type=int, default=LOCAL_API_REDIRECT_PORT)
+    args = parser.parse_args()
+    try:
+        import uvloop  # необязательная зависимость, ускоряет event loop
+        uvloop.install()
+    except ImportError:
+        pass
+    asyncio.run(serve(args.host, args.port, args.redirect_port))
+
+
+if __name__ == '__main__':
+    main()
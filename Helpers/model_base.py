@@ -0,0 +1,93 @@
+"""Базовый класс и проверки для моделей ответов (Data/models.py) проекта API_tests_example"""
+
+import hashlib
+import json
+from abc import ABC, abstractmethod
+
+
+class ModelValidationError(AssertionError):
+    """Тело ответа не соответствует модели (JSON-схеме, из которой она сгенерирована)"""
+
+    def __init__(self, path: str, message: str):
+        super().__init__(f"{path}: {message}")
+        self.path = path
+
+
+def schema_hash(schema: dict) -> str:
+    """Хэш содержимого схемы: по нему определяется, что модель сгенерирована из текущей версии схемы"""
+    return hashlib.sha256(json.dumps(schema, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()[:16]
+
+
+# Проверки типов JSON-схемы Draft 4: bool не считается числом, float - целым
+JSON_TYPES = {
+    'string': lambda value: isinstance(value, str),
+    'integer': lambda value: isinstance(value, int) and not isinstance(value, bool),
+    'number': lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    'boolean': lambda value: isinstance(value, bool),
+    'null': lambda value: value is None,
+    'object': lambda value: isinstance(value, dict),
+    'array': lambda value: isinstance(value, list),
+}
+
+
+def check_type(value, types: tuple, path: str, enum: tuple = None):
+    """Проверяет, что значение имеет один из типов JSON-схемы (и входит в enum, если он задан), и возвращает его"""
+    if not any(JSON_TYPES[name](value) for name in types):
+        raise ModelValidationError(path, f"{value!r} не является {' или '.join(types)}")
+    if enum is not None and value not in enum:
+        raise ModelValidationError(path, f"{value!r} не входит в {list(enum)}")
+    return value
+
+
+def check_list(value, path: str, check_item) -> list:
+    """Проверяет, что значение - массив, и возвращает список проверенных check_item(элемент, путь) элементов"""
+    check_type(value, ('array',), path)
+    return [check_item(item, f"{path}[{index}]") for index, item in enumerate(value)]
+
+
+def check_required(value: dict, required: tuple, path: str):
+    for name in required:
+        if name not in value:
+            raise ModelValidationError(path, f"нет обязательного поля {name!r}")
+
+
+def check_one_of_required(value: dict, variants: tuple, path: str):
+    """oneOf из вариантов, каждый из которых задает только required: должен выполняться ровно один"""
+    matched = [variant for variant in variants if all(name in value for name in variant)]
+    if len(matched) != 1:
+        raise ModelValidationError(path, f"должен выполняться ровно один вариант из {list(variants)}, "
+                                         f"выполняются: {matched}")
+
+
+class Model(ABC):
+    """
+    Базовый класс моделей: поля хранятся в __slots__, отсутствующие в ответе необязательные поля равны None.
+    Модель создается методом from_json(разобранное тело), который одновременно проверяет тело по схеме
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    @abstractmethod
+    def from_json(cls, value, path='$'):
+        """
+        Проверяет разобранное тело value по схеме модели и возвращает модель; при несоответствии -
+        ModelValidationError с путем path до ошибки. Реализуется в классах, сгенерированных Helpers/model_codegen.py
+        """
+
+    def to_dict(self) -> dict:
+        """Возвращает модель в виде словаря (вложенные модели тоже преобразуются)"""
+        def convert(value):
+            if isinstance(value, Model):
+                return value.to_dict()
+            if isinstance(value, list):
+                return [convert(item) for item in value]
+            return value
+        return {name: convert(getattr(self, name)) for name in self.__slots__}
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(getattr(self, name) == getattr(other, name)
+                                                 for name in self.__slots__)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)})"
@@ -0,0 +1,148 @@
+"""
+Генератор моделей ответов с __slots__ (Data/models.py) из JSON-схем Data/json_schemas.py
+для проекта API_tests_example.
+
+Запуск: python -m Helpers.model_codegen [--check]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from Data import json_schemas
+from Helpers.model_base import schema_hash
+
+MODELS_PATH = Path(__file__).parents[1].joinpath('Data').joinpath('models.py')
+MAX_LINE = 120
+SCHEMAS = ('COMPANIES_MAIN', 'COMPANY_BY_ID', 'USERS_MAIN', 'USER_BY_ID', 'USER_CREATED')
+
+HEADER = '''"""
+Модели ответов API проекта API_tests_example.
+Сгенерировано Helpers/model_codegen.py из Data/json_schemas.py - не редактировать вручную
+"""
+
+from Helpers.model_base import Model, check_type, check_list, check_required, check_one_of_required
+'''
+
+
+class ModelCodegen:
+    """
+    Генерирует по схеме объекта класс модели с __slots__ и методом from_json, который проверяет разобранное
+    тело по схеме и создает модель за один проход. Поддерживается подмножество Draft 4, используемое
+    в схемах проекта: type (в т.ч. список типов), properties, required, enum, items-схема и oneOf из вариантов
+    с одним только required. Поля из required/oneOf без описания в properties попадают в модель без проверки типа.
+    На схеме с другими возможностями генерация завершается ValueError
+    """
+
+    def __init__(self):
+        self.classes = []
+
+    @staticmethod
+    def class_name(name: str) -> str:
+        return ''.join(word.capitalize() for word in name.lower().split('_'))
+
+    @staticmethod
+    def _types(schema: dict) -> tuple:
+        types = schema.get('type')
+        return tuple(types) if isinstance(types, list) else (types,)
+
+    def _value(self, schema: dict, source: str, path: str, name: str) -> str:
+        """Возвращает выражение, которое проверяет значение source по схеме и возвращает его (или модель)"""
+        types = self._types(schema)
+        if types == ('object',) and 'properties' in schema:
+            return f"{self.generate(name, schema)}.from_json({source}, {path})"
+        if types == ('array',) and 'items' in schema:
+            items = schema['items']
+            if not isinstance(items, dict) or self._types(items) != ('object',) or 'properties' not in items:
+                raise ValueError(f"{name}: поддерживаются только массивы объектов с одной схемой items")
+            return f"check_list({source}, {path}, {self.generate(name, items)}.from_json)"
+        unsupported = set(schema) - {'type', 'enum'}
+        if unsupported or None in types:
+            raise ValueError(f"{name}: не поддерживается {sorted(unsupported) or 'схема без type'}")
+        if 'enum' in schema:
+            return f"check_type({source}, {types!r}, {path}, {tuple(schema['enum'])!r})"
+        return f"check_type({source}, {types!r}, {path})"
+
+    @staticmethod
+    def _line(prefix: str, value: str) -> str:
+        """Строка присваивания; длинный вызов переносится по последнему аргументу, начинающемуся до MAX_LINE"""
+        line = prefix + value
+        if len(line) <= MAX_LINE or '(' not in value:
+            return line
+        start = len(prefix) + value.index('(') + 1
+        depth, split = 0, None
+        for position in range(start, MAX_LINE):
+            char = line[position]
+            depth += (char in '([{') - (char in ')]}')
+            if char == ',' and depth == 0:
+                split = position
+        if split is None:
+            return line
+        return f"{line[:split + 1]}\n{' ' * start}{line[split + 2:]}"
+
+    def generate(self, name: str, schema: dict) -> str:
+        """Генерирует класс модели для схемы объекта (и вложенные классы) и возвращает имя класса"""
+        unsupported = set(schema) - {'type', 'properties', 'required', 'oneOf'}
+        if unsupported:
+            raise ValueError(f"{name}: не поддерживается {sorted(unsupported)}")
+        properties = dict(schema['properties'])
+        required = tuple(schema.get('required', ()))
+        for field in [*required, *(field for variant in schema.get('oneOf', ()) for field in variant['required'])]:
+            properties.setdefault(field, {})
+        lines = [f"class {name}(Model):", f"    __slots__ = {tuple(properties)!r}", "",
+                 "    @classmethod", "    def from_json(cls, value, path='$'):",
+                 "        check_type(value, ('object',), path)"]
+        if required:
+            lines.append(f"        check_required(value, {required!r}, path)")
+        if 'oneOf' in schema:
+            variants = []
+            for variant in schema['oneOf']:
+                if set(variant) != {'required'}:
+                    raise ValueError(f"{name}: oneOf поддерживается только из вариантов required")
+                variants.append(tuple(variant['required']))
+            lines.append(f"        check_one_of_required(value, {tuple(variants)!r}, path)")
+        lines.append("        self = cls.__new__(cls)")
+        for field, field_schema in properties.items():
+            if field_schema:
+                value = self._value(field_schema, f"value[{field!r}]", f"path + {'.' + field!r}",
+                                    name + self.class_name(field))
+            else:
+                value = f"value[{field!r}]"
+            if field in required:
+                lines.append(self._line(f"        self.{field} = ", value))
+            else:
+                lines += [f"        self.{field} = None", f"        if {field!r} in value:",
+                          self._line(f"            self.{field} = ", value)]
+        lines.append("        return self")
+        self.classes.append('\n'.join(lines))
+        return name
+
+    def source(self, module=json_schemas, names=SCHEMAS) -> str:
+        """Возвращает исходный код модуля моделей для схем names"""
+        self.classes = []
+        models = {name: self.generate(self.class_name(name), getattr(module, name)) for name in names}
+        registry = ["# Модели по именам схем Data/json_schemas.py", "MODELS = {"]
+        registry += [f"    {name!r}: {model}," for name, model in models.items()]
+        registry.append("}")
+        hashes = ["# Хэши схем, из которых сгенерированы модели: модель устаревшей схемы не используется",
+                  "SCHEMA_HASHES = {"]
+        hashes += [f"    {name!r}: {schema_hash(getattr(module, name))!r}," for name in names]
+        hashes.append("}")
+        return '\n\n\n'.join([HEADER.rstrip('\n'), *self.classes, '\n'.join(registry), '\n'.join(hashes)]) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Генерация Data/models.py из Data/json_schemas.py")
+    parser.add_argument('--check', action='store_true', help="только проверить, что Data/models.py актуален")
+    args = parser.parse_args()
+    source = ModelCodegen().source()
+    if args.check:
+        if not MODELS_PATH.exists() or MODELS_PATH.read_text(encoding='utf-8') != source:
+            sys.exit(f"{MODELS_PATH} устарел: запустите python -m Helpers.model_codegen")
+        return
+    MODELS_PATH.write_text(source, encoding='utf-8')
+    print(f"{MODELS_PATH}: модели для {', '.join(SCHEMAS)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+"""Постраничный обход списочных эндпойнтов (/api/companies, /api/users) для проекта API_tests_example"""
+
+import codecs
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from Data.constants import (PAGINATION_PAGE_SIZE, PAGINATION_MAX_PAGE_SIZE, PAGINATION_TARGET_PAGE_TIME,
+                            PAGINATION_STREAM_CHUNK_SIZE)
+
+
+class Paginator:
+    """
+    Ленивый обход списка по страницам limit/offset. Итерация по Paginator возвращает элементы data всех страниц,
+    pages() - страницы (списки элементов). Страницы запрашиваются по мере потребления:
+    - размер страницы адаптивный: удваивается, пока страница приходит быстрее target_page_time / 2,
+      и уменьшается вдвое, если медленнее target_page_time (в пределах 1..max_page_size);
+    - при prefetch следующая страница запрашивается в фоновом потоке, пока потребитель обрабатывает текущую;
+    - если потребитель прекратил итерацию, дальнейшие страницы не запрашиваются;
+    - при stream тело ответа разбирается по мере чтения (элемент за элементом), поэтому память не зависит
+      от размера страницы; длина страницы известна только после разбора, поэтому следующая страница
+      запрашивается заранее и при коротком последнем ответе один лишний запрос отбрасывается.
+    После обхода total - общее число элементов по meta.total последнего ответа (если API его вернул).
+    on_response(response) вызывается в потоке потребителя для ответа каждой страницы до разбора тела
+    (например, чтобы проверить хедеры и схему); при stream он не должен читать тело
+    """
+
+    def __init__(self, client, path="/", params=None, headers=None, page_size=PAGINATION_PAGE_SIZE,
+                 max_page_size=PAGINATION_MAX_PAGE_SIZE, target_page_time=PAGINATION_TARGET_PAGE_TIME,
+                 prefetch=True, stream=False, on_response=None):
+        self.client = client
+        self.path = path
+        self.params = dict(params or {})
+        self.headers = headers
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+        self.target_page_time = target_page_time
+        self.prefetch = prefetch
+        self.stream = stream
+        self.on_response = on_response
+        self.total = None
+        self.pages_fetched = 0
+
+    def __iter__(self):
+        for page in self.pages():
+            yield from page
+
+    def _fetch(self, offset: int, limit: int) -> tuple:
+        """Запрашивает страницу и возвращает (ответ, время запроса в секундах)"""
+        start = time.perf_counter()
+        response = self.client.get(path=self.path, params={**self.params, 'limit': limit, 'offset': offset},
+                                   headers=self.headers, stream=self.stream)
+        if response.status_code != 200:
+            response.close()
+            raise requests.HTTPError(f"Страница limit={limit}, offset={offset} не получена: "
+                                     f"код ответа {response.status_code}", response=response)
+        return response, time.perf_counter() - start
+
+    def _next_page_size(self, limit: int, elapsed: float) -> int:
+        if elapsed < self.target_page_time / 2:
+            return min(limit * 2, self.max_page_size)
+        if elapsed > self.target_page_time:
+            return max(limit // 2, 1)
+        return limit
+
+    def pages(self):
+        """Генератор страниц; каждая страница - список элементов data (при stream - итератор по ним)"""
+        executor = ThreadPoolExecutor(max_workers=1) if self.prefetch else None
+        offset, limit = int(self.params.get('offset', 0)), int(self.params.get('limit', self.page_size))
+        pending = None
+        try:
+            while True:
+                response, elapsed = pending.result() if pending is not None else self._fetch(offset, limit)
+                pending = None
+                if self.on_response is not None:
+                    try:
+                        self.on_response(response)
+                    except BaseException:
+                        response.close()
+                        raise
+                next_limit = self._next_page_size(limit, elapsed)
+                if self.stream:
+                    if executor is not None:
+                        pending = executor.submit(self._fetch, offset + limit, next_limit)
+                    counter = [0]
+                    page = self._stream_items(response, counter)
+                    try:
+                        yield page
+                        deque(page, maxlen=0)  # дочитывает страницу, если потребитель взял не все элементы
+                    finally:
+                        # При остановке обхода страница могла не начать разбор, тогда ее finally не выполнится
+                        page.close()
+                        response.close()
+                    count = counter[0]
+                else:
+                    body = response.json()
+                    page = body['data']
+                    self.total = body.get('meta', {}).get('total', self.total)
+                    count = len(page)
+                    if executor is not None and self._has_more(offset, limit, count):
+                        pending = executor.submit(self._fetch, offset + count, next_limit)
+                    yield page
+                self.pages_fetched += 1
+                if not self._has_more(offset, limit, count):
+                    return
+                offset, limit = offset + count, next_limit
+        finally:
+            self._discard(pending)
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+    def _has_more(self, offset: int, limit: int, count: int) -> bool:
+        return count >= limit and (self.total is None or offset + count < self.total)
+
+    @staticmethod
+    def _discard(pending):
+        """Отменяет заранее запрошенную страницу, которая не понадобилась"""
+        if pending is None or pending.cancel():
+            return
+        try:
+            response, _ = pending.result()
+            response.close()
+        except Exception:
+            pass  # ошибка ненужной страницы не важна
+
+    def _stream_items(self, response: requests.Response, counter: list):
+        """
+        Разбирает тело {"data": [...], "meta": {...}} по мере чтения и возвращает элементы data по одному;
+        в counter[0] - число разобранных элементов. Элементы data - объекты, поэтому незавершенный
+        элемент в буфере всегда дает ошибку разбора, а не неверное значение
+        """
+        decoder = json.JSONDecoder()
+        text_decoder = codecs.getincrementaldecoder('utf-8')()
+        chunks = response.iter_content(PAGINATION_STREAM_CHUNK_SIZE)
+        buffer = ''
+
+        def read_more() -> bool:
+            nonlocal buffer
+            chunk = next(chunks, None)
+            if chunk is None:
+                return False
+            buffer += text_decoder.decode(chunk)
+            return True
+
+        try:
+            # Начало массива data
+            while (start := buffer.find('"data"')) < 0 or (start := buffer.find('[', start)) < 0:
+                if not read_more():
+                    raise ValueError("В ответе нет массива data")
+            buffer = buffer[start + 1:]
+            while True:
+                buffer = buffer.lstrip(' \t\r\n,')
+                if not buffer:
+                    if not read_more():
+                        raise ValueError("Массив data в ответе не завершен")
+                    continue
+                if buffer[0] == ']':
+                    break
+                try:
+                    item, end = decoder.raw_decode(buffer)
+                except json.JSONDecodeError:
+                    if not read_more():
+                        raise
+                    continue
+                buffer = buffer[end:]
+                counter[0] += 1
+                yield item
+            # После data остается только небольшой объект meta
+            while read_more():
+                pass
+            start = buffer.find('"meta"')
+            if start >= 0:
+                meta, _ = decoder.raw_decode(buffer, buffer.index('{', start))
+                self.total = meta.get('total', self.total)
+        finally:
+            response.close()
@@ -0,0 +1,184 @@
+"""
+Заранее сгенерированный корпус тел запросов на создание пользователя для проекта API_tests_example.
+
+Генерация: python -m Helpers.payload_corpus [--path <файл>] [--seed N] [--size N]
+"""
+
+import argparse
+import fcntl
+import hashlib
+import importlib.metadata
+import inspect
+import json
+import mmap
+import os
+import struct
+import threading
+from pathlib import Path
+
+from Data.constants import FAKER_LOCALES, PAYLOAD_CORPUS_PATH, PAYLOAD_CORPUS_SEED, PAYLOAD_CORPUS_SIZE
+
+
+class PayloadCorpus:
+    """
+    Корпус сериализованных JSON-тел запросов по видам (см. _kinds): для каждого вида size вариантов,
+    сгенерированных Faker с фиксированным seed, поэтому корпус одинаков во всех воркерах и запусках
+    и не зависит от seed pytest-randomly.
+
+    Формат файла: MAGIC, длина заголовка (uint32), заголовок в JSON (версия, seed, size, хэш генераторов,
+    смещение индекса каждого вида), индекс (смещение и длина каждого тела, INDEX_ENTRY) и тела подряд.
+    Файл читается через mmap: получение тела по индексу - срез без разбора и генерации.
+    Хэш генераторов (generators_hash) меняется вместе с видами тел (_kinds), LONG_TEXT_WORDS и версией Faker:
+    корпус, сгенерированный прежними генераторами, строится заново
+    """
+
+    MAGIC = b'APLC'
+    VERSION = 1
+    LENGTH = struct.Struct('<I')
+    INDEX_ENTRY = struct.Struct('<QI')
+    LONG_TEXT_WORDS = 1000
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    @staticmethod
+    def _kinds(locales) -> dict:
+        """
+        Виды тел: имя -> функция (генератор Faker для одной локали) -> тело запроса. Виды без локали в имени
+        чередуют локали по номеру варианта: выбор локали мультилокальным Faker не зависит от seed
+        """
+        kinds = {}
+        for locale in locales:
+            kinds[f'full:{locale}'] = lambda fake: {'first_name': fake.first_name(), 'last_name': fake.last_name()}
+            kinds[f'required:{locale}'] = lambda fake: {'last_name': fake.last_name()}
+        kinds['full'] = kinds[f'full:{locales[0]}']
+        kinds['required'] = kinds[f'required:{locales[0]}']
+        kinds['without_required'] = lambda fake: {'first_name': fake.first_name()}
+        kinds['long_text:first_name'] = lambda fake: {
+            'first_name': fake.sentence(nb_words=PayloadCorpus.LONG_TEXT_WORDS), 'last_name': fake.last_name()}
+        kinds['long_text:last_name'] = lambda fake: {
+            'last_name': fake.sentence(nb_words=PayloadCorpus.LONG_TEXT_WORDS)}
+        return kinds
+
+    @classmethod
+    def generators_hash(cls) -> str:
+        """Хэш того, чем генерируются тела: исходный код _kinds, LONG_TEXT_WORDS и версия Faker"""
+        source = f"{inspect.getsource(cls._kinds)}\n{cls.LONG_TEXT_WORDS}\n{importlib.metadata.version('Faker')}"
+        return hashlib.sha256(source.encode('utf-8')).hexdigest()[:16]
+
+    def __init__(self, path=PAYLOAD_CORPUS_PATH):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._data[:len(self.MAGIC)] != self.MAGIC:
+            raise ValueError(f"{self.path} не является корпусом тел запросов")
+        header_length, = self.LENGTH.unpack_from(self._data, len(self.MAGIC))
+        header_start = len(self.MAGIC) + self.LENGTH.size
+        self.header = json.loads(self._data[header_start:header_start + header_length])
+        self.kinds = self.header['kinds']  # вид -> номер первой записи индекса
+        self._index_start = header_start + header_length
+
+    @classmethod
+    def build(cls, path=PAYLOAD_CORPUS_PATH, seed=PAYLOAD_CORPUS_SEED, size=PAYLOAD_CORPUS_SIZE,
+              locales=FAKER_LOCALES) -> Path:
+        """Генерирует корпус и атомарно записывает его в path"""
+        from faker import Faker  # нужен только для генерации корпуса, не для чтения
+        fake = Faker(locales)
+        fake.seed_instance(seed)
+        bodies, kinds = [], {}
+        for kind, generate in cls._kinds(locales).items():
+            kinds[kind] = len(bodies)
+            kind_locale = kind.partition(':')[2]
+            for number in range(size):
+                locale = kind_locale if kind_locale in locales else locales[number % len(locales)]
+                bodies.append(json.dumps(generate(fake[locale]), ensure_ascii=False).encode('utf-8'))
+        header = {'version': cls.VERSION, 'seed': seed, 'size': size, 'locales': list(locales),
+                  'generators': cls.generators_hash(), 'kinds': kinds}
+        header_bytes = json.dumps(header).encode('utf-8')
+        offset = len(cls.MAGIC) + cls.LENGTH.size + len(header_bytes) + cls.INDEX_ENTRY.size * len(bodies)
+        index = bytearray()
+        for body in bodies:
+            index += cls.INDEX_ENTRY.pack(offset, len(body))
+            offset += len(body)
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(temp_path, 'wb') as f:
+            f.write(cls.MAGIC + cls.LENGTH.pack(len(header_bytes)) + header_bytes + bytes(index) + b''.join(bodies))
+        os.replace(temp_path, path)
+        return path
+
+    def _matches(self, seed, size, locales) -> bool:
+        return (self.header.get('version'), self.header.get('seed'), self.header.get('size'),
+                self.header.get('locales'), self.header.get('generators')) == \
+            (self.VERSION, seed, size, list(locales), self.generators_hash())
+
+    @classmethod
+    def ensure(cls, path=PAYLOAD_CORPUS_PATH, seed=PAYLOAD_CORPUS_SEED, size=PAYLOAD_CORPUS_SIZE,
+               locales=FAKER_LOCALES) -> 'PayloadCorpus':
+        """Открывает корпус, при отсутствии или других параметрах генерации - генерирует его (один процесс из всех)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path.with_name(f"{path.name}.lock"), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                try:
+                    corpus = cls(path)
+                    if corpus._matches(seed, size, locales):
+                        return corpus
+                except (FileNotFoundError, ValueError):
+                    pass
+                cls.build(path, seed, size, locales)
+                return cls(path)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @classmethod
+    def default(cls) -> 'PayloadCorpus':
+        """Возвращает общий для процесса корпус по настройкам из Data/constants.py"""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls.ensure()
+            return cls._default
+
+    @staticmethod
+    def index_for(key, size: int) -> int:
+        """Возвращает номер варианта по ключу: целое - как есть, строку (например, nodeid теста) - по стабильному хэшу"""
+        if isinstance(key, int):
+            return key % size
+        return int.from_bytes(hashlib.blake2b(str(key).encode('utf-8'), digest_size=8).digest(), 'little') % size
+
+    def payload(self, kind: str, key=0) -> bytes:
+        """Возвращает сериализованное тело вида kind для ключа key"""
+        if kind not in self.kinds:
+            raise KeyError(f"В корпусе нет тел вида {kind!r}; доступны: {', '.join(self.kinds)}")
+        entry = self.kinds[kind] + self.index_for(key, self.header['size'])
+        offset, length = self.INDEX_ENTRY.unpack_from(self._data, self._index_start + self.INDEX_ENTRY.size * entry)
+        return self._data[offset:offset + length]
+
+    def body(self, kind: str, key=0) -> dict:
+        """Возвращает тело вида kind для ключа key в виде словаря (например, для сверки с ответом)"""
+        return json.loads(self.payload(kind, key))
+
+    @staticmethod
+    def with_fields(payload: bytes, **fields) -> bytes:
+        """Дописывает поля в сериализованное тело без повторной сериализации всего тела"""
+        if not fields:
+            return payload
+        extra = json.dumps(fields, ensure_ascii=False).encode('utf-8')
+        return payload[:-1] + b', ' + extra[1:] if payload != b'{}' else extra
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Генерация корпуса тел запросов на создание пользователя")
+    parser.add_argument('--path', default=PAYLOAD_CORPUS_PATH)
+    parser.add_argument('--seed', type=int, default=PAYLOAD_CORPUS_SEED)
+    parser.add_argument('--size', type=int, default=PAYLOAD_CORPUS_SIZE, help="вариантов каждого вида")
+    args = parser.parse_args()
+    path = PayloadCorpus.build(args.path, args.seed, args.size)
+    corpus = PayloadCorpus(path)
+    print(f"{path}: {len(corpus.kinds)} видов по {args.size} тел, {path.stat().st_size} байт")
+
+
+if __name__ == '__main__':
+    main()
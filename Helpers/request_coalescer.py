@@ -0,0 +1,122 @@
+"""Объединение одинаковых одновременных GET-запросов и кратковременный кэш ответов для проекта API_tests_example"""
+
+import threading
+import time
+from concurrent.futures import Future
+from urllib.parse import urlencode, urlsplit, urlunsplit
+
+from Data.constants import COALESCE_ENABLED, COALESCE_TTL, COALESCE_MAX_ENTRIES
+
+
+class RequestCoalescer:
+    """
+    Одинаковые (метод, URL, отсортированные параметры query, значимые хедеры, allow_redirects) GET-запросы,
+    отправленные одновременно, выполняются одним обращением к сети: остальные вызовы ждут его результат.
+    Полученный ответ еще ttl секунд отдается одинаковым запросам из кэша (ttl=0 - только объединение).
+    POST/DELETE сбрасывают кэш и ожидание по всему ресурсу (/api/<ресурс>), поэтому запрос после изменения
+    данных всегда идет в сеть.
+    Ответ общий для всех получивших его вызовов, поэтому изменять его в тестах нельзя (см. APIResponse)
+    """
+
+    METHODS = frozenset({'GET'})
+    # Хедеры запроса, от которых зависит ответ API
+    KEY_HEADERS = ('accept', 'accept-language', 'authorization')
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, ttl=COALESCE_TTL, max_entries=COALESCE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.network_calls = 0
+        self.shared = 0  # вызовов, получивших ответ без обращения к сети
+        self._in_flight = {}  # ключ -> Future выполняющегося запроса
+        self._cache = {}  # ключ -> (момент устаревания, ответ)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def default(cls):
+        """Возвращает общий для процесса объединитель запросов или None, если он выключен (API_COALESCE)"""
+        if not COALESCE_ENABLED:
+            return None
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    @staticmethod
+    def resource(url: str) -> str:
+        """Возвращает префикс ресурса URL: схема, хост и путь до /api/<ресурс> включительно"""
+        scheme, netloc, path, _, _ = urlsplit(url)
+        parts = path.rstrip('/').split('/')
+        return urlunsplit((scheme, netloc, '/'.join(parts[:3]) if parts[1:2] == ['api'] else path, '', ''))
+
+    @classmethod
+    def request_key(cls, method: str, url: str, params=None, headers=None, allow_redirects=False, **_) -> tuple:
+        """Возвращает канонический ключ запроса"""
+        if isinstance(params, dict):
+            params = params.items()
+        query = urlencode(sorted((str(name), str(value)) for name, value in (params or ())))
+        key_headers = tuple(sorted((name.lower(), value) for name, value in (headers or {}).items()
+                                   if name.lower() in cls.KEY_HEADERS))
+        return method, url, query, key_headers, bool(allow_redirects)
+
+    def execute(self, method: str, url: str, send, **kwargs):
+        """
+        Выполняет запрос send() или возвращает ответ одинакового выполняющегося либо недавнего запроса.
+        Возвращает пару (ответ, получен ли он без обращения к сети)
+        """
+        if method not in self.METHODS or kwargs.get('stream') or kwargs.get('data') is not None:
+            return send(), False
+        key = self.request_key(method, url, **kwargs)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] > time.monotonic():
+                self.shared += 1
+                return cached[1], True
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+            else:
+                self.shared += 1
+        if not owner:
+            return future.result(), True
+
+        try:
+            response = send()
+        except BaseException as e:
+            future.set_exception(e)
+            with self._lock:
+                if self._in_flight.get(key) is future:
+                    del self._in_flight[key]
+            raise
+        with self._lock:
+            self.network_calls += 1
+            # Если ресурс изменили, пока запрос выполнялся, ответ мог устареть: не кэшируем
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+                if self.ttl > 0 and response.status_code < 500:
+                    self._store(key, response)
+        future.set_result(response)
+        return response, False
+
+    def _store(self, key: tuple, response):
+        now = time.monotonic()
+        if len(self._cache) >= self.max_entries:
+            self._cache = {cache_key: entry for cache_key, entry in self._cache.items() if entry[0] > now}
+            if len(self._cache) >= self.max_entries:
+                self._cache.pop(next(iter(self._cache)))
+        self._cache[key] = (now + self.ttl, response)
+
+    def invalidate(self, url: str):
+        """Сбрасывает кэш и ожидание запросов к ресурсу URL (вызывается после изменяющих запросов)"""
+        resource = self.resource(url)
+        with self._lock:
+            for store in (self._cache, self._in_flight):
+                for key in [key for key in store if key[1] == resource or key[1].startswith(resource + '/')]:
+                    del store[key]
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
@@ -0,0 +1,408 @@
+"""
+Хранилище результатов прогонов (SQLite) и тренды длительности тестов и латентности эндпойнтов
+для проекта API_tests_example.
+
+Запуск: python -m Helpers.result_store runs [--last N]
+        python -m Helpers.result_store trend (--endpoint '<метод путь>' | --test <ID теста>) [--metric M] [--runs N]
+        python -m Helpers.result_store regressions [--runs N] [--threshold T]
+"""
+
+import argparse
+import sqlite3
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import pytest
+
+from Data.constants import API_TARGET, CASSETTE_MODE, RESULT_STORE_PATH, RESULT_STORE_RUNS, RESULT_STORE_THRESHOLD
+from Helpers.duration_scheduler import DurationHistory
+from Helpers.latency import LatencyMetrics
+
+ROOT = Path(__file__).parents[1]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started REAL NOT NULL,
+    duration REAL NOT NULL,
+    target TEXT NOT NULL,
+    cassette_mode TEXT NOT NULL,
+    git_commit TEXT,
+    workers INTEGER NOT NULL,
+    tests INTEGER NOT NULL,
+    passed INTEGER NOT NULL,
+    failed INTEGER NOT NULL,
+    skipped INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_started ON runs (started);
+CREATE TABLE IF NOT EXISTS test_results (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    test_id TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    duration REAL NOT NULL,
+    requests INTEGER NOT NULL,
+    retries INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    request_time REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS test_results_test ON test_results (test_id, run_id);
+CREATE TABLE IF NOT EXISTS endpoint_metrics (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    endpoint TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    retries INTEGER NOT NULL,
+    p50 REAL NOT NULL,
+    p90 REAL NOT NULL,
+    p95 REAL NOT NULL,
+    p99 REAL NOT NULL,
+    max REAL NOT NULL,
+    mean REAL NOT NULL,
+    ttfb_p95 REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS endpoint_metrics_endpoint ON endpoint_metrics (endpoint, run_id);
+"""
+
+# Метрики, по которым строятся тренды (чем больше значение, тем хуже), и их единицы
+ENDPOINT_METRICS = {'p50': 'мс', 'p90': 'мс', 'p95': 'мс', 'p99': 'мс', 'max': 'мс', 'mean': 'мс',
+                    'ttfb_p95': 'мс', 'errors': 'шт', 'retries': 'шт', 'count': 'шт'}
+TEST_METRICS = {'duration': 'с', 'request_time': 'с', 'requests': 'шт', 'retries': 'шт', 'errors': 'шт',
+                'failed': 'доля'}
+
+
+class ResultStore:
+    """
+    Хранилище результатов прогонов: в каждый прогон добавляются строка runs, строки test_results
+    (исход и длительность теста, число запросов, повторов и ошибок его запросов) и endpoint_metrics
+    (перцентили времени запросов эндпойнта за прогон, мс). Записи только добавляются, не изменяются;
+    запросы трендов идут по индексам (test_id, run_id) и (endpoint, run_id)
+    """
+
+    def __init__(self, path=RESULT_STORE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path, timeout=30)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def append_run(self, run: dict, tests: list, endpoints: list) -> int:
+        """Добавляет прогон одной транзакцией и возвращает его run_id"""
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (started, duration, target, cassette_mode, git_commit, workers, tests, passed, "
+                "failed, skipped) VALUES (:started, :duration, :target, :cassette_mode, :git_commit, :workers, "
+                ":tests, :passed, :failed, :skipped)", run)
+            run_id = cursor.lastrowid
+            self.connection.executemany(
+                "INSERT INTO test_results (run_id, test_id, outcome, duration, requests, retries, errors, "
+                "request_time) VALUES (:run_id, :test_id, :outcome, :duration, :requests, :retries, :errors, "
+                ":request_time)", [{'run_id': run_id, **test} for test in tests])
+            self.connection.executemany(
+                "INSERT INTO endpoint_metrics (run_id, endpoint, count, errors, retries, p50, p90, p95, p99, max, "
+                "mean, ttfb_p95) VALUES (:run_id, :endpoint, :count, :errors, :retries, :p50, :p90, :p95, :p99, "
+                ":max, :mean, :ttfb_p95)", [{'run_id': run_id, **endpoint} for endpoint in endpoints])
+        return run_id
+
+    def runs(self, last: int = RESULT_STORE_RUNS) -> list:
+        """Последние прогоны, от старых к новым"""
+        rows = self.connection.execute("SELECT * FROM runs ORDER BY run_id DESC LIMIT ?", (last,)).fetchall()
+        return [dict(row) for row in reversed(rows)]
+
+    def endpoint_trend(self, endpoint: str, metric: str = 'p95', last: int = RESULT_STORE_RUNS) -> list:
+        """(run_id, started, значение) метрики эндпойнта в последних last прогонах, где он вызывался"""
+        if metric not in ENDPOINT_METRICS:
+            raise ValueError(f"Неизвестная метрика эндпойнта: {metric}")
+        rows = self.connection.execute(
+            f"SELECT m.run_id, r.started, m.{metric} AS value FROM endpoint_metrics m "
+            f"JOIN runs r ON r.run_id = m.run_id WHERE m.endpoint = ? ORDER BY m.run_id DESC LIMIT ?",
+            (endpoint, last)).fetchall()
+        return [tuple(row) for row in reversed(rows)]
+
+    def test_trend(self, test_id: str, metric: str = 'duration', last: int = RESULT_STORE_RUNS) -> list:
+        """
+        (run_id, started, значение) метрики теста в последних last прогонах. ID теста без параметров
+        объединяет все его параметризации (параметры из randint меняются от прогона к прогону): длительность
+        и счетчики суммируются, failed - доля упавших
+        """
+        if metric not in TEST_METRICS:
+            raise ValueError(f"Неизвестная метрика теста: {metric}")
+        value = "AVG(t.outcome IN ('failed', 'error'))" if metric == 'failed' else f"SUM(t.{metric})"
+        rows = self.connection.execute(
+            f"SELECT t.run_id, r.started, {value} AS value FROM test_results t JOIN runs r ON r.run_id = t.run_id "
+            f"WHERE t.test_id = ? OR t.test_id GLOB ? GROUP BY t.run_id ORDER BY t.run_id DESC LIMIT ?",
+            (test_id, f"{test_id}[[]*", last)).fetchall()
+        return [tuple(row) for row in reversed(rows)]
+
+    def regressions(self, last: int = RESULT_STORE_RUNS, threshold: float = RESULT_STORE_THRESHOLD,
+                    metric: str = 'p95') -> list:
+        """
+        Сравнивает последний прогон с медианой предыдущих сравнимых (та же цель и то же число воркеров xdist,
+        в пределах last прогонов): эндпойнты, у которых metric выросла больше чем на threshold, и тесты, которые
+        упали, хотя в предыдущих прогонах проходили. Возвращает словари {'kind', 'name', 'baseline', 'current',
+        'ratio'}
+        """
+        runs = self.runs(last)
+        if len(runs) < 2:
+            return []
+        current_run = runs[-1]['run_id']
+        comparable = {run['run_id'] for run in runs[:-1]
+                      if (run['target'], run['workers']) == (runs[-1]['target'], runs[-1]['workers'])}
+        result = []
+        endpoints = {row['endpoint'] for row in self.connection.execute(
+            "SELECT endpoint FROM endpoint_metrics WHERE run_id = ?", (current_run,))}
+        for endpoint in sorted(endpoints):
+            trend = self.endpoint_trend(endpoint, metric, last)
+            previous = [value for run_id, _, value in trend if run_id in comparable]
+            if not previous:
+                continue
+            baseline, current = statistics.median(previous), trend[-1][2]
+            ratio = current / baseline if baseline else None
+            if ratio is not None and ratio > 1 + threshold:
+                result.append({'kind': f"endpoint {metric}", 'name': endpoint, 'baseline': baseline,
+                               'current': current, 'ratio': ratio})
+        failed = self.connection.execute(
+            "SELECT test_id FROM test_results WHERE run_id = ? AND outcome IN ('failed', 'error')",
+            (current_run,)).fetchall()
+        for (test_id,) in failed:
+            passed_before = self.connection.execute(
+                "SELECT COUNT(*) FROM test_results WHERE test_id = ? AND run_id >= ? AND run_id < ? "
+                "AND outcome = 'passed'", (test_id, runs[0]['run_id'], current_run)).fetchone()[0]
+            if passed_before:
+                result.append({'kind': 'test failed', 'name': test_id, 'baseline': None, 'current': None,
+                               'ratio': None})
+        return result
+
+
+class RunRecorder:
+    """
+    Сбор результатов прогона для ResultStore. Плагин pytest: регистрируется в каждом процессе (главном
+    и воркерах xdist) и подключается как хук APIClient.request_hooks. Воркер учитывает запросы текущего теста
+    и гистограммы времени запросов по эндпойнтам и передает их главному процессу; главный процесс по отчетам
+    тестов (в т.ч. воркеров) учитывает исходы и длительности и по окончании прогона записывает его в хранилище.
+    При воспроизведении из кассеты время запросов не учитывается
+    """
+
+    def __init__(self, config, path=RESULT_STORE_PATH):
+        self.config = config
+        self.path = path
+        self.started = time.time()
+        self.metrics = LatencyMetrics() if CASSETTE_MODE != 'replay' else None
+        self.endpoint_errors = defaultdict(int)
+        self.requests = defaultdict(lambda: {'requests': 0, 'retries': 0, 'errors': 0, 'request_time': 0.0})
+        self.outcomes = {}  # ID теста -> исход
+        self.durations = defaultdict(float)  # ID теста -> setup + call + teardown, с
+        self.workers = 0
+        self._current_test = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_error(timing: dict) -> bool:
+        return timing.get('error') is not None or (timing.get('status') or 0) >= 500
+
+    def record(self, timing: dict):
+        """Хук APIClient.request_hooks: учитывает запрос в метриках эндпойнта и текущего теста"""
+        if timing.get('shared'):
+            return
+        if self.metrics is not None:
+            self.metrics.record(timing)
+        error = self.is_error(timing)
+        with self._lock:
+            if error:
+                self.endpoint_errors[timing['endpoint']] += 1
+            if self._current_test is not None:
+                stats = self.requests[self._current_test]
+                stats['requests'] += 1
+                stats['retries'] += timing.get('retries') or 0
+                stats['errors'] += error
+                stats['request_time'] += timing.get('total') or 0.0
+
+    @staticmethod
+    def outcome(report, previous: str = None) -> str:
+        """Исход теста с учетом очередной фазы: упавшая setup/teardown - error, упавший call - failed"""
+        if report.failed:
+            return 'failed' if report.when == 'call' else 'error'
+        if previous in ('failed', 'error'):
+            return previous
+        if report.skipped:
+            return 'xfailed' if hasattr(report, 'wasxfail') else 'skipped'
+        if report.when == 'call' or previous is None:
+            return 'xpassed' if hasattr(report, 'wasxfail') else 'passed'
+        return previous
+
+    def endpoint_rows(self) -> list:
+        """Строки endpoint_metrics: перцентили времени запроса (total) и TTFB в мс, повторы и ошибки"""
+        if self.metrics is None:
+            return []
+        rows = []
+        for endpoint, histograms in sorted(self.metrics.histograms.items()):
+            total = histograms.get('total')
+            if total is None or not total.count:
+                continue
+            summary = {name: value / 1000 for name, value in total.summary().items() if name != 'count'}
+            ttfb = histograms.get('ttfb')
+            rows.append({'endpoint': endpoint, 'count': total.count, 'errors': self.endpoint_errors.get(endpoint, 0),
+                         'retries': histograms['retries'].total if 'retries' in histograms else 0,
+                         'p50': summary['p50'], 'p90': summary['p90'], 'p95': summary['p95'],
+                         'p99': summary['p99'], 'max': summary['max'], 'mean': summary['mean'],
+                         'ttfb_p95': ttfb.percentile(95) / 1000 if ttfb is not None else 0.0})
+        return rows
+
+    def test_rows(self) -> list:
+        return [{'test_id': test_id, 'outcome': outcome, 'duration': self.durations[test_id],
+                 **self.requests.get(test_id, {'requests': 0, 'retries': 0, 'errors': 0, 'request_time': 0.0})}
+                for test_id, outcome in sorted(self.outcomes.items())]
+
+    @staticmethod
+    def git_commit():
+        try:
+            return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                  text=True, check=True).stdout.strip() or None
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def save(self) -> int:
+        """Записывает прогон в хранилище и возвращает его run_id"""
+        tests = self.test_rows()
+        outcomes = [test['outcome'] for test in tests]
+        run = {'started': self.started, 'duration': time.time() - self.started, 'target': API_TARGET,
+               'cassette_mode': CASSETTE_MODE, 'git_commit': self.git_commit(),
+               'workers': self.workers, 'tests': len(tests),
+               'passed': outcomes.count('passed'), 'failed': outcomes.count('failed') + outcomes.count('error'),
+               'skipped': outcomes.count('skipped') + outcomes.count('xfailed')}
+        store = ResultStore(self.path)
+        try:
+            return store.append_run(run, tests, self.endpoint_rows())
+        finally:
+            store.close()
+
+    # region Хуки pytest
+    def pytest_runtest_setup(self, item):
+        self._current_test = DurationHistory.test_id(item.nodeid)
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_teardown(self, item):
+        """Запросы при завершении фикстур (например, удаление пользователей пула) к тесту не относятся"""
+        self._current_test = None
+
+    def pytest_runtest_logreport(self, report):
+        """Учитывает фазу теста (в главном процессе сюда приходят и отчеты воркеров xdist)"""
+        if hasattr(self.config, 'workerinput'):
+            return
+        test_id = DurationHistory.test_id(report.nodeid)
+        self.durations[test_id] += report.duration
+        self.outcomes[test_id] = self.outcome(report, self.outcomes.get(test_id))
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):
+        """Добавляет запросы и гистограммы, собранные воркером xdist, к собранным в главном процессе"""
+        data = getattr(node, 'workeroutput', {}).get('result_store')
+        if data is None:
+            return
+        self.workers += 1
+        if self.metrics is not None:
+            self.metrics.merge_dict(data['metrics'])
+        for endpoint, count in data['endpoint_errors'].items():
+            self.endpoint_errors[endpoint] += count
+        for test_id, stats in data['requests'].items():
+            for key, value in stats.items():
+                self.requests[test_id][key] += value
+
+    def pytest_sessionfinish(self, session):
+        """Воркер передает собранное главному процессу, главный процесс записывает прогон, если тесты выполнялись"""
+        if hasattr(session.config, 'workerinput'):
+            session.config.workeroutput['result_store'] = {
+                'metrics': self.metrics.to_dict() if self.metrics is not None else {},
+                'endpoint_errors': dict(self.endpoint_errors), 'requests': dict(self.requests)}
+            return
+        if self.outcomes:
+            self.save()
+    # endregion Хуки pytest
+
+
+def format_time(started: float) -> str:
+    return time.strftime('%Y-%m-%d %H:%M', time.localtime(started))
+
+
+def print_trend(title: str, unit: str, trend: list):
+    print(title)
+    if not trend:
+        print("нет данных")
+        return
+    values = [value for _, _, value in trend]
+    print(f"{'прогон':>8}  {'время':<16} {'значение':>12}")
+    for run_id, started, value in trend:
+        print(f"{run_id:>8}  {format_time(started):<16} {value:>12.3f}")
+    print(f"прогонов: {len(values)}, медиана {statistics.median(values):.3f} {unit}, "
+          f"min {min(values):.3f}, max {max(values):.3f}, последний {values[-1]:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Тренды результатов прогонов тестов из хранилища результатов")
+    parser.add_argument('--store', default=RESULT_STORE_PATH, help="файл хранилища (SQLite)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    runs_parser = commands.add_parser('runs', help="последние прогоны")
+    runs_parser.add_argument('--last', type=int, default=RESULT_STORE_RUNS)
+    trend_parser = commands.add_parser('trend', help="метрика эндпойнта или теста по прогонам")
+    target = trend_parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--endpoint', help="метка эндпойнта, например 'GET /api/users/{id}'")
+    target.add_argument('--test', help="ID теста; без параметров - все параметризации теста")
+    trend_parser.add_argument('--metric', default=None,
+                              help=f"эндпойнт: {', '.join(ENDPOINT_METRICS)} (по умолчанию p95); "
+                                   f"тест: {', '.join(TEST_METRICS)} (по умолчанию duration)")
+    trend_parser.add_argument('--runs', type=int, default=RESULT_STORE_RUNS, help="число последних прогонов")
+    regressions_parser = commands.add_parser('regressions', help="регрессии последнего прогона")
+    regressions_parser.add_argument('--runs', type=int, default=RESULT_STORE_RUNS,
+                                    help="число последних прогонов для сравнения")
+    regressions_parser.add_argument('--threshold', type=float, default=RESULT_STORE_THRESHOLD,
+                                    help="допустимый рост метрики относительно медианы предыдущих прогонов (доля)")
+    regressions_parser.add_argument('--metric', default='p95', choices=list(ENDPOINT_METRICS))
+    args = parser.parse_args()
+
+    if not Path(args.store).exists():
+        sys.exit(f"Хранилище результатов не найдено: {args.store}")
+    store = ResultStore(args.store)
+    try:
+        if args.command == 'runs':
+            print(f"{'прогон':>8}  {'время':<16} {'длит., с':>9} {'тестов':>7} {'упало':>6} {'воркеров':>8}  "
+                  f"цель     коммит")
+            for run in store.runs(args.last):
+                print(f"{run['run_id']:>8}  {format_time(run['started']):<16} {run['duration']:>9.1f} "
+                      f"{run['tests']:>7} {run['failed']:>6} {run['workers']:>8}  {run['target']:<8} "
+                      f"{run['git_commit'] or '-'}")
+        elif args.command == 'trend':
+            try:
+                if args.endpoint:
+                    metric = args.metric or 'p95'
+                    trend = store.endpoint_trend(args.endpoint, metric, args.runs)
+                    print_trend(f"{metric} {args.endpoint}", ENDPOINT_METRICS[metric], trend)
+                else:
+                    metric = args.metric or 'duration'
+                    trend = store.test_trend(args.test, metric, args.runs)
+                    print_trend(f"{metric} {args.test}", TEST_METRICS[metric], trend)
+            except ValueError as e:
+                sys.exit(str(e))
+        else:
+            regressions = store.regressions(args.runs, args.threshold, args.metric)
+            for entry in regressions:
+                if entry['ratio'] is None:
+                    print(f"{entry['kind']:<16} {entry['name']}")
+                else:
+                    print(f"{entry['kind']:<16} {entry['name']}: {entry['baseline']:.1f} -> {entry['current']:.1f} "
+                          f"({(entry['ratio'] - 1) * 100:+.1f}%)")
+            if regressions:
+                sys.exit(f"Регрессии последнего прогона (порог {args.threshold:.0%}): {len(regressions)}")
+            print("Регрессий нет")
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
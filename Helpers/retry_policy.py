@@ -0,0 +1,122 @@
+"""Политика таймаутов и повторов запросов APIClient для проекта API_tests_example"""
+
+import random
+import threading
+import time
+
+import requests
+
+from Data.constants import (RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY, RETRY_BUDGET_RATIO,
+                            RETRY_BUDGET_CAPACITY, TIMEOUT_PERCENTILE, TIMEOUT_MULTIPLIER, TIMEOUT_MIN, TIMEOUT_MAX,
+                            TIMEOUT_MIN_SAMPLES, DEFAULT_TIMEOUTS)
+from Helpers.cassette import CassetteMiss
+from Helpers.latency import LatencyHistogram
+
+
+class RetryPolicy:
+    """
+    Политика таймаутов и повторов:
+    - таймаут запроса к эндпойнту - перцентиль наблюдаемой латентности успешных запросов, умноженный на
+      коэффициент и ограниченный [timeout_min, timeout_max]; пока замеров мало - значение по умолчанию для метода;
+    - повторы с экспоненциальной задержкой и полным джиттером (случайная задержка от 0 до base * 2**n);
+    - бюджет повторов: каждый запрос пополняет бюджет на budget_ratio (но не выше budget_capacity), каждый повтор
+      тратит 1; без бюджета повтор не выполняется, поэтому при массовых сбоях повторы добавляют к нагрузке
+      не больше budget_ratio;
+    - по умолчанию повторяются только идемпотентные методы, для остальных (POST) нужен явный опт-ин
+    """
+
+    IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+    RETRY_EXCEPTIONS = (requests.exceptions.Timeout, requests.exceptions.ConnectionError)
+    NON_RETRY_EXCEPTIONS = (CassetteMiss,)
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, max_attempts=RETRY_MAX_ATTEMPTS, base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY,
+                 budget_ratio=RETRY_BUDGET_RATIO, budget_capacity=RETRY_BUDGET_CAPACITY,
+                 timeout_percentile=TIMEOUT_PERCENTILE, timeout_multiplier=TIMEOUT_MULTIPLIER,
+                 timeout_min=TIMEOUT_MIN, timeout_max=TIMEOUT_MAX, timeout_min_samples=TIMEOUT_MIN_SAMPLES,
+                 default_timeouts=None, rnd: random.Random = None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget_ratio = budget_ratio
+        self.budget_capacity = budget_capacity
+        self.timeout_percentile = timeout_percentile
+        self.timeout_multiplier = timeout_multiplier
+        self.timeout_min = timeout_min
+        self.timeout_max = timeout_max
+        self.timeout_min_samples = timeout_min_samples
+        self.default_timeouts = default_timeouts or DEFAULT_TIMEOUTS
+        self.rnd = rnd or random.Random()
+        self.budget = float(budget_capacity)
+        self.retries_done = 0
+        self.retries_denied = 0
+        self._latencies = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def default(cls) -> 'RetryPolicy':
+        """Возвращает общую для процесса политику: наблюдения за латентностью накапливаются всеми клиентами"""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    def timeout_for(self, method: str, endpoint: str) -> float:
+        """Возвращает таймаут (с) запроса к эндпойнту по наблюдаемой латентности"""
+        histogram = self._latencies.get(endpoint)
+        if histogram is None or histogram.count < self.timeout_min_samples:
+            return self.default_timeouts.get(method, self.timeout_max)
+        observed = histogram.percentile(self.timeout_percentile) / 1_000_000 * self.timeout_multiplier
+        return min(max(observed, self.timeout_min), self.timeout_max)
+
+    def observe(self, endpoint: str, seconds: float):
+        """Учитывает латентность успешной попытки"""
+        with self._lock:
+            self._latencies.setdefault(endpoint, LatencyHistogram()).record(seconds * 1_000_000)
+
+    def backoff(self, attempt: int) -> float:
+        """Возвращает задержку перед повтором номер attempt (1, 2, ...): полный джиттер"""
+        return self.rnd.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def _deposit(self):
+        with self._lock:
+            self.budget = min(self.budget + self.budget_ratio, self.budget_capacity)
+
+    def _withdraw(self) -> bool:
+        with self._lock:
+            if self.budget < 1:
+                self.retries_denied += 1
+                return False
+            self.budget -= 1
+            self.retries_done += 1
+            return True
+
+    def is_retryable(self, method: str, error: Exception, retry_non_idempotent=False) -> bool:
+        """Проверяет, можно ли повторить запрос после ошибки (без учета числа попыток и бюджета)"""
+        if isinstance(error, self.NON_RETRY_EXCEPTIONS) or not isinstance(error, self.RETRY_EXCEPTIONS):
+            return False
+        return method.upper() in self.IDEMPOTENT_METHODS or retry_non_idempotent
+
+    def execute(self, method: str, endpoint: str, send, timeout: float = None, retry_non_idempotent=False):
+        """
+        Выполняет send(timeout) с повторами по политике и возвращает ответ;
+        при исчерпании попыток или бюджета выбрасывает исключение последней попытки
+        """
+        self._deposit()
+        attempt = 0
+        while True:
+            attempt += 1
+            attempt_timeout = timeout if timeout is not None else self.timeout_for(method, endpoint)
+            start = time.perf_counter()
+            try:
+                response = send(attempt_timeout)
+            except Exception as e:
+                if (attempt >= self.max_attempts or not self.is_retryable(method, e, retry_non_idempotent)
+                        or not self._withdraw()):
+                    raise
+                time.sleep(self.backoff(attempt))
+                continue
+            self.observe(endpoint, time.perf_counter() - start)
+            return response
@@ -0,0 +1,73 @@
+"""Реестр валидаторов JSON-схем для проекта API_tests_example"""
+
+import threading
+
+from Data import json_schemas, models
+from Helpers.model_base import ModelValidationError, schema_hash
+
+
+class SchemaValidators:
+    """
+    Реестр валидаторов JSON-схем: каждая схема проверяется и компилируется в валидатор один раз за процесс.
+    Ключ реестра - сам объект схемы (схемы из Data/json_schemas.py - словари, поэтому ключом служит их id).
+    jsonschema импортируется при создании первого валидатора: схемы с моделями проверяются без него.
+    Модель сгенерирована из конкретной версии схемы (SCHEMA_HASHES в Data/models.py): если схема изменена,
+    а модели не сгенерированы заново, проверка по ней завершается ошибкой, а не проходит по устаревшей модели
+    """
+
+    _validators = {}  # id(schema) -> (schema, validator); ссылка на схему не дает переиспользовать id
+    _lock = threading.Lock()
+    _models = None  # id(schema) -> (имя схемы, модель из Data/models.py или None, если модель устарела)
+
+    @classmethod
+    def model(cls, schema: dict):
+        """
+        Возвращает сгенерированную для схемы модель (Data/models.py) или None, если модели для схемы нет.
+        RuntimeError - схема изменена после генерации модели
+        """
+        if cls._models is None:
+            with cls._lock:
+                if cls._models is None:
+                    cls._models = {id(getattr(json_schemas, name)): (name, cls._current(name, model))
+                                   for name, model in models.MODELS.items()}
+        name, model = cls._models.get(id(schema), (None, None))
+        if name is not None and model is None:
+            raise RuntimeError(f"Модель схемы {name} в Data/models.py устарела: схема изменена после генерации, "
+                               f"обновите модели (python -m Helpers.model_codegen)")
+        return model
+
+    @staticmethod
+    def _current(name: str, model):
+        """Модель, если хэш схемы совпадает с хэшем при генерации моделей, иначе None"""
+        return model if models.SCHEMA_HASHES.get(name) == schema_hash(getattr(json_schemas, name)) else None
+
+    @classmethod
+    def get(cls, schema: dict) -> 'Draft4Validator':
+        """Возвращает валидатор для схемы, при первом обращении проверяет схему и создает валидатор"""
+        entry = cls._validators.get(id(schema))
+        if entry is None or entry[0] is not schema:
+            with cls._lock:
+                entry = cls._validators.get(id(schema))
+                if entry is None or entry[0] is not schema:
+                    from jsonschema import Draft4Validator
+                    Draft4Validator.check_schema(schema)
+                    entry = (schema, Draft4Validator(schema))
+                    cls._validators[id(schema)] = entry
+        return entry[1]
+
+    @classmethod
+    def validate(cls, schema: dict, body):
+        """Проверяет тело по схеме; при несоответствии - ModelValidationError с путем к ошибочному значению"""
+        from jsonschema import ValidationError
+        try:
+            cls.get(schema).validate(body)
+        except ValidationError as e:
+            path = ''.join(f'[{part}]' if isinstance(part, int) else f'.{part}' for part in e.absolute_path)
+            raise ModelValidationError(f'${path}', e.message)
+
+    @classmethod
+    def precompile(cls, module=json_schemas):
+        """Компилирует валидаторы для всех схем модуля (константы-словари в верхнем регистре)"""
+        for name, schema in vars(module).items():
+            if name.isupper() and isinstance(schema, dict):
+                cls.get(schema)
@@ -0,0 +1,259 @@
+"""
+Индекс зависимостей тестов и выбор тестов, затронутых изменениями (git diff), для проекта API_tests_example
+"""
+
+import ast
+import inspect
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from Data import constants
+
+ROOT = Path(__file__).parents[1]
+SCHEMAS_FILE = 'Data/json_schemas.py'
+CONSTANTS_FILE = 'Data/constants.py'
+MODELS_FILE = 'Data/models.py'  # генерируется из схем (Helpers/model_codegen.py)
+# Файлы тестовых данных в Data/ (Helpers/data_loader.py)
+DATA_SUFFIXES = ('.csv', '.jsonl', '.parquet')
+# Изменения этих файлов не влияют на результат тестов
+IGNORED_SUFFIXES = ('.md', '.txt', '.jsonl')
+IGNORED_FILES = ('.gitignore', 'Dockerfile', 'start_tests.sh')
+IGNORED_DIRS = ('Benchmarks/',)
+
+
+class DependencyIndex:
+    """
+    Индекс зависимостей: ID теста (nodeid без параметров и группы xdist) -> ключи того, от чего тест зависит:
+    schema:<имя схемы>, data:<файл данных>, constant:<имя константы>, module:<файл теста> - по статическому разбору
+    теста, его фикстур и вызываемых им методов класса; endpoint:<метод путь> - по запросам APIClient
+    во время выполнения теста. Индекс хранится в кеше pytest и обновляется для выполненных тестов
+
+    Плагин pytest: регистрируется в каждом процессе (главном и воркерах xdist), при --changed-since
+    и/или --changed-endpoints оставляет только затронутые тесты
+    """
+
+    CACHE_KEY = 'api/dependency_index'
+
+    def __init__(self, config):
+        self.config = config
+        self.index = {test_id: set(keys) for test_id, keys in config.cache.get(self.CACHE_KEY, {}).items()}
+        self.traced = {}  # ID теста -> зависимости тестов, выполненных в этом процессе
+        self._current_test = None
+        self._source_cache = {}
+
+    @staticmethod
+    def test_id(nodeid: str) -> str:
+        """nodeid без параметров и без суффикса группы xdist: параметры из randint меняются от прогона к прогону"""
+        if nodeid.rfind('@') > nodeid.rfind(']'):
+            nodeid = nodeid.rsplit('@', 1)[0]
+        return nodeid.split('[', 1)[0]
+
+    # region Статический разбор
+    @staticmethod
+    def _keys_from_tree(tree: ast.AST) -> tuple:
+        """Возвращает ключи зависимостей из AST и имена методов, вызываемых через self"""
+        keys, methods = set(), set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
+                if node.value.id == 'json_schemas':
+                    keys.add(f'schema:{node.attr}')
+                elif node.value.id == 'self':
+                    methods.add(node.attr)
+            elif isinstance(node, ast.Name) and node.id.isupper() and hasattr(constants, node.id):
+                keys.add(f'constant:{node.id}')
+            elif isinstance(node, ast.Constant) and isinstance(node.value, str) and node.value.endswith(DATA_SUFFIXES):
+                keys.add(f'data:{node.value}')
+        return keys, methods
+
+    def _function_keys(self, func) -> tuple:
+        func = inspect.unwrap(func)
+        if func not in self._source_cache:
+            try:
+                tree = ast.parse(textwrap.dedent(inspect.getsource(func)))
+            except (OSError, TypeError, SyntaxError):
+                tree = None
+            self._source_cache[func] = self._keys_from_tree(tree) if tree is not None else (set(), set())
+        return self._source_cache[func]
+
+    def static_dependencies(self, item) -> set:
+        """Зависимости теста по исходному коду: тело и декораторы теста, вызываемые методы класса, фикстуры"""
+        keys = {f'module:{item.nodeid.split("::", 1)[0]}'}
+        functions = [getattr(item, 'function', None)]
+        functions += [definitions[-1].func for definitions in item._fixtureinfo.name2fixturedefs.values()]
+        seen_methods = set()
+        while functions:
+            func = functions.pop()
+            if func is None:
+                continue
+            func_keys, methods = self._function_keys(func)
+            keys |= func_keys
+            for name in methods - seen_methods:
+                seen_methods.add(name)
+                functions.append(getattr(item.cls, name, None) if item.cls is not None else None)
+        return keys
+    # endregion Статический разбор
+
+    # region Изменения
+    @staticmethod
+    def _git(*args) -> str:
+        return subprocess.run(['git', *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+
+    @staticmethod
+    def _module_values(source: str, file_name: str) -> dict:
+        """
+        Возвращает константы модуля с данными (имена в верхнем регистре) без выполнения его кода:
+        имя -> (значение, имена, от которых оно зависит). Значение - результат ast.literal_eval, если константа
+        задана литералом, иначе - исходный код инструкций верхнего уровня, которые ее задают
+        """
+        values = {}
+        for statement in ast.parse(source, file_name).body:
+            names = {node.id for node in ast.walk(statement) if isinstance(node, ast.Name)}
+            targets = {node.id for node in ast.walk(statement)
+                       if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store) and node.id.isupper()}
+            value = ('code', ast.unparse(statement))
+            if isinstance(statement, (ast.Assign, ast.AnnAssign)) and statement.value is not None:
+                try:
+                    value = ('literal', ast.literal_eval(statement.value))
+                except (ValueError, TypeError, SyntaxError):
+                    pass
+            for name in targets:
+                if name in values:  # задается несколькими инструкциями
+                    previous, dependencies = values[name]
+                    value, names = ('code', f"{previous}\n{value}"), names | dependencies
+                values[name] = (value, names - {name})
+        return values
+
+    @classmethod
+    def _changed_values(cls, ref: str, file_name: str, prefix: str) -> set:
+        """
+        Ключи констант модуля, значения которых отличаются в ref и в рабочем дереве. Константа, заданная
+        не литералом, считается измененной, если изменился задающий ее код или константа, от которой она зависит
+        """
+        try:
+            old = cls._module_values(cls._git('show', f'{ref}:{file_name}'), file_name)
+        except subprocess.CalledProcessError:  # файла не было в ref
+            old = {}
+        new = cls._module_values(ROOT.joinpath(file_name).read_text(encoding='utf-8'), file_name)
+        changed = {name for name in old.keys() | new.keys()
+                   if old.get(name, (None,))[0] != new.get(name, (None,))[0]}
+        propagated = True
+        while propagated:
+            propagated = False
+            for name, (_, dependencies) in new.items():
+                if name not in changed and dependencies & changed:
+                    changed.add(name)
+                    propagated = True
+        return {f'{prefix}:{name}' for name in changed}
+
+    @classmethod
+    def harness_constants(cls) -> set:
+        """Ключи констант, которые использует код обвязки, загруженный в процесс тестов: Helpers и conftest"""
+        paths = {ROOT.joinpath('conftest.py')}
+        for module in list(sys.modules.values()):
+            path = Path(getattr(module, '__file__', None) or '')
+            if path.parent == ROOT.joinpath('Helpers') and path.suffix == '.py':
+                paths.add(path)
+        keys = set()
+        for path in paths:
+            keys |= cls._keys_from_tree(ast.parse(path.read_text(encoding='utf-8')))[0]
+        return {key for key in keys if key.startswith('constant:')}
+
+    @classmethod
+    def changed_keys(cls, ref: str):
+        """
+        Возвращает ключи зависимостей, затронутые изменениями рабочего дерева относительно ref, или None,
+        если изменен код, влияние которого не отслеживается (Helpers, conftest и т.д.), или константа,
+        которую он использует, - нужен полный прогон
+        """
+        files = set(cls._git('diff', '--name-only', ref, '--').split())
+        files |= set(cls._git('ls-files', '--others', '--exclude-standard').split())
+        keys = set()
+        for file_name in files:
+            if file_name.startswith('Data/') and file_name.endswith(DATA_SUFFIXES):
+                keys.add(f'data:{Path(file_name).name}')
+            elif (file_name.endswith(IGNORED_SUFFIXES) or file_name in IGNORED_FILES
+                    or file_name.startswith(IGNORED_DIRS)):
+                continue
+            elif file_name == SCHEMAS_FILE:
+                keys |= cls._changed_values(ref, file_name, 'schema')
+            elif file_name == CONSTANTS_FILE:
+                changed_constants = cls._changed_values(ref, file_name, 'constant')
+                if changed_constants & cls.harness_constants():
+                    return None
+                keys |= changed_constants
+            elif file_name == MODELS_FILE and SCHEMAS_FILE in files:
+                continue  # модели перегенерированы из измененных схем: учтено по схемам
+            elif file_name.startswith('Tests/test_') and file_name.endswith('.py'):
+                keys.add(f'module:{file_name}')
+            else:
+                return None
+        return keys
+    # endregion Изменения
+
+    def select(self, items: list, changed: set) -> tuple:
+        """Делит тесты на затронутые изменениями и остальные; тесты без записи в индексе считаются затронутыми"""
+        selected, deselected = [], []
+        for item in items:
+            recorded = self.index.get(self.test_id(item.nodeid))
+            keys = self.static_dependencies(item) | (recorded or set())
+            (selected if recorded is None or keys & changed else deselected).append(item)
+        return selected, deselected
+
+    # region Хуки pytest
+    def pytest_collection_modifyitems(self, config, items):
+        ref = config.getoption('changed_since')
+        endpoints = config.getoption('changed_endpoints')
+        if ref is None and not endpoints:
+            return
+        changed = {f'endpoint:{endpoint.strip()}' for endpoint in (endpoints or '').split(',') if endpoint.strip()}
+        if ref is not None:
+            changed_files = self.changed_keys(ref)
+            if changed_files is None:
+                return
+            changed |= changed_files
+        selected, deselected = self.select(items, changed)
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = selected
+
+    def pytest_runtest_setup(self, item):
+        self._current_test = self.test_id(item.nodeid)
+        entry = self.traced.setdefault(self._current_test, set())
+        entry |= self.static_dependencies(item)
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_teardown(self, item):
+        """Запросы при завершении фикстур (например, удаление пользователей пула) к тесту не относятся"""
+        self._current_test = None
+
+    def record_request(self, timing: dict):
+        """Хук APIClient.request_hooks: учитывает эндпойнт запроса текущего теста"""
+        if self._current_test is not None:
+            self.traced.setdefault(self._current_test, set()).add(f"endpoint:{timing['endpoint']}")
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):
+        """Добавляет зависимости, собранные воркером xdist, к собранным в главном процессе"""
+        for test_id, keys in getattr(node, 'workeroutput', {}).get('dependency_index', {}).items():
+            self.traced.setdefault(test_id, set()).update(keys)
+
+    def pytest_sessionfinish(self, session):
+        """
+        Воркер передает собранные зависимости главному процессу, главный процесс обновляет и сохраняет индекс.
+        Эндпойнты объединяются с прежними: запрос фикстуры уровня класса или из общего кеша фикстур
+        виден только в одном тесте и не в каждом прогоне
+        """
+        if hasattr(session.config, 'workerinput'):
+            session.config.workeroutput['dependency_index'] = {
+                test_id: sorted(keys) for test_id, keys in self.traced.items()}
+            return
+        for test_id, keys in self.traced.items():
+            previous = {key for key in self.index.get(test_id, ()) if key.startswith('endpoint:')}
+            self.index[test_id] = keys | previous
+        session.config.cache.set(self.CACHE_KEY,
+                                 {test_id: sorted(keys) for test_id, keys in sorted(self.index.items())})
+    # endregion Хуки pytest
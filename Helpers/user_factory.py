@@ -0,0 +1,103 @@
+"""Пул тестовых пользователей с пакетным созданием и удалением для проекта API_tests_example"""
+
+import threading
+
+import requests
+
+from Data.constants import FAKER_LOCALES, USER_POOL_BATCH_SIZE
+from Helpers.api_client import APIClient
+from Helpers.api_response import APIResponse
+from Helpers.async_api_client import AsyncAPIClient
+
+
+class UserFactory:
+    """
+    Создает пользователей пакетами (запросы пакета отправляются одновременно через AsyncAPIClient)
+    и выдает их тестам из пула. Учитывает всех созданных пользователей - и выданных из пула, и созданных
+    самими тестами (track) - и удаляет их одним параллельным пакетом в cleanup, даже если тесты упали.
+    demand - сколько пользователей тесты процесса возьмут из пула (acquire): пакет не больше оставшейся
+    потребности, поэтому лишние пользователи не создаются; None - потребность неизвестна, пакет batch_size
+    """
+
+    def __init__(self, client: APIClient, batch_size=USER_POOL_BATCH_SIZE, locales=FAKER_LOCALES, on_change=None,
+                 demand: int = None):
+        self.client = client
+        self.batch_size = batch_size
+        self.demand = demand
+        self.acquired = 0
+        from faker import Faker  # импорт faker долгий: только когда фабрика действительно нужна
+        self.fake = Faker(locales)
+        self.on_change = on_change  # вызывается при изменении списка пользователей (например, сброс кеша)
+        self._pool = []
+        self._created = []
+        self._lock = threading.Lock()
+
+    def _async_client(self) -> AsyncAPIClient:
+        return AsyncAPIClient(base_url=self.client.base_url, session=self.client.session)
+
+    def _changed(self):
+        if self.on_change is not None:
+            self.on_change()
+
+    def fill(self, count: int = None) -> list:
+        """Одновременно создает count пользователей (по умолчанию batch_size) и добавляет их в пул"""
+        bodies = []
+        for _ in range(count or self.batch_size):
+            locale = self.fake.random_element(self.fake.locales)
+            bodies.append({'first_name': self.fake[locale].first_name(), 'last_name': self.fake[locale].last_name()})
+        responses = self._async_client().fan_out(
+            [('post', {'data': APIResponse.dumps(body), 'headers': {"Content-Type": "application/json"}})
+             for body in bodies])
+        users = [response.json() for response in responses
+                 if isinstance(response, requests.Response) and response.status_code == 201]
+        with self._lock:
+            self._created.extend(user['user_id'] for user in users)
+            self._pool.extend(users)
+        if users:
+            self._changed()
+        if len(users) < len(bodies):
+            errors = [response for response in responses
+                      if not isinstance(response, requests.Response) or response.status_code != 201]
+            raise RuntimeError(f"Не создано пользователей: {len(errors)} из {len(bodies)}; первая ошибка: "
+                               f"{errors[0] if isinstance(errors[0], Exception) else errors[0].status_code}")
+        return users
+
+    def acquire(self) -> dict:
+        """
+        Выдает пользователя из пула (тело ответа на создание); при пустом пуле создает новый пакет
+        по оставшейся потребности (не больше batch_size)
+        """
+        with self._lock:
+            self.acquired += 1
+            if self._pool:
+                return self._pool.pop()
+            remaining = self.batch_size if self.demand is None else self.demand - self.acquired + 1
+        self.fill(max(min(self.batch_size, remaining), 1))
+        with self._lock:
+            return self._pool.pop()
+
+    def track(self, response: requests.Response) -> requests.Response:
+        """
+        Учитывает пользователя, созданного запросом теста, чтобы удалить его в cleanup; возвращает ответ.
+        Повторный вызов для того же ответа (предзагрузка и тест) пользователя не дублирует
+        """
+        if response.status_code == 201:
+            user_id = response.json()['user_id']
+            with self._lock:
+                if user_id in self._created:
+                    return response
+                self._created.append(user_id)
+            self._changed()
+        return response
+
+    def cleanup(self) -> list:
+        """Одновременно удаляет всех созданных пользователей и возвращает ID тех, кого удалить не удалось"""
+        with self._lock:
+            user_ids, self._created, self._pool = self._created, [], []
+        if not user_ids:
+            return []
+        responses = self._async_client().fan_out([('delete', {'path': f"/{user_id}"}) for user_id in user_ids])
+        self._changed()
+        # 404 - пользователя уже удалил сам тест
+        return [user_id for user_id, response in zip(user_ids, responses)
+                if not isinstance(response, requests.Response) or response.status_code not in (200, 202, 204, 404)]
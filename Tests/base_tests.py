@@ -1,14 +1,19 @@
 """Базовые тесты для всех запросов"""
 
 import requests
-from jsonschema import Draft4Validator, ValidationError
 from pytest_check import check
 
+# Элементы проекта
+from Data.constants import LATENCY_BUDGET_CHECK_MAX
+from Helpers.latency import LatencyBudgets
+from Helpers.model_base import ModelValidationError
+from Helpers.schema_validators import SchemaValidators
+
 
 class BaseStatusHeadersSchemaTests:
     """
     Базовые тесты для всех запросов: проверка кода ответа, общих хедеров,
-    соответствия тела ответа JSON-схеме
+    соответствия тела ответа JSON-схеме и времени ответа бюджету латентности эндпойнта
     """
 
     def __init__(self, response: requests.Response, schema: dict, code: int):
@@ -22,25 +27,55 @@ class BaseStatusHeadersSchemaTests:
             f"Код ответа: {self.response.status_code}, должен быть: {self.code_to_be}"
 
     def _test_headers(self):
-        """Проверяет значения хедеров Content-Type и Connection"""
+        """
+        Проверяет значения хедеров Content-Type и Connection; в HTTP/2 хедеров соединения нет (RFC 9113, 8.2.2),
+        поэтому Connection проверяется только для HTTP/1.x
+        """
         check.equal(self.response.headers["Content-Type"], "application/json",
                     "Значение хедера Content-Type не application/json")
-        check.equal(self.response.headers["Connection"], "keep-alive",
-                    "Значение хедера Connection не keep-alive")
+        if getattr(self.response, 'http_version', None) != 'HTTP/2':
+            check.equal(self.response.headers["Connection"], "keep-alive",
+                        "Значение хедера Connection не keep-alive")
 
     def _test_match_with_json_schema(self):
-        """Проверяет соответствие тела ответа JSON-схеме"""
+        """
+        Проверяет соответствие тела ответа JSON-схеме и возвращает тело: модель из Data/models.py,
+        если она сгенерирована для схемы (проверка и создание модели за один проход), иначе словарь
+        """
+        body = self.response.json()
+        model = SchemaValidators.model(self.schema_to_be)
         try:
-            Draft4Validator(self.schema_to_be).validate(self.response.json())
-        except ValidationError:
-            raise AssertionError(
-                f'Тело ответа не соответствует JSON-схеме, {self.response.json()}')
+            if model is not None:
+                return model.from_json(body)
+            SchemaValidators.validate(self.schema_to_be, body)
+            return body
+        except ModelValidationError as e:
+            raise AssertionError(f'Тело ответа не соответствует JSON-схеме ({e}), {body}')
+
+    def _test_latency(self, latency_budget):
+        """
+        Учитывает время ответа в бюджете эндпойнта (LATENCY_BUDGETS, дополненный latency_budget) и мягко проверяет
+        max, если проверка включена (API_LATENCY_BUDGET_CHECK_MAX=1) или max задан в latency_budget;
+        p95 по всем ответам эндпойнта проверяется в конце прогона (LatencyBudgets.exceeded)
+        """
+        budgets = LatencyBudgets.default()
+        if budgets is None or latency_budget is False:
+            return
+        observed = budgets.observe(self.response, latency_budget)
+        if observed is None:
+            return
+        endpoint, elapsed, budget = observed
+        if 'max' in budget and (LATENCY_BUDGET_CHECK_MAX or 'max' in (latency_budget or {})):
+            check.less_equal(elapsed, budget['max'], f"Превышен бюджет латентности max для {endpoint}: "
+                                                     f"{elapsed * 1000:.0f} мс > {budget['max'] * 1000:.0f} мс")
 
-    def test_status_headers_schema(self):
+    def test_status_headers_schema(self, latency_budget=None):
         """
-        Проверяет код ответа, значения хедеров Content-Type и Connection
-        и соответствие тела ответа JSON-схеме
+        Проверяет код ответа, значения хедеров Content-Type и Connection, соответствие тела ответа JSON-схеме
+        и время ответа; возвращает тело ответа (см. _test_match_with_json_schema).
+        latency_budget - бюджет времени ответа ({'p95': с, 'max': с}) вместо профиля эндпойнта, False - без проверки
         """
         self._test_status_code()
         self._test_headers()
-        self._test_match_with_json_schema()
+        self._test_latency(latency_budget)
+        return self._test_match_with_json_schema()
@@ -5,6 +5,7 @@ from typing import Union
 
 import allure
 import pytest
+import requests
 from allure_commons.types import Severity
 from pytest_check import check
 
@@ -33,41 +34,42 @@ class TestGetCompanyByID:
         company_id = randint(1, 7)
         response = api_client_companies.get(path=f"/{company_id}")
         tester = BaseStatusHeadersSchemaTests(response, json_schemas.COMPANY_BY_ID, 200)
-        tester.test_status_headers_schema()
+        body = tester.test_status_headers_schema()
 
-        body = response.json()
-        check.equal(body["company_id"], company_id,
-                    f"ID компании в ответе ({body['company_id']}) не соответствует "
+        check.equal(body.company_id, company_id,
+                    f"ID компании в ответе ({body.company_id}) не соответствует "
                     f"ID компании в запросе ({company_id})")
 
-        first_lang = body['description_lang'][0]['translation_lang']
+        first_lang = body.description_lang[0].translation_lang
         check.equal(first_lang, 'EN',
                     f"При невыбранной локализации первым должен быть показан EN; в ответе {first_lang}")
 
     @pytest.mark.smoke
     @pytest.mark.parametrize('id_without_range', [0, randint(8, 100)])
+    @pytest.mark.prefetch('api_client_companies', lambda id_without_range: {'path': f"/{id_without_range}"})
     @allure.title("""Запрос с валидным ID компании вне пределов фактического количества объектов
      в БД ({id_without_range})""")
     @allure.severity(Severity.NORMAL)
-    def test_company_with_valid_id_without_range(self, id_without_range: int, api_client_companies: APIClient):
+    def test_company_with_valid_id_without_range(self, id_without_range: int,
+                                                 prefetched_response: requests.Response):
         """
         Проверяет результат запроса с ВАЛИДНЫМ параметром 'ID компании', РАВНЫМ 0 ИЛИ ПРЕВЫШАЮЩИМ
         фактическое число объектов в базе
         """
-        response = api_client_companies.get(path=f"/{id_without_range}")
-        tester = BaseStatusHeadersSchemaTests(response, json_schemas.NOT_FOUND_404, 404)
+        tester = BaseStatusHeadersSchemaTests(prefetched_response, json_schemas.NOT_FOUND_404, 404)
         tester.test_status_headers_schema()
 
     # БАГ с параметром -1: невалидный ID дает в ответе 404 вместо 422
     @pytest.mark.negative
     @pytest.mark.regression
     @pytest.mark.parametrize('invalid_id', ['ABC', 1.5, -1])
+    @pytest.mark.prefetch('api_client_companies', lambda invalid_id: {'path': f"/{invalid_id}"})
     @allure.title("Запрос с невалидным ID ({invalid_id})")
     @allure.severity(Severity.MINOR)
-    def test_company_with_invalid_id(self, invalid_id: Union[str, float, int], api_client_companies: APIClient):
+    def test_company_with_invalid_id(self, invalid_id: Union[str, float, int],
+                                     prefetched_response: requests.Response):
         """Проверяет результат запроса с НЕВАЛИДНЫМ параметром 'ID компании'"""
-        response = api_client_companies.get(path=f"/{invalid_id}")
-        tester = BaseStatusHeadersSchemaTests(response, json_schemas.UNPROCESSABLE_ENTITY_422, 422)
+        tester = BaseStatusHeadersSchemaTests(prefetched_response, json_schemas.UNPROCESSABLE_ENTITY_422, 422)
         tester.test_status_headers_schema()
 
 
@@ -86,20 +88,21 @@ class TestGetCompanyByIDWithLocalization:
     @pytest.mark.parametrize('localization, starts_with',
                              [('RU', 'Ее сздать'), ('PL', 'Podkomorzynę'), ('EN', 'Ye on properly'),
                               ('UA', 'Ой у лузі')])
+    @pytest.mark.prefetch('api_client_companies',
+                          lambda localization: {'path': "/1", 'headers': {'Accept-Language': localization}})
     @allure.title("Запрос  на /api/companies/1 с указанием валидной локализации ({localization})")
     @allure.severity(Severity.NORMAL)
     def test_company_with_valid_localization(self, localization: str, starts_with: str,
-                                             api_client_companies: APIClient):
+                                             prefetched_response: requests.Response):
         """Проверяет результат запроса для компании с ID=1 с указанием ВАЛИДНОЙ локализации в хедере"""
-        response = api_client_companies.get(path="/1", headers={'Accept-Language': f'{localization}'})
+        response = prefetched_response
         tester = BaseStatusHeadersSchemaTests(response, json_schemas.COMPANY_BY_ID, 200)
-        tester.test_status_headers_schema()
+        body = tester.test_status_headers_schema()
 
-        body = response.json()
-        check.equal(body["company_id"], 1,
-                    f"ID компании в ответе ({body['company_id']}) не соответствует ID компании в запросе (1)")
+        check.equal(body.company_id, 1,
+                    f"ID компании в ответе ({body.company_id}) не соответствует ID компании в запросе (1)")
 
-        description = body['description']
+        description = body.description
         check.is_true(description.startswith(starts_with),
                       f"Локализация в ответе не соответствует запросу ({localization})")
 
@@ -114,13 +117,12 @@ class TestGetCompanyByIDWithLocalization:
         """
         response = api_client_companies.get(path="/1", headers={'Accept-Language': 'XXX'})
         tester = BaseStatusHeadersSchemaTests(response, json_schemas.COMPANY_BY_ID, 200)
-        tester.test_status_headers_schema()
+        body = tester.test_status_headers_schema()
 
-        body = response.json()
-        check.equal(body["company_id"], 1,
-                    f"ID компании в ответе ({body['company_id']}) не соответствует ID компании в запросе (1)")
+        check.equal(body.company_id, 1,
+                    f"ID компании в ответе ({body.company_id}) не соответствует ID компании в запросе (1)")
 
-        descriptions = body['description_lang']
+        descriptions = body.description_lang
         check.equal(len(descriptions), 4,
                     f"В ответе не все варианты локализации: {len(descriptions)} вместо 4")
 # endregion Специфика эндпойнта
@@ -11,8 +11,9 @@ from pytest_check import check
 
 # Элементы проекта
 from Data import json_schemas
+from Data.constants import BASE_URL_COMPANIES
 from Helpers.api_client import APIClient
-from Helpers.helpers import Helpers
+from Helpers.data_loader import DataLoader
 from base_tests import BaseStatusHeadersSchemaTests
 
 
@@ -35,8 +36,7 @@ class TestCompaniesWithoutParams:
     def test_companies_default_limit(
             self, response_get_base_companies):
         """Проверяет лимит по умолчанию (равен 3)"""
-        body = response_get_base_companies.json()
-        body_length = len(body['data'])
+        body_length = len(response_get_base_companies.data)
         assert body_length == 3, f"Тело ответа содержит {body_length} объектов вместо 3"
 
 
@@ -66,8 +66,7 @@ class TestCompaniesRedirectFromHTTP:
             self, response_companies_with_http: Union[requests.Response]):
         """Проверяет значения хедеров Connection и Location при запросе через http"""
         check.is_in(response_companies_with_http.headers['Location'],
-                    ('https://send-request.me/api/companies',
-                     'https://send-request.me/api/companies/'),
+                    (BASE_URL_COMPANIES, f'{BASE_URL_COMPANIES}/'),
                     f"Перенаправление на неверный адрес: {response_companies_with_http.headers['Location']}")
         check.equal(response_companies_with_http.headers['Connection'], 'keep-alive',
                     "Значение хедера Connection не keep-alive")
@@ -84,16 +83,16 @@ class TestCompaniesWithLimit:
     """
 
     @pytest.mark.parametrize('limit', [randint(0, 6), 7, randint(8, 100)])
+    @pytest.mark.prefetch('api_client_companies', lambda limit: {'params': {'limit': limit}})
     @allure.title("Валидный лимит ({limit}) при запросе на /api/companies")
     @allure.severity(Severity.NORMAL)
-    def test_companies_with_valid_limit(self, limit: int, api_client_companies: APIClient):
+    def test_companies_with_valid_limit(self, limit: int, prefetched_response: requests.Response):
         """Проверяет результат запроса с ВАЛИДНЫМ значением параметра 'Лимит'"""
-        response = api_client_companies.get(params={'limit': limit})
+        response = prefetched_response
         tester = BaseStatusHeadersSchemaTests(response, json_schemas.COMPANIES_MAIN, 200)
-        tester.test_status_headers_schema()
+        body = tester.test_status_headers_schema()
 
-        body = response.json()
-        body_length = len(body['data'])
+        body_length = len(body.data)
         if limit <= 7:
             assert body_length == limit, f"В теле ответа {body_length} объекта(-ов) вместо {limit}"
         else:
@@ -102,12 +101,13 @@ class TestCompaniesWithLimit:
     # Вероятный БАГ: при параметре -1 возвращается 200 вместо 422. В документации не описано
     @pytest.mark.negative
     @pytest.mark.parametrize('invalid_limit', ['ABC', -1])
+    @pytest.mark.prefetch('api_client_companies', lambda invalid_limit: {'params': {'limit': invalid_limit}})
     @allure.title("Невалидный лимит ({invalid_limit}) при запросе на /api/companies")
     @allure.severity(Severity.MINOR)
-    def test_companies_with_invalid_limit(self, invalid_limit: Union[str, int], api_client_companies: APIClient):
+    def test_companies_with_invalid_limit(self, invalid_limit: Union[str, int],
+                                          prefetched_response: requests.Response):
         """Проверяет результат запроса с НЕВАЛИДНЫМ значением параметра 'Лимит'"""
-        response = api_client_companies.get(params={'limit': invalid_limit})
-        tester = BaseStatusHeadersSchemaTests(response, json_schemas.UNPROCESSABLE_ENTITY_422, 422)
+        tester = BaseStatusHeadersSchemaTests(prefetched_response, json_schemas.UNPROCESSABLE_ENTITY_422, 422)
         tester.test_status_headers_schema()
 
 
@@ -130,10 +130,9 @@ class TestCompaniesWithOffset:
         offset = randint(0, 6)
         response = api_client_companies.get(params={'offset': offset})
         tester = BaseStatusHeadersSchemaTests(response, json_schemas.COMPANIES_MAIN, 200)
-        tester.test_status_headers_schema()
+        body = tester.test_status_headers_schema()
 
-        body = response.json()
-        first_id = body['data'][0]['company_id']
+        first_id = body.data[0].company_id
         assert first_id == offset + 1, f"В теле ответа список сдвинут на {first_id - 1} единиц вместо {offset}"
 
     @allure.title("Валидный оффсет, превышающий число объектов в базе, при запросе на /api/companies")
@@ -146,21 +145,21 @@ class TestCompaniesWithOffset:
         offset = randint(7, 30)
         response = api_client_companies.get(params={'offset': offset})
         tester = BaseStatusHeadersSchemaTests(response, json_schemas.COMPANIES_MAIN, 200)
-        tester.test_status_headers_schema()
+        body = tester.test_status_headers_schema()
 
-        body = response.json()
-        body_length = len(body['data'])
+        body_length = len(body.data)
         assert body_length == 0, f"Сдвиг списка на {offset} единиц не применен"
 
     # Вероятный БАГ: при параметре -1 возвращается 200 вместо 422. В документации не описано
     @pytest.mark.negative
     @pytest.mark.parametrize('invalid_offset', ['ABC', -1])
+    @pytest.mark.prefetch('api_client_companies', lambda invalid_offset: {'params': {'offset': invalid_offset}})
     @allure.title("Невалидный оффсет ({invalid_offset}) при запросе на /api/companies")
     @allure.severity(Severity.MINOR)
-    def test_companies_with_invalid_offset(self, invalid_offset: Union[str, int], api_client_companies: APIClient):
+    def test_companies_with_invalid_offset(self, invalid_offset: Union[str, int],
+                                           prefetched_response: requests.Response):
         """Проверяет результат запроса с НЕВАЛИДНЫМ параметром 'Оффсет'"""
-        response = api_client_companies.get(params={'offset': invalid_offset})
-        tester = BaseStatusHeadersSchemaTests(response, json_schemas.UNPROCESSABLE_ENTITY_422, 422)
+        tester = BaseStatusHeadersSchemaTests(prefetched_response, json_schemas.UNPROCESSABLE_ENTITY_422, 422)
         tester.test_status_headers_schema()
 
 
@@ -179,11 +178,10 @@ class TestCompaniesWithLimitAndOffset:
         offset = randint(0, 6)
         response = api_client_companies.get(params={'limit': limit, 'offset': offset})
         tester = BaseStatusHeadersSchemaTests(response, json_schemas.COMPANIES_MAIN, 200)
-        tester.test_status_headers_schema()
+        body = tester.test_status_headers_schema()
 
-        body = response.json()
-        body_length = len(body['data'])
-        first_id = body['data'][0]['company_id']
+        body_length = len(body.data)
+        first_id = body.data[0].company_id
         amount_to_be = min(7 - offset, limit)
         assert body_length == amount_to_be and first_id == offset + 1, \
             f"В теле ответа должно быть {amount_to_be} объектов, сейчас {body_length} объекта(-ов). " \
@@ -201,23 +199,20 @@ class TestCompaniesWithStatus:
     # Чтение из файла реализовано исключительно для практики, в данном случае необходимости в нем нет
     @pytest.mark.smoke
     @pytest.mark.parametrize('status, expected',
-                             Helpers.get_test_data_from_csv('company_statuses.csv'))
+                             DataLoader.default().load('company_statuses.csv').rows())
     @allure.title("Запрос на /api/companies с фильтром по валидному статусу ({status})")
     @allure.severity(Severity.CRITICAL)
-    def test_companies_filtered_by_valid_status(self, status: str, expected: str,
-                                                api_client_companies: APIClient, companies_grouped_by_statuses: dict):
+    def test_companies_filtered_by_valid_status(self, status: str, expected: str, api_client_companies: APIClient,
+                                                companies_grouped_by_statuses: dict):
         """
-        Проверяет соответствие ответа запросу с ВАЛИДНЫМ параметром 'Статус компании' и лимитом,
-        равным общему числу компаний в базе: статус всех компаний в ответе и их количество.
-        Проверяет базовые параметры ответа: статус-код, хедеры, соответствие json-схеме
+        Проверяет соответствие ответа запросу с ВАЛИДНЫМ параметром 'Статус компании': статус всех компаний
+        на всех страницах ответа и их общее количество.
+        Проверяет базовые параметры ответа каждой страницы: статус-код, хедеры, соответствие json-схеме
         """
-        # Известно, что в базе всего 7 компаний
-        response = api_client_companies.get(params={'status': status, 'limit': 7})
-        tester = BaseStatusHeadersSchemaTests(response, json_schemas.COMPANIES_MAIN, 200)
-        tester.test_status_headers_schema()
+        def test_page(response: requests.Response):
+            BaseStatusHeadersSchemaTests(response, json_schemas.COMPANIES_MAIN, 200).test_status_headers_schema()
 
-        body = response.json()
-        data = body['data']
+        data = list(api_client_companies.paginate(params={'status': status}, on_response=test_page))
         check.is_true(all([item['company_status'] == expected for item in data]),
                       f"Current: {[item['company_status'] for item in data]}, {expected}")
         check.equal(len(data), len(companies_grouped_by_statuses[status]),
@@ -227,12 +222,12 @@ class TestCompaniesWithStatus:
     @pytest.mark.negative
     @pytest.mark.regression
     @pytest.mark.parametrize('invalid_status', ['ABC', 123])
+    @pytest.mark.prefetch('api_client_companies', lambda invalid_status: {'params': {'status': invalid_status}})
     @allure.title("Запрос на /api/companies с фильтром по невалидному статусу ({invalid_status})")
     @allure.severity(Severity.MINOR)
     def test_companies_filtered_by_invalid_status(self, invalid_status: Union[str, int],
-                                                  api_client_companies: APIClient):
+                                                  prefetched_response: requests.Response):
         """Проверяет ответ на запрос с НЕВАЛИДНЫМ параметром 'Статус компании'"""
-        response = api_client_companies.get(params={'status': invalid_status})
-        tester = BaseStatusHeadersSchemaTests(response, json_schemas.UNPROCESSABLE_ENTITY_422, 422)
+        tester = BaseStatusHeadersSchemaTests(prefetched_response, json_schemas.UNPROCESSABLE_ENTITY_422, 422)
         tester.test_status_headers_schema()
 # endregion Специфика эндпойнта
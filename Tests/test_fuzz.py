@@ -0,0 +1,38 @@
+"""API-тесты эндпойнтов /api/companies и /api/users граничными и невалидными запросами, сгенерированными по схемам"""
+
+import json
+
+import allure
+import pytest
+import requests
+from allure_commons.types import Severity
+
+# Элементы проекта
+from Data.constants import FUZZ_ENABLED
+from Helpers.fuzz import ENDPOINTS, FuzzEngine
+
+
+@pytest.mark.fuzz
+@pytest.mark.negative
+@pytest.mark.skipif(not FUZZ_ENABLED, reason="фаззинг выполняется только при API_FUZZ=1")
+@allure.parent_suite("Фаззинг")
+@allure.suite("Запросы, сгенерированные по JSON-схемам")
+class TestFuzz:
+    """
+    Проверяет ответы на тысячи сгенерированных запросов к каждому эндпойнту (Helpers/fuzz.py):
+    статус не 5xx и документирован, невалидный запрос отклонен с 422, валидный - выполнен,
+    тело ответа соответствует схеме своего статуса. Случаи известных багов API попадают в отчет, но тест не роняют
+    """
+
+    @pytest.mark.parametrize('endpoint', list(ENDPOINTS))
+    @allure.title("Сгенерированные граничные и невалидные запросы ({endpoint})")
+    @allure.severity(Severity.NORMAL)
+    def test_fuzz_endpoint(self, endpoint: str, http_session: requests.Session, fixture_cache):
+        """Выполняет сгенерированные запросы к эндпойнту; упавшие случаи приводятся минимальными примерами"""
+        engine = FuzzEngine(session=http_session, on_change=lambda: fixture_cache.invalidate('users'))
+        report = engine.run(ENDPOINTS[endpoint])
+        allure.attach(json.dumps(report.to_dict(), indent=2, ensure_ascii=False), name="Отчет фаззинга",
+                      attachment_type=allure.attachment_type.JSON)
+
+        assert not report.not_deleted, f"Не удалены созданные пользователи: {report.not_deleted}"
+        assert not report.failures, report.summary()
@@ -0,0 +1,120 @@
+"""Тесты транспорта HTTP/2 (Helpers/http2_transport.py) и его отката на HTTP/1.1"""
+
+import threading
+
+import allure
+import pytest
+import requests
+from allure_commons.types import Severity
+
+# Элементы проекта
+from Data.constants import BASE_URL
+from Helpers import http2_transport
+from Helpers.api_client import APIClient, CountingHTTPAdapter
+from Helpers.http2_transport import HTTP2Adapter, httpx
+
+URL = 'https://api.test/api/companies'
+BODY = b'{"data": [' + b','.join([b'{"company_id": 1}'] * 100) + b'], "meta": {"total": 100}}'
+
+requires_httpx = pytest.mark.skipif(not HTTP2Adapter.available(), reason="не установлены httpx и h2")
+
+
+def mock_session(handler) -> requests.Session:
+    """Сессия, в которой запросы на https:// обрабатывает HTTP2Adapter с httpx.MockTransport(handler)"""
+    session = requests.Session()
+    session.mount('https://', HTTP2Adapter(max_connections=1, transport=httpx.MockTransport(handler)))
+    return session
+
+
+@allure.parent_suite("Транспорт")
+@allure.suite("HTTP/2")
+@allure.severity(Severity.NORMAL)
+class TestHTTP2Transport:
+    """Проверяет адаптер HTTP/2 (через httpx.MockTransport, без сети) и откат на HTTP/1.1"""
+
+    @allure.title("Откат на HTTP/1.1 без httpx: соединения учитываются адаптером HTTP/1.1")
+    def test_http2_fallback_connection_stats(self, monkeypatch):
+        """Без httpx адаптер HTTP/2 не монтируется, а запросы учитываются в connection_stats сессии"""
+        monkeypatch.setattr(http2_transport, 'httpx', None)
+        session = APIClient.create_session(http2=True)
+        try:
+            assert isinstance(session.get_adapter('https://'), CountingHTTPAdapter), \
+                "Без httpx запросы на https:// должны идти через HTTP/1.1"
+            client = APIClient(BASE_URL, session=session)
+            for _ in range(2):
+                client.get(path='/api/companies')
+            stats = APIClient.connection_stats(session)
+            assert stats['new'] + stats['reused'] == 2, f"Учтены не все запросы: {stats}"
+        finally:
+            session.close()
+
+    @requires_httpx
+    @allure.title("Потоковое чтение тела через HTTP2Adapter")
+    def test_http2_adapter_streaming(self):
+        """iter_content и raw.read(amt) возвращают тело целиком и кусками заданного размера"""
+        session = mock_session(lambda request: httpx.Response(200, content=iter([BODY[:10], BODY[10:]])))
+        with session:
+            response = session.get(URL, stream=True)
+            chunks = list(response.iter_content(64))
+            assert b''.join(chunks) == BODY, "Тело ответа прочитано не полностью"
+            assert all(len(chunk) == 64 for chunk in chunks[:-1]), f"Размеры кусков: {[len(c) for c in chunks]}"
+            response = session.get(URL, stream=True)
+            assert response.raw.read(5) == BODY[:5] and response.raw.read() == BODY[5:], \
+                "raw.read(amt) должен читать не больше amt байт"
+            stats = APIClient.connection_stats(session)
+            assert stats['new'] + stats['reused'] == 2, f"Учтены не все запросы: {stats}"
+
+    @requires_httpx
+    @pytest.mark.parametrize('error, expected', [
+        (lambda request: httpx.ConnectTimeout("timeout", request=request), requests.exceptions.ConnectTimeout),
+        (lambda request: httpx.ReadTimeout("timeout", request=request), requests.exceptions.ReadTimeout),
+        (lambda request: httpx.ConnectError("refused", request=request), requests.exceptions.ConnectionError),
+    ], ids=['connect timeout', 'read timeout', 'connect error'])
+    @allure.title("Ошибки httpx при отправке запроса преобразуются в исключения requests")
+    def test_http2_adapter_send_errors(self, error, expected):
+        """RetryPolicy и тесты рассчитаны на исключения requests, а не httpx"""
+        def handler(request):
+            raise error(request)
+
+        with mock_session(handler) as session, pytest.raises(expected):
+            session.get(URL)
+
+    @requires_httpx
+    @allure.title("Ошибки httpx при потоковом чтении тела преобразуются в исключения requests")
+    def test_http2_adapter_stream_errors(self):
+        """Обрыв соединения при чтении тела дает ChunkedEncodingError, как у requests поверх urllib3"""
+        def body():
+            yield BODY[:10]
+            raise httpx.ReadError("connection reset")
+
+        with mock_session(lambda request: httpx.Response(200, content=body())) as session:
+            response = session.get(URL, stream=True)
+            with pytest.raises(requests.exceptions.ChunkedEncodingError):
+                list(response.iter_content(4))
+
+    @requires_httpx
+    @allure.title("Одновременные первые запросы используют один клиент httpx")
+    def test_http2_adapter_concurrent_first_use(self):
+        """Потоки AsyncAPIClient не должны создавать лишние (незакрываемые) клиенты httpx"""
+        threads_count = 8
+        barrier = threading.Barrier(threads_count)
+        session = mock_session(lambda request: httpx.Response(200, content=BODY))
+        adapter = session.get_adapter(URL)
+        errors = []
+
+        def send():
+            barrier.wait()
+            try:
+                session.get(URL)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=send) for _ in range(threads_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        clients = len(adapter._clients)
+        session.close()
+        assert not errors, f"Ошибки запросов: {errors}"
+        assert clients == 1, f"Создано клиентов httpx: {clients}"
@@ -1,6 +1,5 @@
 """API-тесты для эндпойнта /api/users. Work in progress"""
 
-import json
 from random import randint, choice
 from typing import Union, Any
 
@@ -8,13 +7,15 @@ import allure
 import pytest
 import requests
 from allure_commons.types import Severity
-from faker import Faker
 from pytest_check import check
 
 # Элементы проекта
 from Data import json_schemas
-from Data.constants import FAKER_LOCALES
+from Data.constants import BASE_URL_USERS, FAKER_LOCALES
 from Helpers.api_client import APIClient
+from Helpers.api_response import APIResponse
+from Helpers.payload_corpus import PayloadCorpus
+from Helpers.user_factory import UserFactory
 from base_tests import BaseStatusHeadersSchemaTests
 
 
@@ -35,8 +36,7 @@ class TestUsersWithoutParams:
     @allure.severity(Severity.NORMAL)
     def test_users_default_limit(self, response_get_base_users: Union[requests.Response]):
         """Проверяет лимит по умолчанию (равен 3)"""
-        body = response_get_base_users.json()
-        body_length = len(body['data'])
+        body_length = len(response_get_base_users.data)
         assert body_length == 3, f"Тело ответа содержит {body_length} объектов вместо 3"
 
 
@@ -63,8 +63,7 @@ class TestUsersRedirectFromHTTP:
     def test_users_response_headers_with_http(self, response_users_with_http: Union[requests.Response]):
         """Проверяет значения хедеров Connection и Location при запросе через http"""
         check.is_in(response_users_with_http.headers['Location'],
-                    ('https://send-request.me/api/users',
-                     'https://send-request.me/api/users/'),
+                    (BASE_URL_USERS, f'{BASE_URL_USERS}/'),
                     f"Перенаправление на неверный адрес: {response_users_with_http.headers['Location']}")
         check.equal(response_users_with_http.headers['Connection'], 'keep-alive',
                     "Значение хедера Connection не keep-alive")
@@ -78,28 +77,28 @@ class TestUsersWithLimit:
 
     @pytest.mark.parametrize('limit',
                              [0, randint(1, 100)])
+    @pytest.mark.prefetch('api_client_users', lambda limit: {'params': {'limit': limit}})
     @allure.title("Валидный лимит ({limit}) при запросе на /api/users")
     @allure.severity(Severity.NORMAL)
-    def test_users_with_valid_limit(self, limit: int, api_client_users: APIClient):
+    def test_users_with_valid_limit(self, limit: int, prefetched_response: requests.Response):
         """Проверяет результат запроса с ВАЛИДНЫМ значением параметра 'Лимит'"""
-        response = api_client_users.get(params={'limit': limit})
+        response = prefetched_response
         tester = BaseStatusHeadersSchemaTests(response, json_schemas.USERS_MAIN, 200)
-        tester.test_status_headers_schema()
+        body = tester.test_status_headers_schema()
 
-        body = response.json()
-        body_length = len(body['data'])
+        body_length = len(body.data)
         assert body_length == limit, f"В теле ответа {body_length} объекта(-ов) вместо {limit}"
 
     # Вероятный БАГ: при явно невалидном параметре -1 возвращается 200 вместо 422. В документации не описано
     @pytest.mark.negative
     @pytest.mark.parametrize('invalid_limit',
                              ['ABC', -1])
+    @pytest.mark.prefetch('api_client_users', lambda invalid_limit: {'params': {'limit': invalid_limit}})
     @allure.title("Невалидный лимит ({invalid_limit}) при запросе на /api/users")
     @allure.severity(Severity.MINOR)
-    def test_users_with_invalid_limit(self, invalid_limit: Union[str, int], api_client_users: APIClient):
+    def test_users_with_invalid_limit(self, invalid_limit: Union[str, int], prefetched_response: requests.Response):
         """Проверяет результат запроса с НЕВАЛИДНЫМ значением параметра 'Лимит'"""
-        response = api_client_users.get(params={'limit': invalid_limit})
-        tester = BaseStatusHeadersSchemaTests(response, json_schemas.UNPROCESSABLE_ENTITY_422, 422)
+        tester = BaseStatusHeadersSchemaTests(prefetched_response, json_schemas.UNPROCESSABLE_ENTITY_422, 422)
         tester.test_status_headers_schema()
 
 
@@ -122,10 +121,9 @@ class TestUsersWithOffset:
         offset = randint(0, 50)
         response = api_client_users.get(params={'offset': offset})
         tester = BaseStatusHeadersSchemaTests(response, json_schemas.USERS_MAIN, 200)
-        tester.test_status_headers_schema()
+        body = tester.test_status_headers_schema()
 
-        body = response.json()
-        first_id = body['data'][0]['user_id']
+        first_id = body.data[0].user_id
         # Поскольку пользователей можно удалять, проверить точный оффсет по первому ID нельзя, однако
         #  благодаря тому, что список в теле ответа сохраняет сортировку, следует проверить, что первый ID
         #  в ответе не меньше оффсета в запросе
@@ -142,22 +140,22 @@ class TestUsersWithOffset:
         offset = randint(100000, 100100)
         response = api_client_users.get(params={'offset': offset})
         tester = BaseStatusHeadersSchemaTests(response, json_schemas.USERS_MAIN, 200)
-        tester.test_status_headers_schema()
+        body = tester.test_status_headers_schema()
 
-        body = response.json()
-        body_length = len(body['data'])
+        body_length = len(body.data)
         assert body_length == 0, f"Сдвиг списка на {offset} единиц не применен"
 
     # Вероятный БАГ: при параметре -1 возвращается 200 вместо 422. В документации не описано
     @pytest.mark.negative
     @pytest.mark.parametrize('invalid_offset',
                              ['ABC', -1])
+    @pytest.mark.prefetch('api_client_users', lambda invalid_offset: {'params': {'offset': invalid_offset}})
     @allure.title("Невалидный оффсет ({invalid_offset}) при запросе на /api/users")
     @allure.severity(Severity.MINOR)
-    def test_users_with_invalid_offset(self, invalid_offset: Union[str, int], api_client_users: APIClient):
+    def test_users_with_invalid_offset(self, invalid_offset: Union[str, int],
+                                       prefetched_response: requests.Response):
         """Проверяет результат запроса с НЕВАЛИДНЫМ параметром 'Оффсет'"""
-        response = api_client_users.get(params={'offset': invalid_offset})
-        tester = BaseStatusHeadersSchemaTests(response, json_schemas.UNPROCESSABLE_ENTITY_422, 422)
+        tester = BaseStatusHeadersSchemaTests(prefetched_response, json_schemas.UNPROCESSABLE_ENTITY_422, 422)
         tester.test_status_headers_schema()
 
 
@@ -176,11 +174,10 @@ class TestUsersWithLimitAndOffset:
         offset = randint(0, 100)
         response = api_client_users.get(params={'limit': limit, 'offset': offset})
         tester = BaseStatusHeadersSchemaTests(response, json_schemas.USERS_MAIN, 200)
-        tester.test_status_headers_schema()
+        body = tester.test_status_headers_schema()
 
-        body = response.json()
-        body_length = len(body['data'])
-        first_id = body['data'][0]['user_id']
+        body_length = len(body.data)
+        first_id = body.data[0].user_id
         # Поскольку пользователей можно удалять, проверить точный оффсет по первому ID нельзя, однако
         #  благодаря тому, что список в теле ответа сохраняет сортировку, следует проверить, что первый ID
         #  в ответе не меньше оффсета в запросе
@@ -196,14 +193,35 @@ class TestUsersWithLimitAndOffset:
 @allure.suite("POST-запрос для создания пользователя")
 @allure.severity(Severity.CRITICAL)
 class TestCreateUser:
-    """Создает пользователя"""
-
-    fake = Faker(FAKER_LOCALES)
+    """
+    Создает пользователя. Валидные имена берутся из заранее сгенерированного корпуса тел запросов
+    (Helpers/payload_corpus.py): вариант выбирается по nodeid теста или параметрам, поэтому тела запросов
+    воспроизводимы и одинаковы во всех воркерах
+    """
 
     @staticmethod
     def _create_body_object(**kwargs):
         """Формирует тело для POST-запроса"""
-        return json.dumps(kwargs)
+        return APIResponse.dumps(kwargs)
+
+    @staticmethod
+    def _create_post_kwargs(**kwargs) -> dict:
+        """Формирует аргументы POST-запроса на создание пользователя (для предзагрузки ответов)"""
+        return {'data': TestCreateUser._create_body_object(**kwargs), 'headers': {"Content-Type": "application/json"}}
+
+    @staticmethod
+    def _create_corpus_post_kwargs(kind: str, key, **fields) -> dict:
+        """Формирует аргументы POST-запроса с телом вида kind из корпуса (для предзагрузки ответов)"""
+        corpus = PayloadCorpus.default()
+        return {'data': corpus.with_fields(corpus.payload(kind, key), **fields),
+                'headers': {"Content-Type": "application/json"}}
+
+    @staticmethod
+    def _with_required_field(body_dict: dict) -> dict:
+        """Заполняет обязательное поле last_name, если в теле его нет"""
+        if 'last_name' not in body_dict:
+            body_dict['last_name'] = PayloadCorpus.default().body('required', repr(body_dict))['last_name']
+        return body_dict
 
     @pytest.mark.smoke
     @pytest.mark.parametrize('locale',
@@ -211,74 +229,68 @@ class TestCreateUser:
                              ids=['Ru name', 'Eng name'])
     @allure.title("Пользователь в существующей активной компании со всеми валидно заполненными полями создан")
     def test_create_user_with_full_valid_data(self, locale: str, api_client_users: APIClient,
-                                              companies_grouped_by_statuses: dict):
+                                              companies_grouped_by_statuses: dict, user_factory: UserFactory,
+                                              user_payload):
         """Создает пользователя со всеми валидно заполненными полями и указанием существующей активной компании"""
         company_id = choice(companies_grouped_by_statuses['ACTIVE'])
-        first_name = TestCreateUser.fake[locale].first_name()
-        last_name = TestCreateUser.fake[locale].last_name()
-        request_body = self._create_body_object(first_name=first_name, last_name=last_name, company_id=company_id)
+        request_body = user_payload(f'full:{locale}', company_id=company_id)
+        request_fields = APIResponse.loads(request_body)
+        first_name, last_name = request_fields['first_name'], request_fields['last_name']
 
         # Проверяем ответ на запрос на создание пользователя
-        response = api_client_users.post(data=request_body, headers={"Content-Type": "application/json"})
+        # Созданный пользователь удаляется пулом по окончании сессии, даже если проверки ниже упадут
+        response = user_factory.track(
+            api_client_users.post(data=request_body, headers={"Content-Type": "application/json"}))
         tester = BaseStatusHeadersSchemaTests(response, json_schemas.USER_CREATED, 201)
-        tester.test_status_headers_schema()
-        response_create_user_body = response.json()
-        assert (response_create_user_body["first_name"] == first_name and
-                response_create_user_body["last_name"] == last_name and
-                response_create_user_body["company_id"] == company_id), \
+        response_create_user_body = tester.test_status_headers_schema()
+        assert (response_create_user_body.first_name == first_name and
+                response_create_user_body.last_name == last_name and
+                response_create_user_body.company_id == company_id), \
             f"Тело ответа не соответствует запросу. Получен ответ {response_create_user_body}"
 
         # Проверяем ответ на запрос на получение созданного пользователя
-        user_id = response_create_user_body["user_id"]
+        user_id = response_create_user_body.user_id
         response = api_client_users.get(path=f"/{user_id}")
         tester = BaseStatusHeadersSchemaTests(response, json_schemas.USER_BY_ID, 200)
-        tester.test_status_headers_schema()
-        response_get_user_body = response.json()
-        assert (response_get_user_body["first_name"] == first_name and
-                response_get_user_body["last_name"] == last_name and
-                response_get_user_body["company_id"] == company_id and
-                response_get_user_body["user_id"] == user_id), \
+        response_get_user_body = tester.test_status_headers_schema()
+        assert (response_get_user_body.first_name == first_name and
+                response_get_user_body.last_name == last_name and
+                response_get_user_body.company_id == company_id and
+                response_get_user_body.user_id == user_id), \
             f"Ответ на запрос по ID созданного пользователя {user_id} не соответствует данным, указанным при " \
             f"создании пользователя. Получен ответ {response_get_user_body}. " \
-            f"Должно быть: {dict(**response_create_user_body, **{'user_id': user_id})}"
-
-        # Удаление пользователя. Фикстуру finalizer не использую, потому что нужно передавать id пользователя.
-        # Создавать пользователя (и получать id) прямо в фикстуре не вариант, потому что в данном случае это суть теста.
-        api_client_users.delete(path=f"/{user_id}")
+            f"Должно быть: {response_create_user_body.to_dict()}"
 
     @pytest.mark.smoke
     @pytest.mark.parametrize('locale',
                              FAKER_LOCALES,
                              ids=['Ru name', 'Eng name'])
     @allure.title("Пользователь с валидно заполненным только обязательным полем создан")
-    def test_create_user_with_only_required_valid_data(self, locale: str, api_client_users: APIClient):
+    def test_create_user_with_only_required_valid_data(self, locale: str, api_client_users: APIClient,
+                                                       user_factory: UserFactory, user_payload):
         """Создает пользователя с валидно заполненным обязательным полем last_name"""
-        last_name = TestCreateUser.fake[locale].last_name()
-        request_body = self._create_body_object(last_name=last_name)
+        request_body = user_payload(f'required:{locale}')
+        last_name = APIResponse.loads(request_body)['last_name']
 
         # Проверяем ответ на запрос на создание пользователя
-        response = api_client_users.post(data=request_body, headers={"Content-Type": "application/json"})
+        # Созданный пользователь удаляется пулом по окончании сессии, даже если проверки ниже упадут
+        response = user_factory.track(
+            api_client_users.post(data=request_body, headers={"Content-Type": "application/json"}))
         tester = BaseStatusHeadersSchemaTests(response, json_schemas.USER_CREATED, 201)
-        tester.test_status_headers_schema()
-        response_create_user_body = response.json()
-        assert response_create_user_body["last_name"] == last_name, \
-            f"Тело ответа не соответствует запросу. Получен ответ {response.json()}"
+        response_create_user_body = tester.test_status_headers_schema()
+        assert response_create_user_body.last_name == last_name, \
+            f"Тело ответа не соответствует запросу. Получен ответ {response_create_user_body}"
 
         # Проверяем ответ на запрос на получение созданного пользователя
-        user_id = response_create_user_body["user_id"]
+        user_id = response_create_user_body.user_id
         response = api_client_users.get(path=f"/{user_id}")
         tester = BaseStatusHeadersSchemaTests(response, json_schemas.USER_BY_ID, 200)
-        tester.test_status_headers_schema()
-        response_get_user_body = response.json()
-        assert (response_get_user_body["last_name"] == last_name and
-                response_get_user_body["user_id"] == user_id), \
+        response_get_user_body = tester.test_status_headers_schema()
+        assert (response_get_user_body.last_name == last_name and
+                response_get_user_body.user_id == user_id), \
             f"Ответ на запрос по ID созданного пользователя {user_id} не соответствует данным, указанным при " \
             f"создании пользователя. Получен ответ {response_get_user_body}. " \
-            f"Должно быть: {dict(**response_create_user_body, **{'user_id': user_id})}"
-
-        # Удаление пользователя. Фикстуру finalizer не использую, потому что нужно передавать id пользователя.
-        # Создавать пользователя (и получать id) прямо в фикстуре не вариант, потому что в данном случае это суть теста.
-        api_client_users.delete(path=f"/{user_id}")
+            f"Должно быть: {response_create_user_body.to_dict()}"
 
     @pytest.mark.smoke
     @allure.title("Пользователь с пустым телом запроса, в т.ч. без обязательного поля, не создан")
@@ -292,10 +304,11 @@ class TestCreateUser:
 
     @pytest.mark.smoke
     @allure.title("Пользователь с непустым телом запроса, но без обязательного поля не создан")
-    def test_create_user_without_required_data(self, api_client_users: APIClient, companies_grouped_by_statuses: dict):
+    def test_create_user_without_required_data(self, api_client_users: APIClient, companies_grouped_by_statuses: dict,
+                                               user_payload):
         """Создает пользователя с непустым телом запроса, но без обязательного поля"""
         company_id = choice(companies_grouped_by_statuses['ACTIVE'])
-        request_body = self._create_body_object(first_name=TestCreateUser.fake.first_name(), company_id=company_id)
+        request_body = user_payload('without_required', company_id=company_id)
         response = api_client_users.post(data=request_body, headers={"Content-Type": "application/json"})
 
         tester = BaseStatusHeadersSchemaTests(response, json_schemas.UNPROCESSABLE_ENTITY_422, 422)
@@ -308,10 +321,12 @@ class TestCreateUser:
                              [None, '', ' '],
                              ids=['None', 'Empty string', 'String with space'])
     @allure.title("Пользователь с пустым значением в обязательном поле не создан")
-    def test_create_user_with_empty_required_data(self, last_name: Union[None, str], api_client_users: APIClient):
+    def test_create_user_with_empty_required_data(self, last_name: Union[None, str], api_client_users: APIClient,
+                                                  user_factory: UserFactory):
         """Создает пользователя с пустым значением в обязательном поле last_name"""
         request_body = self._create_body_object(last_name=last_name)
-        response = api_client_users.post(data=request_body, headers={"Content-Type": "application/json"})
+        response = user_factory.track(
+            api_client_users.post(data=request_body, headers={"Content-Type": "application/json"}))
 
         tester = BaseStatusHeadersSchemaTests(response, json_schemas.UNPROCESSABLE_ENTITY_422, 422)
         tester.test_status_headers_schema()
@@ -321,12 +336,10 @@ class TestCreateUser:
                              ['CLOSED', 'BANKRUPT'])
     @allure.title("Пользователь со всеми валидно заполненными полями в закрытой компании не создан")
     def test_create_user_with_closed_company_id(
-            self, status: str, api_client_users: APIClient, companies_grouped_by_statuses: dict):
+            self, status: str, api_client_users: APIClient, companies_grouped_by_statuses: dict, user_payload):
         """Создает пользователя со всеми валидно заполненными полями в закрытой компании"""
         company_id = choice(companies_grouped_by_statuses[status])
-        first_name, last_name, company_id = (
-            TestCreateUser.fake.first_name(), TestCreateUser.fake.last_name(), company_id)
-        request_body = self._create_body_object(first_name=first_name, last_name=last_name, company_id=company_id)
+        request_body = user_payload('full', company_id=company_id)
         response = api_client_users.post(data=request_body, headers={"Content-Type": "application/json"})
 
         tester = BaseStatusHeadersSchemaTests(response, json_schemas.BAD_REQUEST_400, 400)
@@ -334,12 +347,10 @@ class TestCreateUser:
 
     @pytest.mark.smoke
     @allure.title("Пользователь со всеми валидно заполненными полями в компании с несуществующим ID не создан")
-    def test_create_user_with_nonexistent_company_id(self, api_client_users: APIClient):
+    def test_create_user_with_nonexistent_company_id(self, api_client_users: APIClient, user_payload):
         """Создает пользователя со всеми валидно заполненными полями в компании с несуществующим ID"""
         company_id = randint(8, 100)
-        first_name, last_name, company_id = (
-            TestCreateUser.fake.first_name(), TestCreateUser.fake.last_name(), company_id)
-        request_body = self._create_body_object(first_name=first_name, last_name=last_name, company_id=company_id)
+        request_body = user_payload('full', company_id=company_id)
         response = api_client_users.post(data=request_body, headers={"Content-Type": "application/json"})
 
         tester = BaseStatusHeadersSchemaTests(response, json_schemas.NOT_FOUND_404, 404)
@@ -351,16 +362,17 @@ class TestCreateUser:
     @pytest.mark.parametrize('invalid_id',
                              ['ABC', '', ' ', 1.5],
                              ids=['String', 'Empty string', 'String with space', 'Float'])
+    @pytest.mark.prefetch('api_client_users',
+                          lambda invalid_id: TestCreateUser._create_corpus_post_kwargs(
+                              'full', repr(invalid_id), company_id=invalid_id),
+                          method='post')
     @allure.severity(Severity.MINOR)
     @allure.title("Пользователь со всеми валидно заполненными полями в компании с невалидным ID не создан")
-    def test_create_user_with_invalid_company_id(self, invalid_id: Union[str, float], api_client_users: APIClient):
+    def test_create_user_with_invalid_company_id(self, invalid_id: Union[str, float],
+                                                 prefetched_response: requests.Response, user_factory: UserFactory):
         """Создает пользователя со всеми валидно заполненными полями в компании с невалидным ID"""
-        request_body = self._create_body_object(
-            first_name=TestCreateUser.fake.first_name(), last_name=TestCreateUser.fake.last_name(),
-            company_id=invalid_id)
-        response = api_client_users.post(data=request_body, headers={"Content-Type": "application/json"})
-
-        tester = BaseStatusHeadersSchemaTests(response, json_schemas.UNPROCESSABLE_ENTITY_422, 422)
+        user_factory.track(prefetched_response)
+        tester = BaseStatusHeadersSchemaTests(prefetched_response, json_schemas.UNPROCESSABLE_ENTITY_422, 422)
         tester.test_status_headers_schema()
 
     # БАГ: поля 'last_name', 'first_name' должны принимать только string, а фактически бэк преобразует
@@ -372,17 +384,18 @@ class TestCreateUser:
     @pytest.mark.parametrize('value',
                              [0, 0.5, -1, False, True, [], {1: True}, (3,)],
                              ids=['int', 'float', 'negative_int', 'bool', 'bool', 'Empty list', 'Dict', 'Tuple'])
+    @pytest.mark.prefetch('api_client_users',
+                          lambda name, value: TestCreateUser._create_post_kwargs(
+                              **TestCreateUser._with_required_field({name: value})),
+                          method='post')
     @allure.severity(Severity.MINOR)
     @allure.title("Пользователь с непустым, но нетекстовым значением в поле, принимающем string, не создан")
-    def test_create_user_with_nums_and_bool_in_string_field(self, name: str, value: Any, api_client_users: APIClient):
+    def test_create_user_with_nums_and_bool_in_string_field(self, name: str, value: Any,
+                                                            prefetched_response: requests.Response,
+                                                            user_factory: UserFactory):
         """Создает пользователя с нетекстовым, но непустым значением в поле last_name или first_name"""
-        body_dict = {name: value}
-        if name == 'first_name':
-            body_dict['last_name'] = TestCreateUser.fake.last_name()  # заполняем обязательное поле
-        request_body = self._create_body_object(**body_dict)
-        response = api_client_users.post(data=request_body, headers={"Content-Type": "application/json"})
-
-        tester = BaseStatusHeadersSchemaTests(response, json_schemas.UNPROCESSABLE_ENTITY_422, 422)
+        user_factory.track(prefetched_response)
+        tester = BaseStatusHeadersSchemaTests(prefetched_response, json_schemas.UNPROCESSABLE_ENTITY_422, 422)
         tester.test_status_headers_schema()
 
     # БАГ: в документации допустимая длина текстового поля не уточняется, однако она очевидно
@@ -393,16 +406,35 @@ class TestCreateUser:
                              ['last_name', 'first_name'])
     @allure.severity(Severity.MINOR)
     @allure.title("Пользователь с длинным текстом в текстовом поле не создан")
-    def test_create_user_with_long_text_in_string_field(self, name: str, api_client_users: APIClient):
+    def test_create_user_with_long_text_in_string_field(self, name: str, api_client_users: APIClient,
+                                                        user_factory: UserFactory, user_payload):
         """Создает пользователя с длинным (1000 слов) текстом в обязательном поле"""
-        text = TestCreateUser.fake.sentence(nb_words=1000)
-        body_dict = {name: text}
-        if name == 'first_name':
-            body_dict['last_name'] = TestCreateUser.fake.last_name()  # заполняем обязательное поле
-        request_body = self._create_body_object(**body_dict)
-        response = api_client_users.post(data=request_body, headers={"Content-Type": "application/json"})
+        # Для first_name в теле заполнено и обязательное поле
+        request_body = user_payload(f'long_text:{name}')
+        response = user_factory.track(
+            api_client_users.post(data=request_body, headers={"Content-Type": "application/json"}))
 
         tester = BaseStatusHeadersSchemaTests(response, json_schemas.UNPROCESSABLE_ENTITY_422, 422)
         tester.test_status_headers_schema()
 
+
+@allure.parent_suite("/api/users")
+@allure.suite("Запрос пользователя по ID")
+class TestUserById:
+    """Проверяет ответ на запрос существующего пользователя по ID"""
+
+    @pytest.mark.smoke
+    @pytest.mark.user_pool
+    @allure.title("Запрос существующего пользователя по ID")
+    @allure.severity(Severity.CRITICAL)
+    def test_user_by_id(self, api_client_users: APIClient, user_factory: UserFactory):
+        """Запрашивает пользователя из пула тестовых пользователей и сверяет ответ с данными при создании"""
+        user = user_factory.acquire()
+        response = api_client_users.get(path=f"/{user['user_id']}")
+        tester = BaseStatusHeadersSchemaTests(response, json_schemas.USER_BY_ID, 200)
+        body = tester.test_status_headers_schema()
+        assert all(getattr(body, field) == user[field] for field in ('user_id', 'first_name', 'last_name')), \
+            f"Ответ не соответствует данным, указанным при создании пользователя. Получен ответ {body}. " \
+            f"Должно быть: {user}"
+
 # endregion Специфика эндпойнта
@@ -1,62 +1,330 @@
-from collections import defaultdict
+import json
+import random
+from pathlib import Path
 
 import pytest
 import requests
+from allure_commons.model2 import Status
+from allure_commons.types import AttachmentType
 
 from Data.constants import *
+from Helpers.allure_reporting import report_run_artifacts, report_categories, BufferedAllureFileLogger
 from Helpers.api_client import APIClient
+from Helpers.async_api_client import ResponsePrefetcher
+from Helpers.duration_scheduler import DurationHistory, DurationScheduling
+from Helpers.fast_start import CollectionManifest
+from Helpers.fixture_cache import FixtureCache
+from Helpers.helpers import Helpers
+from Helpers.latency import LatencyMetrics, LatencyBudgets
+from Helpers.payload_corpus import PayloadCorpus
+from Helpers.result_store import RunRecorder
+from Helpers.schema_validators import SchemaValidators
+from Helpers.test_selection import DependencyIndex
+from Helpers.user_factory import UserFactory
+
+prefetcher = ResponsePrefetcher(tracker='user_factory')
+
+
+def pytest_addoption(parser):
+    parser.getgroup('api').addoption(
+        '--latency-report', dest='latency_report', default=None, metavar='DIR',
+        help="собирать гистограммы латентности запросов APIClient и записать сводку (JSON, CSV) в DIR")
+    parser.getgroup('api').addoption(
+        '--schedule-by-durations', dest='schedule_by_durations', action='store_true',
+        help="при --dist loadgroup выдавать воркерам сначала самые долгие группы тестов по прошлым прогонам")
+    parser.getgroup('api').addoption(
+        '--changed-since', dest='changed_since', default=None, metavar='REF',
+        help="выполнить только тесты, затронутые изменениями рабочего дерева относительно git REF")
+    parser.getgroup('api').addoption(
+        '--changed-endpoints', dest='changed_endpoints', default=None, metavar='ENDPOINTS',
+        help="выполнить только тесты, которые обращаются к эндпойнтам (через запятую, например 'POST /api/users')")
+    parser.getgroup('api').addoption(
+        '--fast-start', dest='fast_start', action='store_true',
+        help="не собирать неизмененные модули тестов без подходящих под -m тестов (по манифесту прошлого сбора) "
+             "и не компилировать валидаторы JSON-схем заранее")
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_configure(config):
+    """
+    При API_TARGET=local запускает локальный эмулятор API (один на весь прогон, в главном процессе).
+    Главный процесс выбирает каталог общего кеша фикстур прогона, воркеры xdist получают его id через workerinput,
+    и готовит корпус тел запросов, чтобы воркеры только открывали его.
+    Главный процесс собирает длительности тестов для --schedule-by-durations.
+    Индекс зависимостей тестов (--changed-since, --changed-endpoints) дополняется запросами APIClient.
+    Манифест сбора тестов (--fast-start) обновляется при каждом сборе.
+    Без кеша pytest (-p no:cacheprovider) кеш фикстур, длительности, индекс и манифест не используются.
+    При --latency-report подключает сбор гистограмм латентности к APIClient.
+    Результаты прогона (тесты и латентность эндпойнтов) записываются в хранилище результатов (API_RESULT_STORE).
+    При --alluredir заменяет запись результатов allure-pytest буферизованной (API_ALLURE_BUFFERED), поэтому
+    выполняется после pytest_configure плагинов
+    """
+    if API_TARGET == 'local' and not hasattr(config, 'workerinput'):
+        from Helpers.local_api_server import start_in_subprocess
+        config.local_api_process = start_in_subprocess()
+        if config.local_api_process is not None:
+            # Очистка выполняется и при ошибке в pytest_configure/pytest_unconfigure
+            config.add_cleanup(lambda: stop_local_api(config.local_api_process))
+    if hasattr(config, 'workerinput'):
+        run_id = config.workerinput['fixture_cache_run']
+    else:
+        run_id = FixtureCache.new_run_id()
+    if hasattr(config, 'cache'):
+        config.fixture_cache = FixtureCache(FixtureCache.run_directory(config.cache.mkdir('api'), run_id))
+    else:  # -p no:cacheprovider: общего каталога нет, фикстуры выполняют запросы сами
+        config.fixture_cache = FixtureCache(Path(FixtureCache.DIRECTORY) / run_id, enabled=False)
+    if not hasattr(config, 'workerinput'):
+        PayloadCorpus.ensure()
+    if hasattr(config, 'cache'):  # история прогонов хранится в кеше pytest
+        if not hasattr(config, 'workerinput'):
+            config.test_durations = DurationHistory.load(config.cache)
+            config.pluginmanager.register(config.test_durations, 'api_test_durations')
+        config.dependency_index = DependencyIndex(config)
+        config.pluginmanager.register(config.dependency_index, 'api_dependency_index')
+        APIClient.request_hooks.append(config.dependency_index.record_request)
+        config.pluginmanager.register(CollectionManifest(config), 'api_collection_manifest')
+    if config.getoption('latency_report'):
+        config.latency_metrics = LatencyMetrics()
+        APIClient.request_hooks.append(config.latency_metrics.record)
+    if RESULT_STORE_ENABLED:
+        config.run_recorder = RunRecorder(config)
+        config.pluginmanager.register(config.run_recorder, 'api_run_recorder')
+        APIClient.request_hooks.append(config.run_recorder.record)
+    if ALLURE_BUFFERED:
+        BufferedAllureFileLogger.install(config)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """Передает воркеру xdist id общего кеша фикстур прогона"""
+    node.workerinput['fixture_cache_run'] = node.config.fixture_cache.directory.name
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    """При --schedule-by-durations и --dist loadgroup распределяет тесты по длительностям прошлых прогонов"""
+    if config.getoption('schedule_by_durations') and config.getvalue('dist') == 'loadgroup' \
+            and hasattr(config, 'test_durations'):
+        if not DurationScheduling.supported():
+            log("--schedule-by-durations не поддерживается этой версией pytest-xdist, используется loadgroup")
+            return None
+        return DurationScheduling(config, config.test_durations, log)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """Добавляет гистограммы латентности и времени ответа по бюджетам, собранные воркером xdist, к общим"""
+    workeroutput = getattr(node, 'workeroutput', {})
+    metrics = getattr(node.config, 'latency_metrics', None)
+    if metrics is not None and 'latency_metrics' in workeroutput:
+        metrics.merge_dict(workeroutput['latency_metrics'])
+    budgets = LatencyBudgets.default()
+    if budgets is not None and 'latency_budgets' in workeroutput:
+        budgets.merge_dict(workeroutput['latency_budgets'])
+
+
+def pytest_sessionfinish(session):
+    """
+    Освобождает невостребованные предзагруженные ответы.
+    Воркер xdist передает гистограммы латентности и времени ответа по бюджетам главному процессу; главный процесс
+    записывает сводку латентности по всем воркерам и прикрепляет ее к отчету Allure, а эндпойнты с превышением
+    бюджета p95 добавляет в отчет упавшими результатами отдельной категории дефектов
+    """
+    prefetcher.discard()
+    metrics = getattr(session.config, 'latency_metrics', None)
+    budgets = LatencyBudgets.default()
+    if hasattr(session.config, 'workerinput'):
+        if metrics is not None:
+            session.config.workeroutput['latency_metrics'] = metrics.to_dict()
+        if budgets is not None:
+            session.config.workeroutput['latency_budgets'] = budgets.to_dict()
+        return
+    if metrics is not None:
+        json_path, csv_path = metrics.write_report(session.config.getoption('latency_report'))
+        report_run_artifacts("Латентность запросов API", [
+            ('latency.json', json_path.read_bytes(), AttachmentType.JSON),
+            ('latency.csv', csv_path.read_bytes(), AttachmentType.CSV)])
+    report_categories()
+    for entry in budgets.exceeded() if budgets is not None else ():
+        report_run_artifacts(f"Бюджет латентности p95: {entry['endpoint']}", [
+            ('latency_budget.json', json.dumps(entry, ensure_ascii=False).encode('utf-8'), AttachmentType.JSON)],
+            status=Status.FAILED, message=LatencyBudgets.describe(entry))
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    """Выводит эндпойнты, p95 времени ответа которых за прогон превышает бюджет"""
+    budgets = LatencyBudgets.default()
+    exceeded = budgets.exceeded() if budgets is not None and not hasattr(config, 'workerinput') else []
+    if exceeded:
+        terminalreporter.section("Бюджеты латентности")
+        for entry in exceeded:
+            terminalreporter.write_line(LatencyBudgets.describe(entry), yellow=True)
+
+
+def stop_local_api(process):
+    """Останавливает локальный эмулятор API, запущенный этим прогоном"""
+    process.terminate()
+    process.wait()
+
+
+def pytest_unconfigure(config):
+    """Удаляет общий кеш фикстур прогона (локальный эмулятор API останавливает очистка из pytest_configure)"""
+    fixture_cache = getattr(config, 'fixture_cache', None)
+    if fixture_cache is not None and fixture_cache.enabled and not hasattr(config, 'workerinput'):
+        fixture_cache.clear()
+
+
+def pytest_collection(session):
+    """
+    Фиксирует seed модуля random перед импортом тестовых модулей: параметры из randint() вычисляются
+    при импорте и должны совпадать во всех воркерах xdist (и при воспроизведении из кассеты)
+    """
+    seed = session.config.getoption('randomly_seed', None)
+    if isinstance(seed, int):
+        random.seed(seed)
+
+
+def pytest_sessionstart(session):
+    """
+    Проверяет JSON-схемы проекта и компилирует их валидаторы один раз за процесс (воркер); при --fast-start
+    валидатор создается при первой проверке по схеме без модели (схемы с моделями его не используют)
+    """
+    if not session.config.getoption('fast_start'):
+        SchemaValidators.precompile()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(items):
+    """
+    Объединяет тесты одной группы предзагрузки в группу xdist, чтобы при --dist loadgroup
+    вся группа выполнялась на одном воркере и запросы не дублировались. Так же объединяет тесты класса,
+    которые используют фикстуры уровня класса: иначе фикстура создается на каждом воркере, где есть тесты класса,
+    и тесты пула пользователей (user_pool): пул наполняется на одном воркере по их общей потребности
+    """
+    for item in items:
+        if item.get_closest_marker('xdist_group'):
+            continue
+        if item.get_closest_marker('user_pool'):
+            item.add_marker(pytest.mark.xdist_group('user_pool'))
+        elif item.get_closest_marker(ResponsePrefetcher.MARKER):
+            item.add_marker(pytest.mark.xdist_group(ResponsePrefetcher.group_key(item)))
+        elif item.cls is not None and uses_class_fixture(item):
+            item.add_marker(pytest.mark.xdist_group(item.nodeid.rsplit('::', 1)[0]))
+
+
+def uses_class_fixture(item) -> bool:
+    """
+    Проверяет, использует ли тест фикстуры уровня класса. У pytest нет публичного способа узнать область
+    фикстуры до ее создания, поэтому используется FixtureManager (pytest закреплен в requirements.txt)
+    """
+    fixture_manager = item.session._fixturemanager
+    for name in item.fixturenames:
+        definitions = fixture_manager.getfixturedefs(name, item.nodeid)
+        if definitions and definitions[-1].scope == 'class':
+            return True
+    return False
+
+
+@pytest.fixture(scope='session')
+def http_session() -> requests.Session:
+    """
+    Возвращает общую для воркера HTTP-сессию с пулом keep-alive соединений.
+    По окончании сессии тестов закрывает ее и логирует статистику новых и переиспользованных соединений
+    """
+    yield APIClient.shared_session()
+    APIClient.close_shared_session()
+
+
+@pytest.fixture(scope='session')
+def fixture_cache(request) -> FixtureCache:
+    """Возвращает общий для воркеров xdist кеш данных фикстур"""
+    return request.config.fixture_cache
 
 
 @pytest.fixture(scope='module')
-def api_client_companies() -> APIClient:
+def api_client_companies(http_session) -> APIClient:
     """Возвращает базовый API-клиент по BASE_URL_COMPANIES"""
-    return APIClient(base_url=BASE_URL_COMPANIES)
+    return APIClient(base_url=BASE_URL_COMPANIES, session=http_session)
 
 
 @pytest.fixture(scope='class')
-def response_get_base_companies(api_client_companies) -> requests.Response:
-    """Возвращает результат GET-запроса без параметров на BASE_URL_COMPANIES"""
-    return api_client_companies.get()
+def response_get_base_companies(api_client_companies, fixture_cache) -> requests.Response:
+    """Возвращает результат GET-запроса без параметров на BASE_URL_COMPANIES (один запрос на прогон)"""
+    return fixture_cache.get_or_create('companies.base', api_client_companies.get)
 
 
 @pytest.fixture(scope='class')
-def response_companies_with_http() -> requests.Response:
-    """Возвращает результат GET-запроса без параметров на BASE_URL_COMPANIES_HTTP"""
-    unsecure_api_client = APIClient(base_url=BASE_URL_COMPANIES_HTTP)
-    return unsecure_api_client.get()
+def response_companies_with_http(http_session, fixture_cache) -> requests.Response:
+    """Возвращает результат GET-запроса без параметров на BASE_URL_COMPANIES_HTTP (один запрос на прогон)"""
+    unsecure_api_client = APIClient(base_url=BASE_URL_COMPANIES_HTTP, session=http_session)
+    return fixture_cache.get_or_create('companies.http', unsecure_api_client.get)
 
 
 @pytest.fixture(scope='module')
-def api_client_users() -> APIClient:
+def api_client_users(http_session) -> APIClient:
     """Возвращает базовый API-клиент по BASE_URL_USERS"""
-    return APIClient(base_url=BASE_URL_USERS)
+    return APIClient(base_url=BASE_URL_USERS, session=http_session)
+
+
+@pytest.fixture(scope='session')
+def user_factory(request, http_session, fixture_cache) -> UserFactory:
+    """
+    Возвращает пул тестовых пользователей. По окончании сессии тестов одним пакетом удаляет всех
+    пользователей, созданных через пул или учтенных тестами (track), в т.ч. после упавших тестов.
+    Потребность пула - сумма count меток user_pool выбранных тестов
+    """
+    demand = sum(marker.args[0] if marker.args else marker.kwargs.get('count', 1)
+                 for marker in (item.get_closest_marker('user_pool') for item in request.session.items) if marker)
+    factory = UserFactory(APIClient(base_url=BASE_URL_USERS, session=http_session),
+                          on_change=lambda: fixture_cache.invalidate('users'), demand=demand)
+    yield factory
+    not_deleted = factory.cleanup()
+    assert not not_deleted, f"Не удалены тестовые пользователи: {not_deleted}"
 
 
 @pytest.fixture(scope='class')
-def response_get_base_users(api_client_users) -> requests.Response:
-    """Возвращает результат GET-запроса без параметров на BASE_URL_USERS"""
-    return api_client_users.get()
+def response_get_base_users(api_client_users, fixture_cache) -> requests.Response:
+    """
+    Возвращает результат GET-запроса без параметров на BASE_URL_USERS. Пользователей меняют тесты,
+    поэтому ответ кешируется на FIXTURE_CACHE_USERS_TTL и сбрасывается тестами создания пользователей
+    """
+    return fixture_cache.get_or_create('users.base', api_client_users.get, ttl=FIXTURE_CACHE_USERS_TTL)
 
 
 @pytest.fixture(scope='class')
-def response_users_with_http() -> requests.Response:
+def response_users_with_http(http_session, fixture_cache) -> requests.Response:
     """Возвращает результат GET-запроса без параметров на BASE_URL_USERS_HTTP"""
-    unsecure_api_client = APIClient(base_url=BASE_URL_USERS_HTTP)
-    return unsecure_api_client.get()
+    unsecure_api_client = APIClient(base_url=BASE_URL_USERS_HTTP, session=http_session)
+    return fixture_cache.get_or_create('users.http', unsecure_api_client.get, ttl=FIXTURE_CACHE_USERS_TTL)
+
+
+@pytest.fixture(scope='session')
+def companies_grouped_by_statuses(http_session, fixture_cache) -> dict:
+    """
+    По всем страницам /api/companies/ составляет и возвращает словарь статусов и соответствующих им списков
+    ID компаний. Компании не меняются, поэтому обход выполняется один раз на прогон
+    """
+    def group_companies():
+        api_client_companies = APIClient(base_url=BASE_URL_COMPANIES, session=http_session)
+        return Helpers.group_companies_by_statuses(api_client_companies.paginate())
+
+    return fixture_cache.get_or_create('companies.grouped_by_statuses', group_companies)
 
 
 @pytest.fixture(scope='function')
-def companies_grouped_by_statuses(api_client_companies) -> dict:
-    """
-    По результатам запроса на /api/companies/ с лимитом 7 составляет и возвращает словарь статусов
-    и соответствующих им списков ID компаний
-    """
-    response = api_client_companies.get(params={'limit': 7})  # Известно, что в базе всего 7 компаний
-    body = response.json()
-    data = body['data']
-    # Убеждаемся, что все объекты из базы получены
-    assert len(data) == 7, f"В ответе не все компании: {len(data)} вместо 7"
-    counter = defaultdict(list)
-    for company in data:
-        counter[company['company_status']].append(company['company_id'])
-    return counter
+def user_payload(request):
+    """
+    Возвращает функцию (вид, **дополнительные поля) -> сериализованное тело запроса на создание пользователя
+    из корпуса; вариант выбирается по nodeid теста, поэтому одинаков в любом воркере и при любом seed
+    """
+    corpus = PayloadCorpus.default()
+    return lambda kind, **fields: corpus.with_fields(corpus.payload(kind, request.node.nodeid), **fields)
+
+
+@pytest.fixture(scope='function')
+def prefetched_response(request) -> requests.Response:
+    """
+    Возвращает ответ на запрос теста с меткой prefetch. Запросы всех тестов группы отправляются
+    одновременно при setup первого из них
+    """
+    return prefetcher.response_for(request.node, request.getfixturevalue)
@@ -1,3 +1,3 @@
 #!/bin/bash
 
-pytest Tests/ -n auto --alluredir=/allure-results
+pytest Tests/ -n auto --dist loadgroup --schedule-by-durations --alluredir=/allure-results